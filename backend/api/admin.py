@@ -2,18 +2,32 @@
 
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser, Question, QuizResult, Challenge, ChallengeAttempt, StudyMaterial
+from django.utils import timezone
+from .models import CustomUser, Question, QuizResult, Challenge, ChallengeAttempt, StudyMaterial, OutgoingEmail, Task
+from .search import matching_ids
+
+
+class FullTextSearchMixin:
+    # Answers the changelist search box from the full-text index instead of LIKE '%term%' scans
+    search_kind = None
+
+    def get_search_results(self, request, queryset, search_term):
+        ids = matching_ids(self.search_kind, search_term)
+        if ids is None:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(id__in=ids), False
 
 class CustomUserAdmin(UserAdmin):
     # You can customize the admin for your user model here if needed
     pass
 
 @admin.register(Question)
-class QuestionAdmin(admin.ModelAdmin):
+class QuestionAdmin(FullTextSearchMixin, admin.ModelAdmin):
     # ... (this class is unchanged) ...
     list_display = ('id', 'subject', 'topic', 'question_type', 'difficulty', 'marks', 'source_paper')
     list_filter = ('subject', 'difficulty', 'question_type', 'source_paper')
     search_fields = ('question_text', 'topic', 'source_paper')
+    search_kind = 'question'
     fieldsets = (
         ('Question Metadata', {'fields': ('subject', 'topic', 'source_paper', 'difficulty', 'question_type', 'marks')}),
         ('Question Body', {'fields': ('question_text', 'question_image')}),
@@ -23,20 +37,44 @@ class QuestionAdmin(admin.ModelAdmin):
 
 @admin.register(Challenge)
 class ChallengeAdmin(admin.ModelAdmin):
-    list_display = ('title', 'is_active', 'created_at')
+    list_display = ('title', 'is_active', 'duration_minutes', 'created_at')
     list_filter = ('is_active',)
-    fields = ('title', 'description', 'config', 'is_active')
+    fields = ('title', 'description', 'config', 'duration_minutes', 'is_active')
 
 @admin.register(ChallengeAttempt)
 class ChallengeAttemptAdmin(admin.ModelAdmin):
-    list_display = ('user', 'challenge', 'status', 'score', 'start_time')
+    list_display = ('user', 'challenge', 'status', 'score', 'start_time', 'deadline')
     list_filter = ('status', 'challenge')
 
 @admin.register(StudyMaterial)
-class StudyMaterialAdmin(admin.ModelAdmin):
+class StudyMaterialAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ('title', 'subject', 'uploaded_at')
     list_filter = ('subject',)
     search_fields = ('title', 'description')
+    search_kind = 'material'
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to_address', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('to_address',)
+    readonly_fields = ('created_at', 'sent_at', 'claimed_by', 'last_error')
+    actions = ['retry_now']
+
+    @admin.action(description="Send again on the next worker pass")
+    def retry_now(self, request, queryset):
+        queryset.exclude(status='SENT').update(status='PENDING', attempts=0, claimed_by='', next_attempt_at=timezone.now())
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'priority', 'run_at', 'attempts', 'locked_by', 'finished_at')
+    list_filter = ('status', 'name')
+    readonly_fields = ('created_at', 'started_at', 'finished_at', 'locked_by', 'locked_until', 'last_error')
+    actions = ['retry_now']
+
+    @admin.action(description="Run again as soon as a worker is free")
+    def retry_now(self, request, queryset):
+        queryset.exclude(status='RUNNING').update(status='QUEUED', attempts=0, run_at=timezone.now(), finished_at=None)
 
     
 admin.site.register(CustomUser, CustomUserAdmin)
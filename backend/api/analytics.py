@@ -0,0 +1,133 @@
+# File: backend/api/analytics.py
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, FloatField, Max, Q, Sum, When
+from django.db.models.functions import Greatest, TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import DailySubjectStats, QuizResult, SubjectStats
+
+DAILY_FIELDS = ('attempts', 'score_sum', 'total_marks_sum')
+STATS_FIELDS = ('attempts', 'score_sum', 'total_marks_sum', 'accuracy_sum', 'graded_attempts', 'last_activity')
+
+
+def result_increments(score, total_marks):
+    graded = total_marks > 0
+    return {
+        'attempts': 1,
+        'score_sum': score,
+        'total_marks_sum': total_marks,
+        'accuracy_sum': score * 100.0 / total_marks if graded else 0.0,
+        'graded_attempts': 1 if graded else 0,
+    }
+
+
+def increment_row(model, lookup, increments, extra_updates=None, create_defaults=None):
+    """
+    Adds `increments` to the row matching `lookup` with a single F-expression
+    UPDATE, creating the row if it doesn't exist yet.
+    """
+    updates = {field: F(field) + value for field, value in increments.items()}
+    updates.update(extra_updates or {})
+    rows = model.objects.filter(**lookup)
+
+    if rows.update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **increments, **(create_defaults or {}))
+    except IntegrityError:
+        # A concurrent submit created the row first
+        rows.update(**updates)
+
+
+def record_quiz_result(result):
+    """Adds a new QuizResult to the user's subject rollup and to its daily trend bucket."""
+    increments = result_increments(result.score, result.total_marks)
+    increment_row(
+        SubjectStats,
+        {'user_id': result.user_id, 'subject': result.subject},
+        increments,
+        extra_updates={'last_activity': Greatest(F('last_activity'), result.timestamp)},
+        create_defaults={'last_activity': result.timestamp},
+    )
+    increment_row(
+        DailySubjectStats,
+        {'user_id': result.user_id, 'subject': result.subject, 'day': timezone.localdate(result.timestamp)},
+        {key: increments[key] for key in DAILY_FIELDS},
+    )
+
+
+def aggregate_quiz_results(results=None):
+    """
+    Computes rollup values straight from QuizResult rows.
+    Returns {(user_id, subject): {field: value}}.
+    """
+    results = QuizResult.objects.all() if results is None else results
+    graded = Q(total_marks__gt=0)
+    rows = results.order_by().values('user_id', 'subject').annotate(
+        attempts=Count('id'),
+        score_sum=Sum('score'),
+        total_marks_sum=Sum('total_marks'),
+        accuracy_sum=Sum(
+            Case(When(graded, then=F('score') * 100.0 / F('total_marks')), default=0.0, output_field=FloatField())
+        ),
+        graded_attempts=Count('id', filter=graded),
+        last_activity=Max('timestamp'),
+    )
+    return {(row['user_id'], row['subject']): {field: row[field] for field in STATS_FIELDS} for row in rows}
+
+
+def aggregate_daily_stats(results=None):
+    """
+    Computes daily trend buckets straight from QuizResult rows, by day in the current
+    time zone as record_quiz_result does. Returns {(user_id, subject, day): {field: value}}.
+    """
+    results = QuizResult.objects.all() if results is None else results
+    rows = results.order_by().values('user_id', 'subject', day=TruncDate('timestamp')).annotate(
+        attempts=Count('id'),
+        score_sum=Sum('score'),
+        total_marks_sum=Sum('total_marks'),
+    )
+    return {(row['user_id'], row['subject'], row['day']): {field: row[field] for field in DAILY_FIELDS} for row in rows}
+
+
+def stats_match(expected, actual, tolerance=1e-6):
+    for field in STATS_FIELDS:
+        a, b = expected[field], actual[field]
+        if isinstance(a, float) or isinstance(b, float):
+            if abs((a or 0) - (b or 0)) > tolerance:
+                return False
+        elif a != b:
+            return False
+    return True
+
+
+TRUNCATE_BY_GRANULARITY = {
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+def performance_trend(user, start, end, granularity='day', subject=None):
+    """
+    Sums the user's daily buckets between `start` and `end` (inclusive) into
+    day, week or month periods. Returns one row per (period, subject).
+    """
+    buckets = DailySubjectStats.objects.filter(user=user, day__gte=start, day__lte=end)
+    if subject:
+        buckets = buckets.filter(subject=subject)
+    truncate = TRUNCATE_BY_GRANULARITY.get(granularity)
+    period = truncate('day') if truncate else F('day')
+    rows = buckets.annotate(period=period).values('period', 'subject').annotate(
+        attempts=Sum('attempts'),
+        score=Sum('score_sum'),
+        total_marks=Sum('total_marks_sum'),
+    ).order_by('period', 'subject')
+    return [
+        {
+            **row,
+            'accuracy': round(row['score'] * 100.0 / row['total_marks'], 2) if row['total_marks'] else None,
+        }
+        for row in rows
+    ]
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .ranks import gate_rank_table
+
+        # Read once at startup, so a bad table fails loudly here rather than on a submit
+        gate_rank_table()
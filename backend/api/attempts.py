@@ -0,0 +1,136 @@
+# File: backend/api/attempts.py
+
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import leaderboard, ranks
+from .grading import grade_sheet, grade_sheets
+from .models import ChallengeAttempt, ChallengeResponse, DraftAnswer
+from .utils import bump_cache_version, get_cache_version
+
+# Versions the cached challenge result pages: bumped when questions change or ranks are recomputed
+RESULTS_VERSION_KEY = 'challenge_results'
+
+
+def result_cache_key(user_id, attempt_id, host):
+    return f"challenge_result:{get_cache_version(RESULTS_VERSION_KEY)}:{user_id}:{attempt_id}:{host}"
+
+
+def invalidate_results():
+    bump_cache_version(RESULTS_VERSION_KEY)
+
+
+def build_responses(attempt, sheet):
+    """One unsaved ChallengeResponse per graded question."""
+    return [
+        ChallengeResponse(
+            attempt=attempt,
+            question_id=response.question_id,
+            answer=response.answer,
+            is_correct=response.is_correct,
+            marks_awarded=response.marks_awarded,
+        )
+        for response in sheet.responses
+    ]
+
+
+def grade_attempt(attempt, answers):
+    """
+    Grades `answers` against the attempt's paper.
+    Returns the graded sheet and one unsaved ChallengeResponse per question, ordered by question ID.
+    """
+    question_ids = sorted(attempt.questions.values_list('id', flat=True))
+    sheet = grade_sheet(question_ids, answers)
+    return sheet, build_responses(attempt, sheet)
+
+
+def complete_attempt(attempt, answers):
+    """
+    Grades and closes an in-progress attempt, storing its per-question responses and
+    predicted rank. Must be called inside a transaction holding a lock on the attempt row.
+    """
+    sheet, responses = grade_attempt(attempt, answers)
+    attempt.score = round(sheet.score, 2)
+    attempt.end_time = timezone.now()
+    attempt.status = 'COMPLETED'
+    attempt.answers = answers
+    ranks.rank_attempts([attempt], [sheet.total_marks])
+    attempt.save(update_fields=['score', 'end_time', 'status', 'answers', 'predicted_rank'])
+    ChallengeResponse.objects.bulk_create(responses)
+    return sheet
+
+
+# --- Deadlines ---
+
+def submit_grace():
+    # Covers network latency and an autosave still in flight; answers later than deadline + grace don't count
+    return timedelta(seconds=getattr(settings, 'CHALLENGE_SUBMIT_GRACE_SECONDS', 30))
+
+
+def deadline_for(challenge, start=None):
+    return (start or timezone.now()) + timedelta(minutes=challenge.duration_minutes)
+
+
+def is_expired(attempt, now=None):
+    return attempt.deadline is not None and (now or timezone.now()) > attempt.deadline + submit_grace()
+
+
+def close_expired(attempts):
+    """
+    Grades and closes attempts whose time ran out, using only the answers autosaved
+    before deadline + grace, with end_time set to the deadline. Grading, the attempt
+    updates, the responses and the leaderboard take a fixed number of queries however
+    many attempts there are (plus one histogram update per distinct score). Must be called inside a transaction holding locks on the
+    attempt rows.
+    """
+    ids = [attempt.id for attempt in attempts]
+    cutoffs = {attempt.id: attempt.deadline + submit_grace() for attempt in attempts}
+    question_ids = defaultdict(list)
+    for attempt_id, question_id in ChallengeAttempt.questions.through.objects.filter(
+            challengeattempt_id__in=ids).values_list('challengeattempt_id', 'question_id'):
+        question_ids[attempt_id].append(question_id)
+    answers = defaultdict(dict)
+    for attempt_id, question_id, answer, updated_at in DraftAnswer.objects.filter(
+            attempt_id__in=ids).values_list('attempt_id', 'question_id', 'answer', 'updated_at'):
+        if answer is not None and updated_at <= cutoffs[attempt_id]:
+            answers[attempt_id][str(question_id)] = answer
+
+    sheets = grade_sheets([(sorted(question_ids[attempt.id]), answers[attempt.id]) for attempt in attempts])
+    responses = []
+    for attempt, sheet in zip(attempts, sheets):
+        attempt.score = round(sheet.score, 2)
+        attempt.end_time = attempt.deadline
+        attempt.status = 'COMPLETED'
+        attempt.answers = answers[attempt.id]
+        responses.extend(build_responses(attempt, sheet))
+    ranks.rank_attempts(attempts, [sheet.total_marks for sheet in sheets])
+    ChallengeAttempt.objects.bulk_update(attempts, ['score', 'end_time', 'status', 'answers', 'predicted_rank'])
+    ChallengeResponse.objects.bulk_create(responses, batch_size=1000)
+    DraftAnswer.objects.filter(attempt_id__in=ids).delete()
+    leaderboard.record_attempts(attempts)
+
+
+def expire_attempts(batch_size=200, now=None):
+    """
+    Closes in-progress attempts whose deadline (plus grace) has passed, oldest first,
+    found through the partial deadline index. Each batch is its own transaction.
+    Yields (attempts closed, seconds taken) per batch.
+    """
+    cutoff = (now or timezone.now()) - submit_grace()
+    while True:
+        started = time.perf_counter()
+        with transaction.atomic():
+            expired = ChallengeAttempt.objects.filter(status='IN_PROGRESS', deadline__lt=cutoff).order_by('deadline')
+            if connection.features.has_select_for_update_skip_locked:
+                # Attempts being submitted right now are left to their submit
+                expired = expired.select_for_update(skip_locked=True)
+            attempts = list(expired[:batch_size])
+            if not attempts:
+                return
+            close_expired(attempts)
+        yield len(attempts), time.perf_counter() - started
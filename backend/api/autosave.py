@@ -0,0 +1,132 @@
+# File: backend/api/autosave.py
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ChallengeAttempt, DraftAnswer
+
+MAX_ANSWER_LENGTH = 64
+
+
+# --- Validation ---
+
+def attempt_access_key(attempt_id):
+    return f"autosave_attempt:{attempt_id}"
+
+
+def attempt_state(attempt_id, user):
+    """
+    (question IDs, deadline) of the user's in-progress attempt, or None if there's no
+    such attempt. Cached briefly, as every autosave of the attempt asks again.
+    """
+    key = attempt_access_key(attempt_id)
+    entry = cache.get(key)
+    if entry is None:
+        owner, deadline = ChallengeAttempt.objects.filter(
+            id=attempt_id, status='IN_PROGRESS').values_list('user_id', 'deadline').first() or (None, None)
+        question_ids = ChallengeAttempt.questions.through.objects.filter(challengeattempt_id=attempt_id).values_list('question_id', flat=True)
+        entry = (owner, frozenset(question_ids) if owner else frozenset(), deadline)
+        cache.set(key, entry, getattr(settings, 'AUTOSAVE_ACCESS_CACHE_TIMEOUT', 60))
+    owner, question_ids, deadline = entry
+    return (question_ids, deadline) if owner == user.id else None
+
+
+def parse_deltas(answers, question_ids):
+    """
+    {question ID: answer} from an autosave body, where null clears an answer.
+    Raises ValueError for unknown questions or malformed answers.
+    """
+    if not isinstance(answers, dict) or not answers:
+        raise ValueError("answers must be a non-empty object of question ID -> answer.")
+    deltas = {}
+    for key, answer in answers.items():
+        try:
+            question_id = int(key)
+        except (TypeError, ValueError):
+            raise ValueError(f"'{key}' is not a question ID.")
+        if question_id not in question_ids:
+            raise ValueError(f"Question {question_id} is not part of this attempt.")
+        if isinstance(answer, list) and all(isinstance(option, str) for option in answer):
+            # MSQ selections are stored the way the submit form sends them: "ACD"
+            answer = ''.join(sorted(answer)) or None
+        elif isinstance(answer, (int, float)) and not isinstance(answer, bool):
+            answer = str(answer)
+        elif answer is not None and not isinstance(answer, str):
+            raise ValueError(f"Answer to question {question_id} must be a string, number, list of options or null.")
+        if answer is not None and len(answer) > MAX_ANSWER_LENGTH:
+            raise ValueError(f"Answer to question {question_id} is too long.")
+        deltas[question_id] = answer
+    return deltas
+
+
+# --- Writing ---
+
+_stamp_lock = threading.Lock()
+_last_stamp = 0
+
+
+def next_seq():
+    """A receive stamp (microseconds) for ordering deltas, increasing within this worker."""
+    global _last_stamp
+    with _stamp_lock:
+        _last_stamp = max(_last_stamp + 1, time.time_ns() // 1000)
+        return _last_stamp
+
+
+def save_answers(attempt_id, deltas):
+    """
+    Writes an attempt's {question ID: answer} deltas, None clearing an answer. A stored
+    answer is only replaced by a newer delta, so requests that reach the database out of
+    order can't roll it back. Deltas are ordered by when they arrived rather than by a
+    client counter, which would restart from stale values after a reload; updated_at is
+    the arrival time too, so an answer given before the deadline counts whenever it lands.
+    Returns False if the attempt is no longer in progress.
+    """
+    seq, received_at = next_seq(), timezone.now()
+    with transaction.atomic():
+        # Locked until the drafts are in, so a submit can't grade the attempt in between
+        # and two saves for the same attempt can't both pass the seq check below
+        if not ChallengeAttempt.objects.select_for_update().filter(id=attempt_id, status='IN_PROGRESS').exists():
+            return False
+        stored = dict(DraftAnswer.objects.filter(attempt_id=attempt_id, question_id__in=deltas).values_list('question_id', 'seq'))
+        for question_id, answer in deltas.items():
+            if stored.get(question_id, -1) < seq:
+                DraftAnswer.objects.update_or_create(
+                    attempt_id=attempt_id, question_id=question_id,
+                    defaults={'answer': answer, 'seq': seq, 'updated_at': received_at},
+                )
+    return True
+
+
+# --- Reading ---
+
+def saved_answers(attempt_id):
+    """{question ID: answer} autosaved for an attempt. Cleared answers are left out."""
+    rows = DraftAnswer.objects.filter(attempt_id=attempt_id, answer__isnull=False).values_list('question_id', 'answer')
+    # A clear is stored as SQL NULL; the check also skips a JSON null, should one be stored
+    return {str(question_id): answer for question_id, answer in rows if answer is not None}
+
+
+def final_answers(attempt_id, submitted):
+    """
+    The answers to grade at submit: the autosaved ones, overridden by whatever the
+    submit body carries (where null clears an answer).
+    """
+    answers = saved_answers(attempt_id)
+    for key, answer in (submitted or {}).items():
+        if answer is None:
+            answers.pop(str(key), None)
+        else:
+            answers[str(key)] = answer
+    return answers
+
+
+def discard(attempt_id):
+    """Drops an attempt's drafts once it's been submitted."""
+    DraftAnswer.objects.filter(attempt_id=attempt_id).delete()
+    cache.delete(attempt_access_key(attempt_id))
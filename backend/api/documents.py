@@ -0,0 +1,81 @@
+# File: backend/api/documents.py
+#
+# Pure helpers for study material previews. run_preview_worker calls inspect_document
+# in worker processes, which import this module on its own, so nothing here may touch Django.
+
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+
+from PIL import Image
+from pypdf import PdfReader
+from pypdf.errors import PyPdfError
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.webp', '.gif', '.bmp'}
+RENDER_TIMEOUT = 60
+NO_PDF_RENDERER = "No thumbnail: poppler's pdftoppm is not installed."
+
+
+def pdf_page_count(data):
+    """
+    The page count from the document's page tree, following its latest cross-reference
+    section so pages replaced or removed by incremental updates aren't counted.
+    Returns None for a file that can't be parsed or is encrypted with a user password.
+    """
+    try:
+        reader = PdfReader(io.BytesIO(data))
+        if reader.is_encrypted and not reader.decrypt(''):
+            return None
+        return len(reader.pages) or None
+    except (PyPdfError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def render_pdf_first_page(path, width):
+    """PNG bytes of the first page via poppler's pdftoppm, or None where it isn't installed."""
+    pdftoppm = shutil.which('pdftoppm')
+    if pdftoppm is None:
+        return None
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, 'page')
+        subprocess.run(
+            [pdftoppm, '-f', '1', '-l', '1', '-singlefile', '-png', '-scale-to-x', str(width * 2), '-scale-to-y', '-1', path, output],
+            check=True, capture_output=True, timeout=RENDER_TIMEOUT,
+        )
+        with open(output + '.png', 'rb') as f:
+            return f.read()
+
+
+def encode_thumbnail(data, width, quality=75):
+    with Image.open(io.BytesIO(data)) as image:
+        image.thumbnail((width, width * 2), Image.Resampling.LANCZOS)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info or image.mode == 'LA' else 'RGB')
+        buffer = io.BytesIO()
+        image.save(buffer, format='WEBP', quality=quality)
+        return buffer.getvalue()
+
+
+def inspect_document(path, thumbnail_width):
+    """
+    File size, page count and a first-page WebP thumbnail for a local file.
+    Page count and thumbnail are None where the format doesn't allow them; `error` says
+    why a PDF has no thumbnail when that's down to the tooling rather than the file.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    result = {'file_size': os.path.getsize(path), 'page_count': None, 'thumbnail': None, 'error': None}
+    if extension == '.pdf':
+        with open(path, 'rb') as f:
+            result['page_count'] = pdf_page_count(f.read())
+        page = render_pdf_first_page(path, thumbnail_width)
+        if page is not None:
+            result['thumbnail'] = encode_thumbnail(page, thumbnail_width)
+        else:
+            result['error'] = NO_PDF_RENDERER
+    elif extension in IMAGE_EXTENSIONS:
+        with open(path, 'rb') as f:
+            result['thumbnail'] = encode_thumbnail(f.read(), thumbnail_width)
+        result['page_count'] = 1
+    return result
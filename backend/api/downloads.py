@@ -0,0 +1,252 @@
+# File: backend/api/downloads.py
+
+import atexit
+import logging
+import mimetypes
+import os
+import re
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core import signing
+from django.db import DatabaseError, close_old_connections
+from django.db.models import Case, F, Value, When
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.utils.text import slugify
+
+from .models import StudyMaterial
+from .storage import digest_from_name
+
+logger = logging.getLogger(__name__)
+
+STREAM_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_CACHE_CONTROL = 'private, max-age=31536000, immutable'
+
+
+class LinkSigner(signing.TimestampSigner):
+    """
+    Timestamps rounded down to MATERIAL_DOWNLOAD_LINK_WINDOW seconds: every link to a
+    file signed within one window is identical, so the browser's cached copy is reused.
+    """
+
+    def timestamp(self):
+        window = getattr(settings, 'MATERIAL_DOWNLOAD_LINK_WINDOW', 60 * 60)
+        return signing.b62_encode(int(time.time()) // window * window)
+
+
+_signer = LinkSigner(salt='api.material-download')
+
+
+# --- Links ---
+
+def _signed_value(material):
+    # Signing the file name too means replacing the file changes the link (and the browser's cache key)
+    return f"{material.pk}:{material.file.name}"
+
+
+def download_url(material, request=None):
+    """
+    A signed link to the download endpoint, valid for MATERIAL_DOWNLOAD_LINK_MAX_AGE
+    seconds. Plain links (<a href download>) can't carry the JWT header, so the
+    signature is what authorizes the download.
+    """
+    value = _signed_value(material)
+    token = _signer.sign(value)[len(value) + 1:]
+    url = f"{reverse('material-download', args=[material.pk])}?sig={token}"
+    return request.build_absolute_uri(url) if request else url
+
+
+def valid_signature(material, token):
+    """Whether `token` (timestamp:signature) was signed for this file and hasn't expired."""
+    if not token:
+        return False
+    max_age = getattr(settings, 'MATERIAL_DOWNLOAD_LINK_MAX_AGE', 6 * 60 * 60)
+    try:
+        _signer.unsign(f"{_signed_value(material)}:{token}", max_age=max_age)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+# --- Responses ---
+
+def file_validators(material):
+    """(ETag, last-modified timestamp, size); content-addressed files use their hash as the ETag."""
+    storage = material.file.storage
+    size = storage.size(material.file.name)
+    modified = int(storage.get_modified_time(material.file.name).timestamp())
+    digest = digest_from_name(material.file.name)
+    return quote_etag(digest or f"{modified:x}-{size:x}"), modified, size
+
+
+def is_not_modified(request, etag, modified):
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.1.3)
+        return if_none_match.strip() == '*' or etag in [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+    since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return since is not None and modified <= since
+
+
+def requested_range(request, etag, modified, size):
+    """
+    (start, end) inclusive for a satisfiable single-range request, None for a full
+    response, or 'unsatisfiable'. Multi-range requests and invalid ranges (last byte
+    before the first) get the whole file, as RFC 9110 14.2 says to ignore them.
+    """
+    header = request.headers.get('Range', '')
+    match = re.fullmatch(r'bytes=(\d*)-(\d*)', header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    if_range = request.headers.get('If-Range')
+    if if_range and if_range != etag and parse_http_date_safe(if_range) != modified:
+        # The client's partial copy is of an older version: send the whole new one
+        return None
+
+    first, last = match.groups()
+    if first == '':
+        # Suffix range: the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+    elif last and int(last) < int(first):
+        return None
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return 'unsatisfiable'
+    return start, end
+
+
+def _read_range(file, start, length):
+    try:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def accelerated_response(material):
+    """Hands the transfer to the front server if MATERIAL_DOWNLOAD_ACCEL is configured."""
+    mode = getattr(settings, 'MATERIAL_DOWNLOAD_ACCEL', '')
+    if mode == 'nginx':
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = getattr(settings, 'MATERIAL_ACCEL_REDIRECT_PREFIX', '/protected-media/') + material.file.name
+        return response
+    if mode == 'sendfile':
+        response = HttpResponse()
+        response['X-Sendfile'] = material.file.path
+        return response
+    return None
+
+
+def download_response(request, material):
+    """
+    Serves a material's file with conditional GET and single-range support,
+    streaming it in chunks (or letting the front server send it).
+    """
+    name = material.file.name
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    filename = f"{slugify(material.title) or 'material'}{os.path.splitext(name)[1].lower()}"
+    disposition = 'attachment' if request.GET.get('download') else 'inline'
+
+    accelerated = accelerated_response(material)
+    if accelerated is not None:
+        # The front server handles ranges and validators itself
+        accelerated['Content-Type'] = content_type
+        accelerated['Content-Disposition'] = f'{disposition}; filename="{filename}"'
+        accelerated['Cache-Control'] = DOWNLOAD_CACHE_CONTROL
+        download_counter.record(material.pk)
+        return accelerated
+
+    etag, modified, size = file_validators(material)
+    if is_not_modified(request, etag, modified):
+        response = HttpResponseNotModified()
+    else:
+        byte_range = requested_range(request, etag, modified, size)
+        if byte_range == 'unsatisfiable':
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+        elif byte_range is None:
+            response = FileResponse(material.file.open('rb'), content_type=content_type)
+            download_counter.record(material.pk)
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(_read_range(material.file.open('rb'), start, end - start + 1),
+                                             status=206, content_type=content_type)
+            response['Content-Length'] = str(end - start + 1)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            if start == 0:
+                # Viewers fetch PDFs in many ranges; count each view once
+                download_counter.record(material.pk)
+        response['Content-Disposition'] = f'{disposition}; filename="{filename}"'
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(modified)
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = DOWNLOAD_CACHE_CONTROL
+    return response
+
+
+# --- Download counts ---
+
+class DownloadCounter:
+    """
+    Buffers download counts in this worker and writes them with one UPDATE from a
+    background thread every MATERIAL_DOWNLOAD_FLUSH_INTERVAL seconds, or as soon as
+    MATERIAL_DOWNLOAD_FLUSH_SIZE downloads have accumulated, instead of a write per
+    download. Downloads never wait on the write, and counts a failed write held are
+    kept for the next one.
+    """
+
+    def __init__(self):
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def record(self, material_id):
+        with self._lock:
+            self._pending[material_id] += 1
+            due = sum(self._pending.values()) >= getattr(settings, 'MATERIAL_DOWNLOAD_FLUSH_SIZE', 50)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='download-count-flush', daemon=True)
+                self._thread.start()
+        if due:
+            self._wakeup.set()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending:
+            return
+        try:
+            StudyMaterial.objects.filter(pk__in=pending).update(download_count=F('download_count') + Case(
+                *[When(pk=pk, then=Value(count)) for pk, count in pending.items()], default=Value(0),
+            ))
+        except DatabaseError:
+            with self._lock:
+                self._pending.update(pending)
+            raise
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(getattr(settings, 'MATERIAL_DOWNLOAD_FLUSH_INTERVAL', 10))
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except DatabaseError:
+                logger.exception("Download count flush failed.")
+            finally:
+                close_old_connections()
+
+
+download_counter = DownloadCounter()
+atexit.register(download_counter.flush)
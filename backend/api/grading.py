@@ -0,0 +1,192 @@
+# File: backend/api/grading.py
+
+import re
+from typing import NamedTuple, Optional
+
+from django.core.cache import cache
+
+from .models import Question
+from .utils import bump_cache_version, get_cache_version
+
+ANSWER_KEY_CACHE_PREFIX = 'answer_key:'
+ANSWER_KEY_CACHE_TIMEOUT = 60 * 60
+# Versions the cached answer keys in every worker: bumped when a question is saved or deleted
+ANSWER_KEYS_VERSION_KEY = 'answer_keys'
+
+# NAT answers may be a single value ("1.57") or an accepted range ("1.55 to 1.60", "1.55:1.60").
+# Not ',', which would read a key written "1,000" as the range 1..0
+NAT_RANGE_RE = re.compile(r'^\s*(-?[\d.]+)\s*(?:to|:|~)\s*(-?[\d.]+)\s*$', re.IGNORECASE)
+NAT_TOLERANCE = 1e-9
+
+
+class AnswerKey(NamedTuple):
+    """A question's correct answer, parsed once into a form that is cheap to compare."""
+    question_id: int
+    question_type: str
+    marks: int
+    penalty: float          # deducted for a wrong answer when negative marking applies
+    choice: str = ''        # MCQ: the correct option letter
+    mask: int = 0           # MSQ: bitmask of correct option letters (A = bit 0)
+    low: Optional[float] = None   # NAT: accepted numeric range
+    high: Optional[float] = None
+    text: str = ''          # fallback exact-match answer (e.g. non-numeric NAT keys)
+
+
+class GradedResponse(NamedTuple):
+    question_id: int
+    answer: object
+    is_correct: bool
+    marks_awarded: float
+
+
+class GradedSheet(NamedTuple):
+    score: float
+    total_marks: int
+    correct_count: int
+    positive_marks: float
+    negative_marks: float
+    responses: list
+
+
+def letters_to_mask(value):
+    """Turns 'AC', 'A, C' or ['A', 'C'] into a bitmask of option letters."""
+    mask = 0
+    for char in ''.join(str(v) for v in value) if isinstance(value, (list, tuple)) else str(value):
+        char = char.upper()
+        if 'A' <= char <= 'Z':
+            mask |= 1 << (ord(char) - ord('A'))
+    return mask
+
+
+def _parse_number(value):
+    try:
+        return float(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def compile_answer_key(question):
+    correct_answer = str(question.correct_answer).strip()
+    question_type = question.question_type
+    marks = question.marks
+    # GATE: a wrong 1- or 2-mark MCQ costs a third of its marks; MSQ and NAT carry no negative marking
+    penalty = marks / 3 if question_type == 'MCQ' and marks in (1, 2) else 0.0
+
+    if question_type == 'MSQ':
+        return AnswerKey(question.id, question_type, marks, penalty, mask=letters_to_mask(correct_answer))
+    if question_type == 'NAT':
+        value = _parse_number(correct_answer)
+        if value is not None:
+            return AnswerKey(question.id, question_type, marks, penalty, low=value, high=value)
+        match = NAT_RANGE_RE.match(correct_answer)
+        if match:
+            low, high = _parse_number(match.group(1)), _parse_number(match.group(2))
+            if low is not None and high is not None:
+                return AnswerKey(question.id, question_type, marks, penalty, low=min(low, high), high=max(low, high))
+        return AnswerKey(question.id, question_type, marks, penalty, text=correct_answer)
+    return AnswerKey(question.id, question_type, marks, penalty, choice=correct_answer.upper(), text=correct_answer)
+
+
+def invalidate_answer_keys():
+    bump_cache_version(ANSWER_KEYS_VERSION_KEY)
+
+
+def get_answer_keys(question_ids):
+    """
+    Returns {question_id: AnswerKey}, reading precompiled keys from the cache
+    and compiling the misses with a single query.
+    """
+    question_ids = {int(qid) for qid in question_ids}
+    prefix = f'{ANSWER_KEY_CACHE_PREFIX}{get_cache_version(ANSWER_KEYS_VERSION_KEY)}:'
+    cached = cache.get_many([f'{prefix}{qid}' for qid in question_ids])
+    keys = {key.question_id: key for key in cached.values()}
+
+    missing = question_ids.difference(keys)
+    if missing:
+        questions = Question.objects.only('id', 'question_type', 'correct_answer', 'marks').in_bulk(missing)
+        compiled = {qid: compile_answer_key(question) for qid, question in questions.items()}
+        cache.set_many(
+            {f'{prefix}{qid}': key for qid, key in compiled.items()},
+            ANSWER_KEY_CACHE_TIMEOUT,
+        )
+        keys.update(compiled)
+    return keys
+
+
+def is_unanswered(answer):
+    return answer is None or answer == '' or answer == []
+
+
+def check_answer(key, answer):
+    if key.question_type == 'MSQ':
+        return letters_to_mask(answer) == key.mask
+    if key.low is not None:
+        value = _parse_number(answer)
+        return value is not None and key.low - NAT_TOLERANCE <= value <= key.high + NAT_TOLERANCE
+    if key.choice:
+        return str(answer).strip().upper() == key.choice
+    return str(answer).strip() == key.text
+
+
+def grade_with_keys(keys, question_ids, answers, negative_marking=True, excluded_ids=()):
+    """
+    Grades one answer sheet against already-loaded answer keys.
+    `answers` maps question IDs (str or int) to the given answer; questions in
+    `excluded_ids` (e.g. answers revealed during practice) score nothing and
+    do not count towards the total.
+    """
+    excluded_ids = {int(qid) for qid in excluded_ids}
+    total_marks = 0
+    correct_count = 0
+    positive_marks = 0
+    negative_marks = 0.0
+    responses = []
+
+    for question_id in question_ids:
+        key = keys.get(int(question_id))
+        if key is None:
+            continue
+        answer = answers.get(str(key.question_id), answers.get(key.question_id))
+
+        if key.question_id in excluded_ids:
+            responses.append(GradedResponse(key.question_id, answer, False, 0))
+            continue
+        total_marks += key.marks
+        if is_unanswered(answer):
+            responses.append(GradedResponse(key.question_id, answer, False, 0))
+            continue
+
+        if check_answer(key, answer):
+            correct_count += 1
+            positive_marks += key.marks
+            responses.append(GradedResponse(key.question_id, answer, True, key.marks))
+        elif negative_marking and key.penalty:
+            negative_marks += key.penalty
+            responses.append(GradedResponse(key.question_id, answer, False, -key.penalty))
+        else:
+            responses.append(GradedResponse(key.question_id, answer, False, 0))
+
+    return GradedSheet(
+        score=positive_marks - negative_marks if negative_marks else positive_marks,
+        total_marks=total_marks,
+        correct_count=correct_count,
+        positive_marks=positive_marks,
+        negative_marks=negative_marks,
+        responses=responses,
+    )
+
+
+def grade_sheet(question_ids, answers, negative_marking=True, excluded_ids=()):
+    question_ids = list(question_ids)
+    return grade_with_keys(get_answer_keys(question_ids), question_ids, answers, negative_marking, excluded_ids)
+
+
+def grade_sheets(sheets, negative_marking=True):
+    """
+    Batch grading: `sheets` is an iterable of (question_ids, answers) pairs.
+    All answer keys are loaded once up front, so regrading thousands of
+    sheets costs one cache round-trip plus at most one query.
+    """
+    sheets = [(list(question_ids), answers) for question_ids, answers in sheets]
+    keys = get_answer_keys({qid for question_ids, _ in sheets for qid in question_ids})
+    return [grade_with_keys(keys, question_ids, answers, negative_marking) for question_ids, answers in sheets]
@@ -0,0 +1,147 @@
+# File: backend/api/images.py
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from .imaging import VARIANT_FORMATS, render_variants
+from .models import ImageVariant
+from .tasks import enqueue_once
+
+QUESTION_IMAGE_FIELDS = (
+    'question_image', 'option_a_image', 'option_b_image', 'option_c_image', 'option_d_image', 'explanation_image',
+)
+
+VARIANT_DIR = 'image_variants'
+VARIANT_EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+
+
+def variant_widths():
+    return tuple(getattr(settings, 'IMAGE_VARIANT_WIDTHS', (320, 640, 1024)))
+
+
+def variant_quality():
+    return getattr(settings, 'IMAGE_VARIANT_QUALITY', 80)
+
+
+def variant_name(source_hash, fmt, width):
+    return f"{VARIANT_DIR}/{source_hash[:2]}/{source_hash[:20]}-{width}w.{VARIANT_EXTENSIONS[fmt]}"
+
+
+def question_image_names(questions):
+    """Storage names of every image attached to `questions` (model instances)."""
+    names = set()
+    for question in questions:
+        for field in QUESTION_IMAGE_FIELDS:
+            image = getattr(question, field)
+            if image:
+                names.add(image.name)
+    return names
+
+
+# --- Generating ---
+
+def save_variants(source, source_hash, rendered):
+    """Stores rendered variants under content-hashed names and replaces the source's ImageVariant rows."""
+    rows = []
+    for fmt, width, content in rendered:
+        name = variant_name(source_hash, fmt, width)
+        if not default_storage.exists(name):
+            name = default_storage.save(name, ContentFile(content))
+        rows.append(ImageVariant(source=source, source_hash=source_hash, format=fmt, width=width,
+                                 name=name, size=len(content)))
+    with transaction.atomic():
+        ImageVariant.objects.filter(source=source).delete()
+        ImageVariant.objects.bulk_create(rows)
+
+
+def read_source(name):
+    with default_storage.open(name, 'rb') as f:
+        return f.read()
+
+
+def generate_variants(sources, processes=None, batch_size=32):
+    """
+    Renders and stores variants for each storage name in `sources`. With more than one
+    process the Pillow work runs in a process pool, `batch_size` originals at a time.
+    Yields (source, error or None) as each one finishes.
+    """
+    widths, quality = variant_widths(), variant_quality()
+    sources = iter(sources)
+    executor = ProcessPoolExecutor(max_workers=processes) if processes != 1 else None
+    try:
+        while batch := list(islice(sources, batch_size)):
+            pending = []
+            for source in batch:
+                try:
+                    data = read_source(source)
+                except OSError as e:
+                    yield source, e
+                    continue
+                if executor:
+                    pending.append((source, executor.submit(render_variants, data, widths, quality)))
+                else:
+                    pending.append((source, data))
+            for source, job in pending:
+                try:
+                    source_hash, rendered = job.result() if executor else render_variants(job, widths, quality)
+                    save_variants(source, source_hash, rendered)
+                except (OSError, ValueError) as e:
+                    # Unreadable or corrupt images (PIL.UnidentifiedImageError is an OSError)
+                    yield source, e
+                else:
+                    yield source, None
+    finally:
+        if executor:
+            executor.shutdown()
+
+
+def missing_variant_sources(names):
+    return set(names) - set(ImageVariant.objects.filter(source__in=names).values_list('source', flat=True))
+
+
+def schedule_variants(names):
+    """
+    Once the current transaction commits, queues rendering of variants for those of
+    `names` that have none yet; cached question payloads are re-rendered afterwards.
+    """
+    def start():
+        missing = missing_variant_sources(names)
+        if missing:
+            enqueue_once('images.render_variants', {'names': sorted(missing)})
+
+    if names and getattr(settings, 'IMAGE_VARIANTS_ON_UPLOAD', True):
+        transaction.on_commit(start)
+
+
+# --- Serving ---
+
+def variants_for(names):
+    """{source name: {format: [(width, variant name)] by width}} for the given originals, in one query."""
+    variants = {}
+    names = [name for name in names if name]
+    if not names:
+        return variants
+    rows = ImageVariant.objects.filter(source__in=names).order_by('width').values_list('source', 'format', 'width', 'name')
+    for source, fmt, width, name in rows:
+        variants.setdefault(source, {}).setdefault(fmt, []).append((width, name))
+    return variants
+
+
+def media_url(name, host=''):
+    url = default_storage.url(name)
+    return url if '://' in url else host + url
+
+
+def srcsets(variants, host=''):
+    """One variants_for() entry -> {'webp': 'url 320w, url 640w', 'jpeg': ...}, or None without variants."""
+    if not variants:
+        return None
+    return {
+        fmt: ', '.join(f"{media_url(name, host)} {width}w" for width, name in variants[fmt])
+        for fmt in VARIANT_FORMATS if fmt in variants
+    }
@@ -0,0 +1,57 @@
+# File: backend/api/imaging.py
+#
+# Pure Pillow helpers. generate_image_variants runs render_variants in worker
+# processes, which import this module on its own, so nothing here may touch Django.
+
+import hashlib
+import io
+
+from PIL import Image, ImageOps
+
+VARIANT_FORMATS = ('webp', 'jpeg')
+
+SAVE_OPTIONS = {
+    'webp': {'format': 'WEBP', 'method': 4},
+    'jpeg': {'format': 'JPEG', 'optimize': True, 'progressive': True},
+}
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _for_format(image, fmt):
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    if fmt == 'jpeg':
+        if has_alpha:
+            # JPEG has no alpha channel: flatten onto white, like the page background
+            rgba = image.convert('RGBA')
+            flat = Image.new('RGB', rgba.size, (255, 255, 255))
+            flat.paste(rgba, mask=rgba.getchannel('A'))
+            return flat
+        return image if image.mode == 'RGB' else image.convert('RGB')
+    wanted = 'RGBA' if has_alpha else 'RGB'
+    return image if image.mode == wanted else image.convert(wanted)
+
+
+def render_variants(data, widths, quality):
+    """
+    Resizes an image (original file bytes) to each of `widths`, never upscaling,
+    and encodes every size as WebP and JPEG.
+    Returns (sha256 of the original, [(format, width, encoded bytes)]).
+    """
+    with Image.open(io.BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original)
+        image.load()
+
+    variants = []
+    for width in sorted({min(w, image.width) for w in widths}):
+        if width == image.width:
+            resized = image
+        else:
+            resized = image.resize((width, max(1, round(image.height * width / image.width))), Image.Resampling.LANCZOS)
+        for fmt in VARIANT_FORMATS:
+            buffer = io.BytesIO()
+            _for_format(resized, fmt).save(buffer, quality=quality, **SAVE_OPTIONS[fmt])
+            variants.append((fmt, width, buffer.getvalue()))
+    return content_hash(data), variants
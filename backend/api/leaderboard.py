@@ -0,0 +1,149 @@
+# File: backend/api/leaderboard.py
+
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import LeaderboardEntry
+from .rank_index import log_changes, rank_index_enabled, rank_indexes
+
+
+def record_attempt(attempt):
+    """
+    Folds a completed attempt into the user's overall and per-challenge best scores.
+    Must be called inside the submit transaction; the entry rows are locked while compared.
+    """
+    achieved_at = attempt.end_time or attempt.start_time
+    changed = []
+    for challenge_id in (None, attempt.challenge_id):
+        entry, created = LeaderboardEntry.objects.select_for_update().get_or_create(
+            user_id=attempt.user_id,
+            challenge_id=challenge_id,
+            defaults={'attempt': attempt, 'best_score': attempt.score, 'achieved_at': achieved_at},
+        )
+        if created:
+            changed.append(entry)
+        elif attempt.score > entry.best_score:
+            entry.attempt = attempt
+            entry.best_score = attempt.score
+            entry.achieved_at = achieved_at
+            entry.save(update_fields=['attempt', 'best_score', 'achieved_at'])
+            changed.append(entry)
+
+    if changed and rank_index_enabled():
+        log_changes(changed)
+        transaction.on_commit(lambda: rank_indexes.record(
+            attempt.user_id, attempt.user.username, attempt.challenge_id, attempt.score, achieved_at
+        ))
+
+
+def record_attempts(attempts):
+    """
+    record_attempt for many completed attempts at once (the expiry sweeper): one locking
+    read of the affected entries, then bulk inserts and updates, and the changes logged
+    for the rank indexes under a single version.
+    """
+    best = {}
+    for attempt in attempts:
+        for key in ((attempt.user_id, None), (attempt.user_id, attempt.challenge_id)):
+            # Strictly greater, like record_attempt: the earlier of two equal scores stands
+            if key not in best or attempt.score > best[key].score:
+                best[key] = attempt
+    existing = {
+        (entry.user_id, entry.challenge_id): entry
+        for entry in LeaderboardEntry.objects.select_for_update().filter(
+            Q(challenge__isnull=True) | Q(challenge_id__in={attempt.challenge_id for attempt in attempts}),
+            user_id__in={attempt.user_id for attempt in attempts},
+        )
+    }
+    created, changed = [], []
+    for (user_id, challenge_id), attempt in best.items():
+        achieved_at = attempt.end_time or attempt.start_time
+        entry = existing.get((user_id, challenge_id))
+        if entry is None:
+            created.append(LeaderboardEntry(
+                user_id=user_id, challenge_id=challenge_id, attempt=attempt, best_score=attempt.score, achieved_at=achieved_at,
+            ))
+        elif attempt.score > entry.best_score:
+            entry.attempt = attempt
+            entry.best_score = attempt.score
+            entry.achieved_at = achieved_at
+            changed.append(entry)
+    LeaderboardEntry.objects.bulk_create(created)
+    LeaderboardEntry.objects.bulk_update(changed, ['attempt', 'best_score', 'achieved_at'])
+
+    if (created or changed) and rank_index_enabled():
+        log_changes(created + changed)
+
+
+def scope(challenge_id=None):
+    if challenge_id is None:
+        return LeaderboardEntry.objects.filter(challenge__isnull=True)
+    return LeaderboardEntry.objects.filter(challenge_id=challenge_id)
+
+
+# Board order: best score, then whoever got there first, then the lower user ID
+BOARD_ORDER = ('-best_score', 'achieved_at', 'user_id')
+
+
+def top_entries(limit=100, challenge_id=None):
+    return scope(challenge_id).select_related('user').order_by(*BOARD_ORDER)[:limit]
+
+
+def user_entry(user, challenge_id=None):
+    return scope(challenge_id).filter(user=user).first()
+
+
+def rank_of(entry):
+    # Users with a strictly better best score, counted through the score index
+    return scope(entry.challenge_id).filter(best_score__gt=entry.best_score).count() + 1
+
+
+def around(entry, k=5):
+    """The entry with up to k neighbours on each side, as (position, entry) pairs."""
+    entries = scope(entry.challenge_id)
+    position = entries.filter(
+        Q(best_score__gt=entry.best_score) | Q(best_score=entry.best_score, achieved_at__lt=entry.achieved_at) |
+        Q(best_score=entry.best_score, achieved_at=entry.achieved_at, user_id__lt=entry.user_id)
+    ).count()
+    start = max(position - k, 0)
+    neighbours = entries.select_related('user').order_by(*BOARD_ORDER)[start:position + k + 1]
+    return list(enumerate(neighbours, start + 1))
+
+
+# --- Pages ---
+
+def encode_cursor(score, achieved_at, user_id, position):
+    """An opaque page cursor pointing just past the given entry."""
+    data = json.dumps([score, achieved_at.isoformat(), user_id, position], separators=(',', ':'))
+    return urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """(score, achieved_at, user_id, position) from a page cursor; ValueError if it's malformed."""
+    try:
+        score, achieved_at, user_id, position = json.loads(urlsafe_b64decode(cursor.encode()))
+        return float(score), datetime.fromisoformat(achieved_at), int(user_id), int(position)
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor.") from e
+
+
+def page_after(challenge_id=None, cursor=None, limit=100):
+    """
+    Up to `limit` entries following the cursor's entry in board order, as (position, entry)
+    pairs. The score bound makes it a range scan of the score index starting at the
+    cursor, so a deep page costs the same as the first; positions carry on from the
+    cursor's instead of being counted.
+    """
+    entries = scope(challenge_id).select_related('user').order_by(*BOARD_ORDER)
+    start = 0
+    if cursor is not None:
+        score, achieved_at, user_id, start = cursor
+        entries = entries.filter(best_score__lte=score).filter(
+            Q(best_score__lt=score) | Q(achieved_at__gt=achieved_at) | Q(achieved_at=achieved_at, user_id__gt=user_id)
+        )
+    return list(enumerate(entries[:limit], start + 1))
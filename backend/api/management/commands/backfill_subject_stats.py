@@ -0,0 +1,44 @@
+# File: backend/api/management/commands/backfill_subject_stats.py
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.contrib.auth import get_user_model
+from api.analytics import aggregate_quiz_results
+from api.models import QuizResult, SubjectStats
+from api.utils import lock_for_rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the per-user, per-subject analytics rollups from QuizResult rows, a batch of users at a time.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Number of users processed per transaction.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        user_ids = get_user_model().objects.order_by('id').values_list('id', flat=True)
+        self.stdout.write(self.style.NOTICE("Backfilling subject statistics from quiz results..."))
+
+        last_id = 0
+        users_done = 0
+        rows_written = 0
+        while True:
+            batch = list(user_ids.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            with transaction.atomic():
+                # Aggregated in the rewrite's transaction: a quiz submitted meanwhile waits on the
+                # lock to add itself to the rollup, then lands on the rebuilt rows
+                lock_for_rebuild(SubjectStats)
+                rollups = aggregate_quiz_results(QuizResult.objects.filter(user_id__in=batch))
+                SubjectStats.objects.filter(user_id__in=batch).delete()
+                SubjectStats.objects.bulk_create([
+                    SubjectStats(user_id=user_id, subject=subject, **values)
+                    for (user_id, subject), values in rollups.items()
+                ])
+            last_id = batch[-1]
+            users_done += len(batch)
+            rows_written += len(rollups)
+            self.stdout.write(f"  -> Processed {users_done} users")
+
+        self.stdout.write(self.style.SUCCESS(f"\nBackfill complete. Wrote {rows_written} subject rollups for {users_done} users."))
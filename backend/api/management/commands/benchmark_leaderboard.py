@@ -0,0 +1,79 @@
+# File: backend/api/management/commands/benchmark_leaderboard.py
+
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from api import leaderboard
+from api.models import Challenge, ChallengeAttempt, CustomUser, LeaderboardEntry
+from api.rank_index import RankIndex
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks leaderboard pages at increasing depth on N throwaway attempts of one challenge (rolled back afterwards).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=1_000_000)
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        count, page_size = options['count'], options['page_size']
+        depths = sorted({0, *(depth for depth in (1_000, 10_000, 100_000, count // 2, count - page_size) if 0 < depth < count)})
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            challenge_id = self.seed(count)
+            self.stdout.write(self.style.NOTICE(f"Seeded {count} attempts in {time.perf_counter() - started:.0f} s."))
+
+            board = list(leaderboard.scope(challenge_id).order_by(*leaderboard.BOARD_ORDER)
+                         .values_list('best_score', 'achieved_at', 'user_id').iterator(chunk_size=10000))
+            cursors = {depth: depth and (*board[depth - 1], depth) for depth in depths}
+            index = RankIndex(
+                (user_id, f'bench{user_id}', score, achieved_at) for score, achieved_at, user_id in board
+            )
+            entries = leaderboard.scope(challenge_id).select_related('user').order_by(*leaderboard.BOARD_ORDER)
+
+            self.stdout.write(self.style.NOTICE(f"One page of {page_size} at each depth, best of {options['repeat']} runs:"))
+            for depth in depths:
+                cursor = cursors[depth] or None
+                keyset = self.time(options['repeat'], lambda: leaderboard.page_after(challenge_id, cursor, page_size))
+                offset = self.time(options['repeat'], lambda: list(entries[depth:depth + page_size]))
+                in_process = self.time(options['repeat'], lambda: index.page_after(
+                    cursor and (cursor[0], cursor[1].timestamp(), cursor[2]), page_size))
+                self.stdout.write(
+                    f"  -> position {depth + 1:>9}: keyset {keyset:6.2f} ms | OFFSET {offset:8.2f} ms | rank index {in_process:5.2f} ms"
+                )
+
+            transaction.set_rollback(True)
+
+    def seed(self, count):
+        challenge = Challenge.objects.create(title='Leaderboard benchmark', description='Throwaway')
+        now = timezone.now()
+        users = CustomUser.objects.bulk_create(
+            [CustomUser(username=f'bench{i}', password='!') for i in range(count)], batch_size=5000,
+        )
+        rng = random.Random(0)
+        attempts = ChallengeAttempt.objects.bulk_create([
+            # GATE-like scores in thirds of a mark, so plenty of ties share a score
+            ChallengeAttempt(user=user, challenge=challenge, status='COMPLETED', score=round(rng.randint(-30, 300) / 3, 2),
+                             end_time=now - timedelta(seconds=rng.randint(0, 30 * 24 * 3600)))
+            for user in users
+        ], batch_size=5000)
+        LeaderboardEntry.objects.bulk_create([
+            LeaderboardEntry(user_id=attempt.user_id, challenge=challenge, attempt=attempt,
+                             best_score=attempt.score, achieved_at=attempt.end_time)
+            for attempt in attempts
+        ], batch_size=5000)
+        return challenge.id
+
+    def time(self, repeat, func):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return min(timings) * 1000
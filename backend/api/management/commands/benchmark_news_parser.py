@@ -0,0 +1,115 @@
+# File: backend/api/management/commands/benchmark_news_parser.py
+
+import multiprocessing
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+
+from bs4 import BeautifulSoup
+from django.core.management.base import BaseCommand
+from api.news import STREAM_CHUNK_SIZE, ConfiguredFeedsSource, parse_feed, retention_cutoff
+
+
+def legacy_parse_feed(content, cutoff):
+    # The previous parser: the whole document in BeautifulSoup, find() per field
+    articles = []
+    soup = BeautifulSoup(content, "xml")
+    for item in soup.find_all('item'):
+        pub_date = item.find('pubDate')
+        try:
+            published = datetime.strptime(pub_date.get_text(strip=True), '%a, %d %b %Y %H:%M:%S %Z').replace(tzinfo=timezone.utc)
+        except (AttributeError, ValueError, TypeError):
+            published = datetime.now(timezone.utc)
+        if published < cutoff:
+            continue
+        articles.append({
+            'title': item.find('title').get_text(strip=True) if item.find('title') else "No Title",
+            'link': item.find('link').get_text(strip=True) if item.find('link') else "#",
+            'publication_date': published,
+            'source': item.find('source').get_text(strip=True) if item.find('source') else 'Google News',
+        })
+    return articles
+
+
+class FullFeedSource(ConfiguredFeedsSource):
+    stop_after_old = None
+
+
+def read_memory_kb(field):
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+    return 0
+
+
+def measure(func, queue):
+    # Runs in a forked child: reset the peak-RSS mark, run once, report time and peak growth
+    with open('/proc/self/clear_refs', 'w') as clear_refs:
+        clear_refs.write('5')
+    baseline = read_memory_kb('VmRSS')
+    start = time.perf_counter()
+    count = func()
+    elapsed = time.perf_counter() - start
+    queue.put((elapsed, read_memory_kb('VmHWM') - baseline, count))
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the streaming RSS parser against the previous BeautifulSoup parser on a synthetic feed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=20000)
+        parser.add_argument('--recent', type=float, default=0.1, help='Fraction of items newer than the retention cutoff.')
+
+    def handle(self, *args, **options):
+        cutoff = retention_cutoff()
+        content = self.synthetic_feed(options['items'], options['recent'], cutoff)
+        chunks = lambda: (content[i:i + STREAM_CHUNK_SIZE] for i in range(0, len(content), STREAM_CHUNK_SIZE))
+        streamed = lambda source: sum(1 for item in parse_feed(chunks(), cutoff, source) if item is not None)
+
+        self.stdout.write(self.style.NOTICE(
+            f"Parsing a {len(content) / 1024 / 1024:.1f} MB feed of {options['items']} items "
+            f"({options['recent']:.0%} recent), one forked run each:"
+        ))
+        self.report('before: BeautifulSoup, whole document', lambda: len(legacy_parse_feed(content, cutoff)))
+        self.report('after: streaming, every item', lambda: streamed(FullFeedSource()))
+        self.report('after: streaming, early stop', lambda: streamed(ConfiguredFeedsSource()))
+
+    def synthetic_feed(self, count, recent_fraction, cutoff):
+        # Newest first, like a real feed: the recent items, then older ones
+        recent = int(count * recent_fraction)
+        now = datetime.now(timezone.utc)
+        items = []
+        for i in range(count):
+            if i < recent:
+                published = now - (now - cutoff) * i / max(recent, 1)
+            else:
+                published = cutoff - timedelta(hours=i - recent + 1)
+            items.append(
+                f"<item><title>{escape(f'GATE CS update #{i}: admit cards & results')}</title>"
+                f"<link>https://news.example.com/gate/{i}</link>"
+                f"<guid isPermaLink=\"false\">gate-{i}</guid>"
+                f"<pubDate>{format_datetime(published, usegmt=True)}</pubDate>"
+                f"<description>{escape('<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit.</p>' * 4)}</description>"
+                f"<source url=\"https://news.example.com\">Example News</source></item>"
+            )
+        return (
+            "<?xml version=\"1.0\" encoding=\"UTF-8\"?><rss version=\"2.0\"><channel><title>Synthetic</title>"
+            + ''.join(items) + "</channel></rss>"
+        ).encode()
+
+    def report(self, label, func):
+        if not os.path.exists('/proc/self/clear_refs'):
+            start = time.perf_counter()
+            count = func()
+            self.stdout.write(f"  -> {label}: {(time.perf_counter() - start) * 1000:.1f} ms, {count} articles")
+            return
+        ctx = multiprocessing.get_context('fork')
+        queue = ctx.Queue()
+        process = ctx.Process(target=measure, args=(func, queue))
+        process.start()
+        elapsed, peak_kb, count = queue.get()
+        process.join()
+        self.stdout.write(f"  -> {label}: {elapsed * 1000:.1f} ms, peak +{peak_kb / 1024:.1f} MB, {count} articles")
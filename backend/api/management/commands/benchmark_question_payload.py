@@ -0,0 +1,75 @@
+# File: backend/api/management/commands/benchmark_question_payload.py
+
+import json
+import time
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from api.models import Question
+from api.payloads import fragment_cache_keys, render_questions_json
+from api.serializers import QuizQuestionSerializer
+
+
+class LegacyQuizQuestionSerializer(QuizQuestionSerializer):
+    # The pre-normalization behaviour: try json.loads on every row's options
+    def get_options(self, obj):
+        if obj.options:
+            try:
+                return json.loads(obj.options)
+            except (json.JSONDecodeError, TypeError):
+                return obj.options
+        return {}
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks quiz/challenge question serialization on N throwaway questions (rolled back afterwards).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        count = options['count']
+        request = RequestFactory().get('/api/practice/quiz/ALGO/', HTTP_HOST='localhost')
+        options_dict = {'A': 'First option', 'B': 'Second option', 'C': 'Third option', 'D': 'Fourth option'}
+
+        with transaction.atomic():
+            legacy_ids = self.seed(count, json.dumps(options_dict))
+            ids = self.seed(count, options_dict)
+
+            self.stdout.write(self.style.NOTICE(f"Serializing {count} questions, best of {options['repeat']} runs:"))
+            renderer = JSONRenderer()
+            self.report('before: DRF serializer + json.loads (string options)', options['repeat'], lambda: renderer.render(serializers.ListSerializer(
+                child=LegacyQuizQuestionSerializer(), instance=Question.objects.filter(id__in=legacy_ids), context={'request': request}
+            ).data))
+            self.report('DRF serializer (normalized options)', options['repeat'], lambda: renderer.render(QuizQuestionSerializer(
+                Question.objects.filter(id__in=ids), many=True, context={'request': request}
+            ).data))
+            self.report('after: fragment path, cold cache', options['repeat'], lambda: render_questions_json(ids, request),
+                        setup=lambda: cache.delete_many(fragment_cache_keys(ids)))
+            self.report('after: fragment path, warm cache', options['repeat'], lambda: render_questions_json(ids, request))
+
+            # The IDs are rolled back and may be reused, so their fragments can't outlive the benchmark
+            cache.delete_many(fragment_cache_keys(ids))
+            transaction.set_rollback(True)
+
+    def seed(self, count, options_value):
+        questions = Question.objects.bulk_create([
+            Question(subject='ALGO', topic='Benchmark', question_type='MCQ', question_text=f'Benchmark question {i}?',
+                     options=options_value, correct_answer='A', marks=1)
+            for i in range(count)
+        ], batch_size=2000)
+        return [q.id for q in questions]
+
+    def report(self, label, repeat, func, setup=None):
+        timings = []
+        for _ in range(repeat):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        self.stdout.write(f"  -> {label}: {min(timings) * 1000:.1f} ms")
@@ -0,0 +1,48 @@
+# File: backend/api/management/commands/check_subject_stats.py
+
+from django.core.management.base import BaseCommand
+from api.analytics import STATS_FIELDS, aggregate_quiz_results, stats_match
+from api.models import QuizResult, SubjectStats
+
+
+class Command(BaseCommand):
+    help = 'Compares the analytics rollups against the raw QuizResult rows and reports (or fixes) any drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, default=None, help='Only check the user with this ID.')
+        parser.add_argument('--fix', action='store_true', help='Overwrite mismatching rollups with the recomputed values.')
+
+    def handle(self, *args, **options):
+        results = QuizResult.objects.all()
+        stats = SubjectStats.objects.all()
+        if options['user']:
+            results = results.filter(user_id=options['user'])
+            stats = stats.filter(user_id=options['user'])
+
+        expected = aggregate_quiz_results(results)
+        actual = {(s.user_id, s.subject): s for s in stats}
+
+        mismatches = []
+        for key in expected.keys() | actual.keys():
+            row = actual.get(key)
+            values = expected.get(key)
+            if values is None or row is None or not stats_match(values, {f: getattr(row, f) for f in STATS_FIELDS}):
+                mismatches.append((key, values, row))
+
+        for (user_id, subject), values, row in mismatches:
+            self.stdout.write(self.style.WARNING(
+                f"  -> user {user_id} / {subject}: rollup "
+                f"{({f: getattr(row, f) for f in STATS_FIELDS} if row else None)} != raw {values}"
+            ))
+            if not options['fix']:
+                continue
+            if values is None:
+                row.delete()
+            else:
+                SubjectStats.objects.update_or_create(user_id=user_id, subject=subject, defaults=values)
+
+        if mismatches:
+            action = "Fixed" if options['fix'] else "Found"
+            self.stdout.write(self.style.ERROR(f"\n{action} {len(mismatches)} inconsistent rollups out of {len(expected)}."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"\nAll {len(expected)} rollups match the raw quiz results."))
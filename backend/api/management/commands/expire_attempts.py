@@ -0,0 +1,34 @@
+# File: backend/api/management/commands/expire_attempts.py
+
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from api.attempts import expire_attempts
+
+
+class Command(BaseCommand):
+    help = 'Auto-submits challenge attempts whose time ran out, grading the answers autosaved before the deadline.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200, help='Attempts closed per transaction.')
+        parser.add_argument('--interval', type=int, default=None, help='Keep running, sweeping every this many seconds.')
+
+    def handle(self, *args, **options):
+        stopping = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stopping.set())
+
+        while not stopping.is_set():
+            close_old_connections()
+            total = 0
+            for batch, (closed, seconds) in enumerate(expire_attempts(options['batch_size']), start=1):
+                total += closed
+                self.stdout.write(f"  -> Batch {batch}: closed {closed} attempts in {seconds * 1000:.0f} ms.")
+                if stopping.is_set():
+                    break
+            self.stdout.write(self.style.SUCCESS(f"Closed {total} expired attempts."))
+            if options['interval'] is None:
+                break
+            stopping.wait(options['interval'])
@@ -0,0 +1,26 @@
+# File: backend/api/management/commands/gc_media.py
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from api.media import collect_garbage, recount_references
+
+
+class Command(BaseCommand):
+    help = 'Recounts media references and deletes uploaded files (and their image variants) that nothing references.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=int, default=None, help='Only delete files unreferenced for this long (default: MEDIA_GC_GRACE_HOURS).')
+        parser.add_argument('--dry-run', action='store_true', help='List what would be deleted without deleting it.')
+
+    def handle(self, *args, **options):
+        grace_hours = options['grace_hours'] if options['grace_hours'] is not None else getattr(settings, 'MEDIA_GC_GRACE_HOURS', 24)
+
+        self.stdout.write(self.style.NOTICE("Recounting media references..."))
+        self.stdout.write(f"  -> Corrected {recount_references()} reference counts")
+
+        deleted = collect_garbage(timedelta(hours=grace_hours), dry_run=options['dry_run'])
+        for name in deleted:
+            self.stdout.write(f"  -> {'Would delete' if options['dry_run'] else 'Deleted'} {name}")
+        self.stdout.write(self.style.SUCCESS(f"\n{len(deleted)} orphaned files {'found' if options['dry_run'] else 'deleted'}."))
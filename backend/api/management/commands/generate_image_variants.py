@@ -0,0 +1,42 @@
+# File: backend/api/management/commands/generate_image_variants.py
+
+import os
+
+from django.core.management.base import BaseCommand
+from api.images import QUESTION_IMAGE_FIELDS, generate_variants, missing_variant_sources
+from api.models import Question
+from api.payloads import invalidate_question_fragments
+
+
+class Command(BaseCommand):
+    help = 'Backfills resized WebP/JPEG variants for question, option and explanation images.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=os.cpu_count(), help='Worker processes for resizing.')
+        parser.add_argument('--force', action='store_true', help='Re-render images that already have variants.')
+
+    def handle(self, *args, **options):
+        sources = set()
+        for field in QUESTION_IMAGE_FIELDS:
+            sources.update(name for name in Question.objects.values_list(field, flat=True).distinct() if name)
+        if not options['force']:
+            sources = missing_variant_sources(sources)
+        if not sources:
+            self.stdout.write(self.style.SUCCESS("All question images already have variants."))
+            return
+
+        self.stdout.write(self.style.NOTICE(f"Rendering variants for {len(sources)} images with {options['processes']} processes..."))
+        done = []
+        failed = 0
+        for source, error in generate_variants(sorted(sources), processes=options['processes']):
+            if error is None:
+                done.append(source)
+                self.stdout.write(f"  -> {source}")
+            else:
+                failed += 1
+                self.stderr.write(self.style.ERROR(f"  -> Failed {source}: {error}"))
+
+        # Cached quiz payloads were rendered without the new srcsets
+        if done:
+            invalidate_question_fragments()
+        self.stdout.write(self.style.SUCCESS(f"\nGenerated variants for {len(done)} images ({failed} failed)."))
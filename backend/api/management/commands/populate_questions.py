@@ -1,9 +1,9 @@
 # File: backend/api/management/commands/populate_questions.py
 
-import json
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from api.models import Question
+from api.search import index_documents, question_document
 
 # The main command class
 class Command(BaseCommand):
@@ -287,7 +287,7 @@ class Command(BaseCommand):
                     difficulty=difficulty_map.get(q_data['difficulty'], 'MEDIUM'),
                     question_type=q_data['type'],
                     question_text=q_data['text'],
-                    options=json.dumps(options_dict),
+                    options=options_dict,
                     correct_answer=str(q_data['answer']),
                     explanation=q_data.get('explanation', ''),
                     marks=marks_for_question
@@ -298,6 +298,8 @@ class Command(BaseCommand):
         if questions_to_create:
             with transaction.atomic():
                 Question.objects.bulk_create(questions_to_create)
+                # bulk_create skips post_save, so index the new questions here
+                index_documents([question_document(q) for q in questions_to_create])
             
             # --- REPORTING ---
             total_created = len(questions_to_create)
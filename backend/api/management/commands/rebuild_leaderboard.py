@@ -0,0 +1,58 @@
+# File: backend/api/management/commands/rebuild_leaderboard.py
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from api.models import ChallengeAttempt, LeaderboardEntry
+from api.rank_index import rank_indexes
+from api.utils import lock_for_rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the leaderboard table from all completed challenge attempts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        self.stdout.write(self.style.NOTICE("Rebuilding leaderboard from completed attempts..."))
+
+        with transaction.atomic():
+            # Aggregated in the same transaction as the rewrite. A submit that completes an attempt
+            # meanwhile waits on the entry lock in record_attempt, then applies it to the new rows
+            lock_for_rebuild(LeaderboardEntry)
+            best, processed = self.aggregate(batch_size)
+            entries = [
+                LeaderboardEntry(user_id=user_id, challenge_id=challenge_id, attempt_id=attempt_id,
+                                 best_score=score, achieved_at=achieved_at)
+                for (user_id, challenge_id), (score, attempt_id, achieved_at) in best.items()
+            ]
+            LeaderboardEntry.objects.all().delete()
+            LeaderboardEntry.objects.bulk_create(entries, batch_size=batch_size)
+        # Tell every worker's in-process rank index to reload
+        rank_indexes.invalidate()
+
+        self.stdout.write(self.style.SUCCESS(f"\nLeaderboard rebuilt with {len(entries)} entries from {processed} attempts."))
+
+    def aggregate(self, batch_size):
+        """{(user_id, challenge_id or None): (score, attempt_id, achieved_at)} and the attempts read."""
+        best = {}
+        last_id = 0
+        processed = 0
+        while True:
+            batch = list(
+                ChallengeAttempt.objects.filter(status='COMPLETED', score__isnull=False, id__gt=last_id)
+                .order_by('id')
+                .values_list('id', 'user_id', 'challenge_id', 'score', 'end_time', 'start_time')[:batch_size]
+            )
+            if not batch:
+                break
+            for attempt_id, user_id, challenge_id, score, end_time, start_time in batch:
+                for key in ((user_id, None), (user_id, challenge_id)):
+                    current = best.get(key)
+                    if current is None or score > current[0]:
+                        best[key] = (score, attempt_id, end_time or start_time)
+            last_id = batch[-1][0]
+            processed += len(batch)
+            self.stdout.write(f"  -> Processed {processed} attempts")
+        return best, processed
@@ -0,0 +1,25 @@
+# File: backend/api/management/commands/rebuild_search_index.py
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from api.models import Question, StudyMaterial
+from api.search import get_backend, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the full-text search index over questions and study materials.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        if backend is None:
+            self.stderr.write(self.style.ERROR(f"Full-text search isn't supported on the '{connection.vendor}' backend."))
+            return
+
+        self.stdout.write(self.style.NOTICE("Rebuilding search index..."))
+        with connection.cursor() as cursor:
+            backend.create(cursor)
+        indexed = rebuild_index(Question.objects.all(), StudyMaterial.objects.all(), batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"\nSearch index rebuilt with {indexed} documents."))
@@ -0,0 +1,64 @@
+# File: backend/api/management/commands/recompute_predicted_ranks.py
+
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+from api.attempts import invalidate_results
+from api.models import Challenge, ChallengeAttempt, ScoreBucket
+from api.ranks import ScoreDistribution, distributions, gate_rank_table, np, predict_ranks, score_bucket
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the per-challenge score histograms and recomputes predicted_rank for every completed attempt.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--challenge', type=int, action='append', help='Only this challenge (repeatable).')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Attempts updated per query.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        challenge_ids = options['challenge'] or list(Challenge.objects.order_by('id').values_list('id', flat=True))
+        self.stdout.write(self.style.NOTICE(
+            f"Recomputing predicted ranks ({'NumPy' if np is not None else 'bisect per attempt'}, "
+            f"{'with' if gate_rank_table() else 'without'} a GATE rank table)..."
+        ))
+
+        total = 0
+        for challenge_id in challenge_ids:
+            started = time.perf_counter()
+            with transaction.atomic():
+                rows = list(ChallengeAttempt.objects.filter(challenge_id=challenge_id, status='COMPLETED', score__isnull=False)
+                            .order_by('id').values_list('id', 'score'))
+                ids = [attempt_id for attempt_id, _ in rows]
+                scores = [score for _, score in rows]
+                counts = Counter(score_bucket(score) for score in scores)
+                ScoreBucket.objects.filter(challenge_id=challenge_id).delete()
+                ScoreBucket.objects.bulk_create(
+                    [ScoreBucket(challenge_id=challenge_id, bucket=bucket, count=count) for bucket, count in counts.items()],
+                    batch_size=batch_size,
+                )
+
+                total_marks = None
+                if gate_rank_table() is not None:
+                    marks = dict(
+                        ChallengeAttempt.questions.through.objects.filter(challengeattempt_id__in=ChallengeAttempt.objects.filter(
+                            challenge_id=challenge_id, status='COMPLETED').values('id'))
+                        .values('challengeattempt_id').annotate(total=Sum('question__marks')).values_list('challengeattempt_id', 'total')
+                    )
+                    total_marks = [marks.get(attempt_id) for attempt_id in ids]
+                predicted = predict_ranks(ScoreDistribution(counts), scores, total_marks)
+
+                ChallengeAttempt.objects.bulk_update(
+                    [ChallengeAttempt(id=attempt_id, predicted_rank=rank) for attempt_id, rank in zip(ids, predicted)],
+                    ['predicted_rank'], batch_size=batch_size,
+                )
+            total += len(rows)
+            self.stdout.write(f"  -> Challenge {challenge_id}: {len(rows)} attempts in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+        distributions.invalidate()
+        # Cached result pages still show the old predicted ranks
+        invalidate_results()
+        self.stdout.write(self.style.SUCCESS(f"Recomputed predicted ranks for {total} attempts."))
@@ -0,0 +1,48 @@
+# File: backend/api/management/commands/refill_challenge_pool.py
+
+import time
+from django.core.management.base import BaseCommand
+from api.models import Challenge
+from api.papers import PaperGenerationError, pool_depths, pool_size, pool_watermark, refill_pool
+
+
+class Command(BaseCommand):
+    help = 'Reports the pre-generated paper pool depth for each active challenge and refills pools below the watermark.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=None, help='Number of papers to keep per challenge (default: CHALLENGE_POOL_SIZE).')
+        parser.add_argument('--watermark', type=int, default=None, help='Refill pools holding fewer papers than this (default: CHALLENGE_POOL_WATERMARK).')
+        parser.add_argument('--challenge', type=int, default=None, help='Only process the challenge with this ID.')
+        parser.add_argument('--report', action='store_true', help='Only report pool depths, do not refill.')
+        parser.add_argument('--loop', action='store_true', help='Keep running, checking the pools every --interval seconds.')
+        parser.add_argument('--interval', type=int, default=30)
+
+    def handle(self, *args, **options):
+        size = options['size'] if options['size'] is not None else pool_size()
+        watermark = options['watermark'] if options['watermark'] is not None else pool_watermark()
+
+        while True:
+            self.run_once(size, watermark, options)
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def run_once(self, size, watermark, options):
+        challenges = Challenge.objects.filter(is_active=True)
+        if options['challenge']:
+            challenges = challenges.filter(id=options['challenge'])
+        challenges = list(challenges)
+        depths = pool_depths([c.id for c in challenges])
+
+        for challenge in challenges:
+            depth = depths.get(challenge.id, 0)
+            line = f"  -> [{challenge.id}] {challenge.title}: {depth} papers in pool"
+            if options['report'] or depth >= watermark:
+                self.stdout.write(line)
+                continue
+            try:
+                created = refill_pool(challenge, size)
+            except PaperGenerationError as e:
+                self.stderr.write(self.style.ERROR(f"{line}, refill failed: {e}"))
+                continue
+            self.stdout.write(self.style.SUCCESS(f"{line}, refilled with {created} new papers"))
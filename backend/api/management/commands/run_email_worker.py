@@ -0,0 +1,37 @@
+# File: backend/api/management/commands/run_email_worker.py
+
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from api.outbox import drain_outbox, prune_sent
+
+
+class Command(BaseCommand):
+    help = 'Sends queued emails from the outbox in batches over one SMTP connection, retrying failures with backoff.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=5, help='Seconds between checks of an empty outbox.')
+        parser.add_argument('--batch-size', type=int, default=None, help='Messages claimed per batch (default: EMAIL_OUTBOX_BATCH_SIZE).')
+        parser.add_argument('--once', action='store_true', help='Send what is due and exit.')
+
+    def handle(self, *args, **options):
+        stopping = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stopping.set())
+
+        self.stdout.write(self.style.NOTICE("Email worker started."))
+        while not stopping.is_set():
+            close_old_connections()
+            # The current message always finishes; the batch loop stops before claiming more
+            sent, failed = drain_outbox(options['batch_size'], should_stop=stopping.is_set)
+            if sent or failed:
+                self.stdout.write(f"  -> Sent {sent} emails, {failed} failed.")
+            pruned = prune_sent()
+            if pruned:
+                self.stdout.write(f"  -> Pruned {pruned} sent emails.")
+            if options['once']:
+                break
+            stopping.wait(options['interval'])
+        self.stdout.write(self.style.SUCCESS("Email worker stopped."))
@@ -0,0 +1,54 @@
+# File: backend/api/management/commands/run_news_worker.py
+
+import signal
+import threading
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from api.news import due_targets, feed_targets, next_due_at, prune_articles, refresh_feeds, refresh_interval
+
+
+class Command(BaseCommand):
+    help = 'Keeps news fresh: refreshes each feed when it is due (backing off failing feeds) and prunes old articles.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=None, help='Seconds between fetches of a healthy feed (default: NEWS_REFRESH_INTERVAL).')
+        parser.add_argument('--workers', type=int, default=None, help='Number of feeds fetched concurrently.')
+        parser.add_argument('--once', action='store_true', help='Run a single cycle and exit.')
+
+    def handle(self, *args, **options):
+        interval = options['interval'] or refresh_interval()
+        stopping = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stopping.set())
+
+        self.stdout.write(self.style.NOTICE(f"News worker started, refreshing feeds every ~{interval}s."))
+        while not stopping.is_set():
+            close_old_connections()
+            targets = feed_targets()
+            self.run_cycle(targets, interval, options['workers'])
+            if options['once']:
+                break
+            stopping.wait(self.seconds_until_next(targets, interval))
+        self.stdout.write(self.style.SUCCESS("News worker stopped."))
+
+    def run_cycle(self, targets, interval, workers):
+        due = due_targets(targets)
+        if due:
+            results, new_count = refresh_feeds(due, max_workers=workers, interval=interval)
+            failed = [r for r in results if r.error is not None]
+            for result in failed:
+                self.stderr.write(self.style.ERROR(f"  -> Failed to fetch {result.url}: {result.error}"))
+            self.stdout.write(f"  -> Refreshed {len(results) - len(failed)}/{len(results)} feeds, {new_count} new articles.")
+
+        pruned = prune_articles()
+        if pruned:
+            self.stdout.write(f"  -> Pruned {pruned} articles past the retention window.")
+
+    def seconds_until_next(self, targets, interval):
+        # Sleep until the earliest feed is due, waking at least once per interval to prune
+        next_at = next_due_at(targets)
+        if next_at is None:
+            return 1
+        return max(1, min(interval, (next_at - datetime.now(timezone.utc)).total_seconds()))
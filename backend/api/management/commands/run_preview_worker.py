@@ -0,0 +1,52 @@
+# File: backend/api/management/commands/run_preview_worker.py
+
+import os
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from api.previews import generate_previews, pending_materials
+
+
+class Command(BaseCommand):
+    help = "Fills in page counts, file sizes and first-page thumbnails for new or changed study materials (PDF thumbnails need poppler's pdftoppm)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=os.cpu_count(), help='Worker processes for inspecting files.')
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--interval', type=int, default=60, help='Seconds between checks for new materials.')
+        parser.add_argument('--once', action='store_true', help='Process what is pending and exit.')
+        parser.add_argument('--retry-failed', action='store_true', help='Also retry materials whose preview failed before.')
+
+    def handle(self, *args, **options):
+        stopping = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stopping.set())
+
+        # The highest ID retried so far; batches are in ID order, so every failure up to it has had its retry
+        retried_up_to = 0 if options['retry_failed'] else None
+        self.stdout.write(self.style.NOTICE("Preview worker started."))
+        while not stopping.is_set():
+            close_old_connections()
+            batch = list(pending_materials(retried_up_to)[:options['batch_size']])
+            if batch:
+                if retried_up_to is not None:
+                    retried_up_to = max(retried_up_to, batch[-1].pk)
+                self.process(batch, options['processes'], stopping)
+                continue
+            if options['once']:
+                break
+            stopping.wait(options['interval'])
+        self.stdout.write(self.style.SUCCESS("Preview worker stopped."))
+
+    def process(self, batch, processes, stopping):
+        for material, error in generate_previews(batch, processes=processes):
+            if error is None:
+                material.refresh_from_db(fields=['page_count', 'file_size'])
+                self.stdout.write(f"  -> {material.title}: {material.page_count or '?'} pages, {material.file_size} bytes")
+            else:
+                self.stderr.write(self.style.ERROR(f"  -> Failed {material.title}: {error}"))
+            if stopping.is_set():
+                # Finished previews are already saved; the rest are picked up on the next run
+                break
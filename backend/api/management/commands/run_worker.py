@@ -0,0 +1,40 @@
+# File: backend/api/management/commands/run_worker.py
+
+import json
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from api.tasks import Worker, queue_metrics
+
+
+class Command(BaseCommand):
+    help = 'Runs queued background tasks (api/tasks.py) on a thread or process pool.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=getattr(settings, 'TASK_WORKER_CONCURRENCY', 4), help='Tasks run at once.')
+        parser.add_argument('--pool', choices=['thread', 'process'], default='thread', help='Threads for I/O-bound tasks, processes for CPU-bound ones.')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds between checks of an empty queue.')
+        parser.add_argument('--once', action='store_true', help='Run the tasks that are due and exit.')
+        parser.add_argument('--schedule', action='store_true', help='Also queue the periodic TASK_SCHEDULE tasks as they come due.')
+        parser.add_argument('--metrics', action='store_true', help='Print queue depth and latency as JSON and exit.')
+
+    def handle(self, *args, **options):
+        if options['metrics']:
+            self.stdout.write(json.dumps(queue_metrics(), indent=2))
+            return
+
+        stopping = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stopping.set())
+
+        close_old_connections()
+        worker = Worker(
+            concurrency=options['concurrency'], pool=options['pool'], poll_interval=options['poll_interval'],
+            log=lambda message: self.stdout.write(f"  -> {message}"), schedule=options['schedule'],
+        )
+        self.stdout.write(self.style.NOTICE(f"Task worker {worker.worker_id} started ({options['concurrency']} {options['pool']}s)."))
+        worker.run(stopping, once=options['once'])
+        self.stdout.write(self.style.SUCCESS("Task worker stopped."))
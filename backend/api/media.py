@@ -0,0 +1,139 @@
+# File: backend/api/media.py
+
+import os
+from collections import Counter
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .analytics import increment_row
+from .images import QUESTION_IMAGE_FIELDS, VARIANT_DIR
+from .models import ImageVariant, Question, StoredFile, StudyMaterial
+from .storage import CAS_PREFIX, media_storages
+
+MEDIA_FIELDS = (
+    (Question, QUESTION_IMAGE_FIELDS),
+    (StudyMaterial, ('file', 'thumbnail')),
+)
+
+
+def fields_for(model):
+    return dict(MEDIA_FIELDS)[model]
+
+
+def instance_file_names(instance):
+    return Counter(name for name in (getattr(instance, field).name for field in fields_for(type(instance))) if name)
+
+
+# --- Reference counting ---
+
+def remember_file_names(instance):
+    """pre_save: notes which files the row referenced before this save."""
+    fields = fields_for(type(instance))
+    row = type(instance).objects.filter(pk=instance.pk).values_list(*fields).first() if instance.pk else None
+    instance._stored_file_names = Counter(name for name in (row or ()) if name)
+
+
+def track_references(instance, deleted=False):
+    """post_save/post_delete: moves reference counts from the row's old files to its new ones."""
+    old = getattr(instance, '_stored_file_names', Counter())
+    new = Counter() if deleted else instance_file_names(instance)
+    adjust_references(new - old, old - new)
+    instance._stored_file_names = new
+
+
+def adjust_references(added, removed):
+    now = timezone.now()
+    for name, count in added.items():
+        increment_row(StoredFile, {'name': name}, {'ref_count': count}, extra_updates={'updated_at': now})
+    for name, count in removed.items():
+        StoredFile.objects.filter(name=name).update(ref_count=Greatest(F('ref_count') - count, 0), updated_at=now)
+
+
+def count_references():
+    """{file name: references} counted straight from the Question and StudyMaterial tables."""
+    counts = Counter()
+    for model, fields in MEDIA_FIELDS:
+        for row in model.objects.values_list(*fields).iterator(chunk_size=2000):
+            counts.update(name for name in row if name)
+    return counts
+
+
+def recount_references():
+    """
+    Resets every StoredFile count to the true number of references, covering
+    writes that bypass signals (update(), bulk_create). Returns the rows changed.
+    """
+    counts = count_references()
+    stored = dict(StoredFile.objects.values_list('name', 'ref_count'))
+    now = timezone.now()
+    changed = [
+        StoredFile(name=name, ref_count=counts.get(name, 0), updated_at=now)
+        for name in counts.keys() | stored.keys()
+        if counts.get(name, 0) != stored.get(name)
+    ]
+    StoredFile.objects.bulk_create(
+        changed, batch_size=1000, update_conflicts=True, unique_fields=['name'], update_fields=['ref_count', 'updated_at'],
+    )
+    return len(changed)
+
+
+# --- Garbage collection ---
+
+def collect_garbage(grace=timedelta(hours=24), dry_run=False):
+    """
+    Deletes media nothing references any more, once it has been unreferenced for
+    `grace`: files whose StoredFile count is zero (with their image variants), and
+    content-addressed files or variants with no row at all (e.g. from a save that
+    rolled back). Run recount_references() first. Returns the deleted names.
+    """
+    cutoff = timezone.now() - grace
+    deleted = []
+
+    orphans = list(StoredFile.objects.filter(ref_count=0, updated_at__lt=cutoff).values_list('name', flat=True))
+    tracked = set(StoredFile.objects.values_list('name', flat=True))
+    for storage in media_storages():
+        for name in orphans:
+            if storage.exists(name):
+                deleted.append(name)
+                if not dry_run:
+                    storage.delete(name)
+        for name in walk_files(storage, CAS_PREFIX):
+            if name not in tracked and storage.get_modified_time(name) < cutoff:
+                deleted.append(name)
+                if not dry_run:
+                    storage.delete(name)
+
+    variants = ImageVariant.objects.filter(source__in=orphans)
+    # Variant files are shared between identical originals; keep those another original still uses
+    variant_files = set(variants.values_list('name', flat=True)) - set(
+        ImageVariant.objects.exclude(source__in=orphans).filter(name__in=variants.values('name')).values_list('name', flat=True)
+    )
+    if not dry_run:
+        variants.delete()
+        StoredFile.objects.filter(name__in=orphans, ref_count=0).delete()
+    for name in variant_files:
+        if default_storage.exists(name):
+            deleted.append(name)
+            if not dry_run:
+                default_storage.delete(name)
+    known_variants = set(ImageVariant.objects.values_list('name', flat=True))
+    for name in walk_files(default_storage, VARIANT_DIR):
+        if name not in known_variants and name not in variant_files and default_storage.get_modified_time(name) < cutoff:
+            deleted.append(name)
+            if not dry_run:
+                default_storage.delete(name)
+    return deleted
+
+
+def walk_files(storage, directory):
+    if not storage.exists(directory):
+        return
+    subdirectories, files = storage.listdir(directory)
+    for file_name in files:
+        yield os.path.join(directory, file_name)
+    for subdirectory in subdirectories:
+        yield from walk_files(storage, os.path.join(directory, subdirectory))
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_studymaterial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChallengeResponse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('answer', models.JSONField(blank=True, null=True)),
+                ('is_correct', models.BooleanField(default=False)),
+                ('marks_awarded', models.FloatField(default=0)),
+                ('attempt', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='responses', to='api.challengeattempt')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.question')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('attempt', 'question'), name='unique_response_per_attempt_question')],
+            },
+        ),
+    ]
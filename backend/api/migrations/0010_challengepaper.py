@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_challengeresponse'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChallengePaper',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question_ids', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('challenge', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='papers', to='api.challenge')),
+            ],
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_challengepaper'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('best_score', models.FloatField()),
+                ('achieved_at', models.DateTimeField()),
+                ('attempt', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.challengeattempt')),
+                ('challenge', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='api.challenge')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['challenge', '-best_score', 'achieved_at'], name='leaderboard_score_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'challenge'), name='unique_leaderboard_entry_per_challenge'), models.UniqueConstraint(condition=models.Q(('challenge__isnull', True)), fields=('user',), name='unique_overall_leaderboard_entry')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_cacheversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubjectStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(choices=[('MATH', 'Engineering Mathematics'), ('DL', 'Digital Logic'), ('COA', 'Computer Organization and Architecture'), ('PROG', 'Programming and Data Structures'), ('ALGO', 'Algorithms'), ('TOC', 'Theory of Computation'), ('CD', 'Compiler Design'), ('OS', 'Operating Systems'), ('DB', 'Database Management Systems'), ('CN', 'Computer Networks'), ('GA', 'General Aptitude')], max_length=4)),
+                ('attempts', models.IntegerField(default=0)),
+                ('score_sum', models.IntegerField(default=0)),
+                ('total_marks_sum', models.IntegerField(default=0)),
+                ('accuracy_sum', models.FloatField(default=0)),
+                ('graded_attempts', models.IntegerField(default=0)),
+                ('last_activity', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='quizresult',
+            index=models.Index(fields=['user', '-timestamp'], name='quizresult_user_recent_idx'),
+        ),
+        migrations.AddField(
+            model_name='subjectstats',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subject_stats', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='subjectstats',
+            constraint=models.UniqueConstraint(fields=('user', 'subject'), name='unique_subject_stats_per_user'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_subjectstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySubjectStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(choices=[('MATH', 'Engineering Mathematics'), ('DL', 'Digital Logic'), ('COA', 'Computer Organization and Architecture'), ('PROG', 'Programming and Data Structures'), ('ALGO', 'Algorithms'), ('TOC', 'Theory of Computation'), ('CD', 'Compiler Design'), ('OS', 'Operating Systems'), ('DB', 'Database Management Systems'), ('CN', 'Computer Networks'), ('GA', 'General Aptitude')], max_length=4)),
+                ('day', models.DateField()),
+                ('attempts', models.IntegerField(default=0)),
+                ('score_sum', models.IntegerField(default=0)),
+                ('total_marks_sum', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'day'], name='dailystats_user_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'subject', 'day'), name='unique_daily_stats_per_user_subject')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+import json
+
+from django.db import migrations
+
+
+def normalize_options(apps, schema_editor):
+    """
+    populate_questions used to store options as a json.dumps() string inside the
+    JSONField; decode those once here so readers always get a JSON object.
+    """
+    Question = apps.get_model("api", "Question")
+    to_update = []
+    for question in Question.objects.only("id", "options").iterator(chunk_size=2000):
+        if not isinstance(question.options, str):
+            continue
+        try:
+            question.options = json.loads(question.options)
+        except json.JSONDecodeError:
+            continue
+        to_update.append(question)
+        if len(to_update) >= 2000:
+            Question.objects.bulk_update(to_update, ["options"])
+            to_update = []
+    if to_update:
+        Question.objects.bulk_update(to_update, ["options"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0014_dailysubjectstats"),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_options, migrations.RunPython.noop),
+    ]
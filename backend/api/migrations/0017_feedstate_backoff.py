@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_feedstate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedstate',
+            name='failure_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='feedstate',
+            name='next_fetch_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
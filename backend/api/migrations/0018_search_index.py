@@ -0,0 +1,84 @@
+import os
+
+from django.db import migrations
+
+# The schema as of this migration, written out here rather than imported from api.search
+# so later changes to the app's search code can't change what this migration does.
+CREATE_SQL = {
+    'sqlite': [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS api_search_index USING fts5("
+        "kind UNINDEXED, object_id UNINDEXED, subject UNINDEXED, item_type UNINDEXED, "
+        "title, body, tags, tokenize='porter unicode61')",
+    ],
+    'postgresql': [
+        "CREATE TABLE IF NOT EXISTS api_search_index ("
+        "kind varchar(16) NOT NULL, object_id bigint NOT NULL, subject varchar(4) NOT NULL, "
+        "item_type varchar(4) NOT NULL, title text NOT NULL, body text NOT NULL, tags text NOT NULL, "
+        "document tsvector NOT NULL, PRIMARY KEY (kind, object_id))",
+        "CREATE INDEX IF NOT EXISTS api_search_index_document_idx ON api_search_index USING gin (document)",
+    ],
+}
+
+INSERT_SQL = {
+    # rowid = object_id * 2 + (0 for questions, 1 for materials), as SQLiteSearchBackend keys them
+    'sqlite': "INSERT INTO api_search_index (rowid, kind, object_id, subject, item_type, title, body, tags) "
+              "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+    'postgresql': "INSERT INTO api_search_index (kind, object_id, subject, item_type, title, body, tags, document) "
+                  "VALUES (%s, %s, %s, %s, %s, %s, %s, setweight(to_tsvector('english', %s), 'A') || "
+                  "setweight(to_tsvector('english', %s), 'B') || setweight(to_tsvector('english', %s), 'C'))",
+}
+
+BATCH_SIZE = 2000
+
+
+def documents(apps):
+    for question in apps.get_model('api', 'Question').objects.iterator(chunk_size=BATCH_SIZE):
+        options = question.options if isinstance(question.options, dict) else {}
+        body = '\n'.join(filter(None, [question.question_text, *(str(text) for text in options.values())]))
+        yield ('question', question.pk, question.subject, question.question_type,
+               question.topic, body, question.source_paper or '')
+    for material in apps.get_model('api', 'StudyMaterial').objects.iterator(chunk_size=BATCH_SIZE):
+        yield ('material', material.pk, material.subject, '', material.title,
+               material.description or '', os.path.basename(material.file.name) if material.file else '')
+
+
+def row(vendor, document):
+    kind, object_id, subject, item_type, title, body, tags = document
+    if vendor == 'sqlite':
+        return (object_id * 2 + (kind == 'material'), *document)
+    return (*document, title, body, tags)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in CREATE_SQL:
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for sql in CREATE_SQL[vendor]:
+            cursor.execute(sql)
+        cursor.execute("DELETE FROM api_search_index")
+        batch = []
+        for document in documents(apps):
+            batch.append(row(vendor, document))
+            if len(batch) >= BATCH_SIZE:
+                cursor.executemany(INSERT_SQL[vendor], batch)
+                batch = []
+        if batch:
+            cursor.executemany(INSERT_SQL[vendor], batch)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in CREATE_SQL:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("DROP TABLE IF EXISTS api_search_index")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_feedstate_backoff'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
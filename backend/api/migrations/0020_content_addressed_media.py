@@ -0,0 +1,58 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:18
+
+import api.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_imagevariant'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('ref_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='question',
+            name='explanation_image',
+            field=models.ImageField(blank=True, null=True, storage=api.storage.select_media_storage, upload_to='explanation_images/'),
+        ),
+        migrations.AlterField(
+            model_name='question',
+            name='option_a_image',
+            field=models.ImageField(blank=True, null=True, storage=api.storage.select_media_storage, upload_to='option_images/'),
+        ),
+        migrations.AlterField(
+            model_name='question',
+            name='option_b_image',
+            field=models.ImageField(blank=True, null=True, storage=api.storage.select_media_storage, upload_to='option_images/'),
+        ),
+        migrations.AlterField(
+            model_name='question',
+            name='option_c_image',
+            field=models.ImageField(blank=True, null=True, storage=api.storage.select_media_storage, upload_to='option_images/'),
+        ),
+        migrations.AlterField(
+            model_name='question',
+            name='option_d_image',
+            field=models.ImageField(blank=True, null=True, storage=api.storage.select_media_storage, upload_to='option_images/'),
+        ),
+        migrations.AlterField(
+            model_name='question',
+            name='question_image',
+            field=models.ImageField(blank=True, null=True, storage=api.storage.select_media_storage, upload_to='question_images/'),
+        ),
+        migrations.AlterField(
+            model_name='studymaterial',
+            name='file',
+            field=models.FileField(storage=api.storage.select_media_storage, upload_to='study_materials/'),
+        ),
+    ]
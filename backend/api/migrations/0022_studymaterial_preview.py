@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:21
+
+import api.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_studymaterial_download_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studymaterial',
+            name='file_size',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='studymaterial',
+            name='page_count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='studymaterial',
+            name='preview_error',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='studymaterial',
+            name='preview_source',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='studymaterial',
+            name='thumbnail',
+            field=models.ImageField(blank=True, null=True, storage=api.storage.select_media_storage, upload_to='material_previews/'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_task'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DraftAnswer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('answer', models.JSONField(blank=True, null=True)),
+                ('seq', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField()),
+                ('attempt', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='draft_answers', to='api.challengeattempt')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.question')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('attempt', 'question'), name='unique_draft_answer_per_question')],
+            },
+        ),
+    ]
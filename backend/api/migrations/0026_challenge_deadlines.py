@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:29
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def set_deadlines(apps, schema_editor):
+    # In-progress attempts whose time hasn't run out yet get the default 180-minute limit,
+    # counted from when they started. Older ones were abandoned before deadlines existed:
+    # they keep a NULL deadline, so the expiry sweep never grades them into 0-score results
+    # on the leaderboard and the score histograms; 0033 closes them as ABANDONED.
+    Challenge = apps.get_model('api', 'Challenge')
+    ChallengeAttempt = apps.get_model('api', 'ChallengeAttempt')
+    now = timezone.now()
+    for challenge_id, minutes in Challenge.objects.values_list('id', 'duration_minutes'):
+        ChallengeAttempt.objects.filter(
+            challenge_id=challenge_id, status='IN_PROGRESS', start_time__gt=now - timedelta(minutes=minutes),
+        ).update(deadline=models.F('start_time') + timedelta(minutes=minutes))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0025_draftanswer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='challenge',
+            name='duration_minutes',
+            field=models.PositiveIntegerField(default=180),
+        ),
+        migrations.AddField(
+            model_name='challengeattempt',
+            name='deadline',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='challengeattempt',
+            index=models.Index(condition=models.Q(('status', 'IN_PROGRESS')), fields=['deadline'], name='attempt_open_deadline_idx'),
+        ),
+        migrations.RunPython(set_deadlines, migrations.RunPython.noop),
+    ]
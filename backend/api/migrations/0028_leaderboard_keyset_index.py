@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0027_score_buckets'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='leaderboardentry',
+            name='leaderboard_score_idx',
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['challenge', '-best_score', 'achieved_at', 'user'], name='leaderboard_score_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0028_leaderboard_keyset_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='quizresult',
+            name='quizresult_user_recent_idx',
+        ),
+        migrations.AddIndex(
+            model_name='challenge',
+            index=models.Index(fields=['is_active', '-created_at', '-id'], name='challenge_active_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=models.Index(fields=['-publication_date', '-id'], name='news_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizresult',
+            index=models.Index(fields=['user', '-timestamp', '-id'], name='quizresult_user_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studymaterial',
+            index=models.Index(fields=['-uploaded_at', '-id'], name='material_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studymaterial',
+            index=models.Index(fields=['subject', '-uploaded_at', '-id'], name='material_subject_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:56
+
+import os
+import shutil
+
+import api.storage
+from django.conf import settings
+from django.db import migrations, models
+
+QUESTION_IMAGE_FIELDS = (
+    'question_image', 'option_a_image', 'option_b_image', 'option_c_image', 'option_d_image', 'explanation_image',
+)
+
+
+def relocate(apps, source_root, target_root):
+    # Content-addressed names are shared between rows, so a file that's also a question
+    # image or a thumbnail is copied rather than moved out from under them
+    Question = apps.get_model('api', 'Question')
+    StudyMaterial = apps.get_model('api', 'StudyMaterial')
+    shared = {name for row in Question.objects.values_list(*QUESTION_IMAGE_FIELDS) for name in row if name}
+    shared.update(name for name in StudyMaterial.objects.values_list('thumbnail', flat=True) if name)
+    for name in set(StudyMaterial.objects.exclude(file='').values_list('file', flat=True)):
+        source, target = os.path.join(source_root, name), os.path.join(target_root, name)
+        if not os.path.exists(source):
+            continue
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy2(source, target)
+        if name not in shared:
+            os.remove(source)
+
+
+def make_private(apps, schema_editor):
+    relocate(apps, settings.MEDIA_ROOT, settings.PRIVATE_MEDIA_ROOT)
+
+
+def make_public(apps, schema_editor):
+    relocate(apps, settings.PRIVATE_MEDIA_ROOT, settings.MEDIA_ROOT)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0029_list_cursor_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='studymaterial',
+            name='file',
+            field=models.FileField(storage=api.storage.select_private_storage, upload_to='study_materials/'),
+        ),
+        migrations.RunPython(make_private, make_public),
+    ]
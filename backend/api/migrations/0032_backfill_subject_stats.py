@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:06
+
+from django.db import migrations
+from django.db.models import Case, Count, F, FloatField, Max, Q, Sum, When
+
+
+def backfill_subject_stats(apps, schema_editor):
+    """
+    SubjectStats only counted quizzes submitted after it was added. Rebuilds every rollup
+    from QuizResult history, as backfill_subject_stats does, inside this migration's transaction.
+    """
+    QuizResult = apps.get_model("api", "QuizResult")
+    SubjectStats = apps.get_model("api", "SubjectStats")
+    graded = Q(total_marks__gt=0)
+    rows = QuizResult.objects.order_by().values("user_id", "subject").annotate(
+        attempts=Count("id"),
+        score_sum=Sum("score"),
+        total_marks_sum=Sum("total_marks"),
+        accuracy_sum=Sum(
+            Case(When(graded, then=F("score") * 100.0 / F("total_marks")), default=0.0, output_field=FloatField())
+        ),
+        graded_attempts=Count("id", filter=graded),
+        last_activity=Max("timestamp"),
+    )
+    SubjectStats.objects.all().delete()
+    SubjectStats.objects.bulk_create((SubjectStats(**row) for row in rows.iterator(chunk_size=2000)), batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0031_leaderboard_change_log"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_subject_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:17
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def close_abandoned_attempts(apps, schema_editor):
+    # Attempts 0026 left without a deadline ran out of time before deadlines existed. They're
+    # closed ungraded, ending when their time ran out, rather than left in progress forever;
+    # ABANDONED keeps them off the leaderboard and the score histograms.
+    Challenge = apps.get_model('api', 'Challenge')
+    ChallengeAttempt = apps.get_model('api', 'ChallengeAttempt')
+    DraftAnswer = apps.get_model('api', 'DraftAnswer')
+    now = timezone.now()
+    for challenge_id, minutes in Challenge.objects.values_list('id', 'duration_minutes'):
+        abandoned = ChallengeAttempt.objects.filter(
+            challenge_id=challenge_id, status='IN_PROGRESS', deadline__isnull=True,
+            start_time__lte=now - timedelta(minutes=minutes),
+        )
+        DraftAnswer.objects.filter(attempt__in=abandoned).delete()
+        abandoned.update(
+            status='ABANDONED',
+            deadline=models.F('start_time') + timedelta(minutes=minutes),
+            end_time=models.F('start_time') + timedelta(minutes=minutes),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0032_backfill_subject_stats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='challengeattempt',
+            name='status',
+            field=models.CharField(choices=[('IN_PROGRESS', 'In Progress'), ('COMPLETED', 'Completed'), ('ABANDONED', 'Abandoned')], default='IN_PROGRESS', max_length=12),
+        ),
+        migrations.RunPython(close_abandoned_attempts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:31
+
+from django.db import migrations
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_stats(apps, schema_editor):
+    """
+    DailySubjectStats only counted quizzes submitted after it was added, so trends were empty
+    for earlier history. Rebuilds every bucket from QuizResult, as backfill_daily_stats does,
+    by day in the current time zone, inside this migration's transaction.
+    """
+    QuizResult = apps.get_model("api", "QuizResult")
+    DailySubjectStats = apps.get_model("api", "DailySubjectStats")
+    rows = QuizResult.objects.order_by().values("user_id", "subject", day=TruncDate("timestamp")).annotate(
+        attempts=Count("id"),
+        score_sum=Sum("score"),
+        total_marks_sum=Sum("total_marks"),
+    )
+    DailySubjectStats.objects.all().delete()
+    DailySubjectStats.objects.bulk_create((DailySubjectStats(**row) for row in rows.iterator(chunk_size=2000)), batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0033_close_abandoned_attempts"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_daily_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0034_backfill_daily_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='challengeattempt',
+            index=models.Index(fields=['challenge', 'status', 'score'], name='attempt_chal_status_score_idx'),
+        ),
+    ]
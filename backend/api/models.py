@@ -3,6 +3,9 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
+
+from .storage import select_media_storage, select_private_storage
 
 # ... (Your existing CustomUser model remains here) ...
 class CustomUser(AbstractUser):
@@ -39,22 +42,22 @@ class Question(models.Model):
 
     # --- Question Body (Supports both text and image) ---
     question_text = models.TextField(blank=True, null=True)
-    question_image = models.ImageField(upload_to='question_images/', blank=True, null=True)
+    question_image = models.ImageField(upload_to='question_images/', storage=select_media_storage, blank=True, null=True)
 
     # --- Text-based Options ---
     # For MCQ/MSQ with text options, e.g., {"A": "Option A", "B": "Option B"}
     options = models.JSONField(blank=True, null=True)
 
     # --- Image-based Options (NEW) ---
-    option_a_image = models.ImageField(upload_to='option_images/', blank=True, null=True)
-    option_b_image = models.ImageField(upload_to='option_images/', blank=True, null=True)
-    option_c_image = models.ImageField(upload_to='option_images/', blank=True, null=True)
-    option_d_image = models.ImageField(upload_to='option_images/', blank=True, null=True)
+    option_a_image = models.ImageField(upload_to='option_images/', storage=select_media_storage, blank=True, null=True)
+    option_b_image = models.ImageField(upload_to='option_images/', storage=select_media_storage, blank=True, null=True)
+    option_c_image = models.ImageField(upload_to='option_images/', storage=select_media_storage, blank=True, null=True)
+    option_d_image = models.ImageField(upload_to='option_images/', storage=select_media_storage, blank=True, null=True)
 
     # --- Answer (Text-based) & Explanation (Text or Image) ---
     correct_answer = models.CharField(max_length=200)
     explanation = models.TextField(blank=True, null=True)
-    explanation_image = models.ImageField(upload_to='explanation_images/', blank=True, null=True)
+    explanation_image = models.ImageField(upload_to='explanation_images/', storage=select_media_storage, blank=True, null=True)
 
     # --- Metadata ---
     subject = models.CharField(max_length=4, choices=SUBJECT_CHOICES)
@@ -74,9 +77,54 @@ class QuizResult(models.Model):
     total_marks = models.IntegerField()
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-timestamp', '-id'], name='quizresult_user_recent_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.get_subject_display()} - {self.score}/{self.total_marks}"
     
+class SubjectStats(models.Model):
+    # Running per-user, per-subject totals over QuizResult, maintained on every quiz submit
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='subject_stats')
+    subject = models.CharField(max_length=4, choices=Question.SUBJECT_CHOICES)
+    attempts = models.IntegerField(default=0)
+    score_sum = models.IntegerField(default=0)
+    total_marks_sum = models.IntegerField(default=0)
+    # Sum of per-quiz accuracy (%) over quizzes with total_marks > 0, counted in graded_attempts
+    accuracy_sum = models.FloatField(default=0)
+    graded_attempts = models.IntegerField(default=0)
+    last_activity = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'subject'], name='unique_subject_stats_per_user'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.subject}: {self.attempts} quizzes"
+
+class DailySubjectStats(models.Model):
+    # Per-user, per-subject totals for one calendar day; summed to build week/month trends
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='daily_stats')
+    subject = models.CharField(max_length=4, choices=Question.SUBJECT_CHOICES)
+    day = models.DateField()
+    attempts = models.IntegerField(default=0)
+    score_sum = models.IntegerField(default=0)
+    total_marks_sum = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'subject', 'day'], name='unique_daily_stats_per_user_subject'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'day'], name='dailystats_user_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.subject} on {self.day}"
+
 class NewsArticle(models.Model):
     title = models.CharField(max_length=255)
     link = models.URLField(max_length=255, unique=True) # unique=True prevents duplicate articles
@@ -86,10 +134,91 @@ class NewsArticle(models.Model):
 
     class Meta:
         ordering = ['-publication_date'] # Show newest articles first
+        indexes = [
+            # The news list's cursor ordering
+            models.Index(fields=['-publication_date', '-id'], name='news_recent_idx'),
+        ]
 
     def __str__(self):
         return self.title
     
+class FeedState(models.Model):
+    # HTTP validators from the last successful fetch of each news feed, for conditional GETs
+    url = models.URLField(max_length=500, unique=True)
+    etag = models.CharField(max_length=255, blank=True, default='')
+    last_modified = models.CharField(max_length=64, blank=True, default='')
+    last_status = models.IntegerField(null=True, blank=True)
+    last_fetched_at = models.DateTimeField(null=True, blank=True)
+    # Consecutive failed fetches; the news worker backs off exponentially until next_fetch_at
+    failure_count = models.PositiveIntegerField(default=0)
+    next_fetch_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.url
+
+
+class OutgoingEmail(models.Model):
+    # Outbox written in the same transaction as whatever triggers the mail; run_email_worker sends it
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('SENT', 'Sent'),
+        ('FAILED', 'Failed'),
+    ]
+    to_address = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=7, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveIntegerField(default=0)
+    # When the message may next be sent: a retry after backoff, or the end of a worker's claim
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_by = models.CharField(max_length=32, blank=True, default='')
+    last_error = models.CharField(max_length=255, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_address} ({self.status})"
+
+
+class Task(models.Model):
+    # Background work queued with api.tasks.enqueue() and executed by run_worker
+    STATUS_CHOICES = [
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+    name = models.CharField(max_length=100)
+    kwargs = models.JSONField(default=dict, blank=True)
+    # Higher runs first; within a priority, the earliest run_at
+    priority = models.SmallIntegerField(default=0)
+    run_at = models.DateTimeField(default=timezone.now)
+    status = models.CharField(max_length=7, choices=STATUS_CHOICES, default='QUEUED')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    # The worker running the task and when its lease runs out; expired leases are requeued
+    locked_by = models.CharField(max_length=64, blank=True, default='')
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', '-priority', 'run_at'], name='task_due_idx'),
+            models.Index(fields=['status', 'locked_until'], name='task_lease_idx'),
+            models.Index(fields=['status', 'finished_at'], name='task_finished_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
 class Challenge(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
@@ -101,14 +230,34 @@ class Challenge(models.Model):
 
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Time allowed per attempt; the server closes attempts once it's up (see api/attempts.py)
+    duration_minutes = models.PositiveIntegerField(default=180)
+
+    class Meta:
+        indexes = [
+            # The challenge list's cursor ordering over active challenges
+            models.Index(fields=['is_active', '-created_at', '-id'], name='challenge_active_recent_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+class ChallengePaper(models.Model):
+    # A pre-generated, validated question set waiting to be claimed by a new attempt
+    challenge = models.ForeignKey(Challenge, on_delete=models.CASCADE, related_name='papers')
+    question_ids = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Paper {self.id} for {self.challenge.title}"
+
 class ChallengeAttempt(models.Model):
     STATUS_CHOICES = [
         ('IN_PROGRESS', 'In Progress'),
         ('COMPLETED', 'Completed'),
+        # Left open before deadlines existed and closed ungraded (migration 0033): never on the
+        # leaderboard or in the score histograms
+        ('ABANDONED', 'Abandoned'),
     ]
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     challenge = models.ForeignKey(Challenge, on_delete=models.CASCADE)
@@ -119,22 +268,176 @@ class ChallengeAttempt(models.Model):
     score = models.FloatField(null=True, blank=True)
     predicted_rank = models.IntegerField(null=True, blank=True)
     status = models.CharField(max_length=12, choices=STATUS_CHOICES, default='IN_PROGRESS')
+    # start_time + the challenge's duration; answers arriving after it (plus a grace period) don't count
+    deadline = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Only in-progress attempts are swept for expiry, so only they are indexed
+            models.Index(fields=['deadline'], name='attempt_open_deadline_idx', condition=models.Q(status='IN_PROGRESS')),
+            # A challenge's completed attempts and their scores, as recompute_predicted_ranks
+            # reads them for the score histograms, straight from the index
+            models.Index(fields=['challenge', 'status', 'score'], name='attempt_chal_status_score_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username}'s attempt at {self.challenge.title}"
 
 
+class ChallengeResponse(models.Model):
+    # One graded row per question of a submitted attempt, written once at submit time
+    attempt = models.ForeignKey(ChallengeAttempt, on_delete=models.CASCADE, related_name='responses')
+    question = models.ForeignKey(Question, on_delete=models.CASCADE)
+    answer = models.JSONField(null=True, blank=True)
+    is_correct = models.BooleanField(default=False)
+    marks_awarded = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['attempt', 'question'], name='unique_response_per_attempt_question'),
+        ]
+
+    def __str__(self):
+        return f"Attempt {self.attempt_id} - QID {self.question_id}"
+
+
+class DraftAnswer(models.Model):
+    # Autosaved answer to one question of an in-progress attempt (api/autosave.py); cleared on submit
+    attempt = models.ForeignKey(ChallengeAttempt, on_delete=models.CASCADE, related_name='draft_answers')
+    question = models.ForeignKey(Question, on_delete=models.CASCADE)
+    # Null once the answer has been cleared
+    answer = models.JSONField(null=True, blank=True)
+    # Receive stamp (microseconds) of the delta; an upsert only replaces the row with a newer one
+    seq = models.BigIntegerField(default=0)
+    # When the server received the delta; expiry grading only counts answers received in time
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['attempt', 'question'], name='unique_draft_answer_per_question'),
+        ]
+
+    def __str__(self):
+        return f"Draft for attempt {self.attempt_id} - QID {self.question_id}"
+
+
+class ScoreBucket(models.Model):
+    # Completed attempts per score bucket of a challenge (api/ranks.py), incremented on submit
+    challenge = models.ForeignKey(Challenge, on_delete=models.CASCADE, related_name='score_buckets')
+    # round(score * SCORE_BUCKETS_PER_MARK)
+    bucket = models.IntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['challenge', 'bucket'], name='unique_score_bucket_per_challenge'),
+        ]
+
+    def __str__(self):
+        return f"{self.challenge_id} - bucket {self.bucket}: {self.count}"
+
+
+class LeaderboardEntry(models.Model):
+    # Best completed-attempt score per user: overall when challenge is NULL, otherwise per challenge
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    challenge = models.ForeignKey(Challenge, on_delete=models.CASCADE, null=True, blank=True)
+    attempt = models.ForeignKey(ChallengeAttempt, on_delete=models.CASCADE)
+    best_score = models.FloatField()
+    achieved_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'challenge'], name='unique_leaderboard_entry_per_challenge'),
+            models.UniqueConstraint(fields=['user'], condition=models.Q(challenge__isnull=True), name='unique_overall_leaderboard_entry'),
+        ]
+        indexes = [
+            # Serves the board order and its keyset pages: a page is a range scan from the cursor
+            models.Index(fields=['challenge', '-best_score', 'achieved_at', 'user'], name='leaderboard_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.best_score}"
+
+
+class LeaderboardChange(models.Model):
+    # A new best score, logged under the 'leaderboard' CacheVersion it was committed with,
+    # so other workers' rank indexes replay it instead of reloading whole boards
+    version = models.BigIntegerField(db_index=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    challenge = models.ForeignKey(Challenge, on_delete=models.CASCADE, null=True, blank=True)
+    best_score = models.FloatField()
+    achieved_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"v{self.version} {self.user_id}: {self.best_score}"
+
+
+class CacheVersion(models.Model):
+    # Shared counters that let each worker tell when its in-process caches are stale
+    key = models.CharField(max_length=50, unique=True)
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.key} v{self.version}"
+
+
+class ImageVariant(models.Model):
+    # A resized WebP/JPEG copy of an uploaded image (see api/images.py). Files are named by the
+    # original's content hash, so identical uploads share their variants.
+    source = models.CharField(max_length=255, db_index=True)  # storage name of the original
+    source_hash = models.CharField(max_length=64)
+    format = models.CharField(max_length=4)
+    width = models.PositiveIntegerField()
+    name = models.CharField(max_length=255)
+    size = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'format', 'width'], name='unique_image_variant'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class StoredFile(models.Model):
+    # How many Question/StudyMaterial fields reference each stored media file; gc_media
+    # deletes files left at zero (see api/media.py)
+    name = models.CharField(max_length=255, unique=True)
+    ref_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count})"
+
+
 class StudyMaterial(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True, null=True)
     subject = models.CharField(max_length=4, choices=Question.SUBJECT_CHOICES)
     
     # This field will handle file uploads (PDFs, DOCX, etc.)
-    file = models.FileField(upload_to='study_materials/')
+    file = models.FileField(upload_to='study_materials/', storage=select_private_storage)
     
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    # Written in batches by api/downloads.py
+    download_count = models.PositiveIntegerField(default=0)
+
+    # --- Preview (filled in by run_preview_worker, see api/previews.py) ---
+    file_size = models.BigIntegerField(null=True, blank=True)
+    page_count = models.PositiveIntegerField(null=True, blank=True)
+    thumbnail = models.ImageField(upload_to='material_previews/', storage=select_media_storage, blank=True, null=True)
+    # The file name the preview was made from; a different current name means the file changed
+    preview_source = models.CharField(max_length=255, blank=True, default='')
+    preview_error = models.CharField(max_length=255, blank=True, default='')
 
     class Meta:
         ordering = ['-uploaded_at']
+        indexes = [
+            # The material list's cursor ordering, unfiltered and by subject
+            models.Index(fields=['-uploaded_at', '-id'], name='material_recent_idx'),
+            models.Index(fields=['subject', '-uploaded_at', '-id'], name='material_subject_recent_idx'),
+        ]
 
     def __str__(self):
         return f"{self.get_subject_display()} - {self.title}"
\ No newline at end of file
@@ -0,0 +1,381 @@
+# File: backend/api/news.py
+
+import logging
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import NamedTuple
+from urllib.parse import quote
+
+import requests
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.utils.module_loading import import_string
+from lxml import etree
+from requests.adapters import HTTPAdapter
+
+from .models import FeedState, NewsArticle
+from .utils import bump_cache_version
+
+logger = logging.getLogger(__name__)
+
+# Topics to search for on Google News
+SEARCH_TOPICS = [
+    "GATE CS exam",
+    "GATE computer science",
+    "IISc Bangalore GATE",
+]
+
+GOOGLE_NEWS_SEARCH_URL = "https://news.google.com/rss/search?q={query}&hl=en-IN&gl=IN&ceid=IN:en"
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Bumped whenever stored articles change, so cached news lists in every worker go stale
+NEWS_VERSION_KEY = 'news'
+
+
+class NewsItem(NamedTuple):
+    title: str
+    link: str
+    description: str
+    publication_date: datetime
+    source: str
+
+
+# --- Feed sources ---
+
+NEWS_SOURCES = {}
+
+
+def register_source(source_class):
+    """Class decorator adding a FeedSource to the registry under its `name`."""
+    NEWS_SOURCES[source_class.name] = source_class()
+    return source_class
+
+
+class FeedSource:
+    """
+    A family of RSS feeds. Subclasses list their feed URLs and can override
+    how an <item> element becomes a NewsItem.
+    """
+    name = None
+    label = 'RSS'
+    # Feeds list items newest first, so after this many consecutive items older
+    # than the cutoff the rest of the feed is skipped without being downloaded.
+    stop_after_old = 3
+
+    def urls(self):
+        return []
+
+    def build_item(self, item, published):
+        title = (item.findtext('title') or '').strip() or "No Title"
+        return NewsItem(
+            title=title,
+            link=(item.findtext('link') or '').strip() or "#",
+            description=title,
+            publication_date=published,
+            source=(item.findtext('source') or '').strip() or self.label,
+        )
+
+
+@register_source
+class GoogleNewsSource(FeedSource):
+    name = 'google_news'
+    label = 'Google News'
+    # Search results are ranked by relevance, so old items are interleaved with recent ones
+    stop_after_old = 20
+
+    def urls(self):
+        return [GOOGLE_NEWS_SEARCH_URL.format(query=quote(topic)) for topic in SEARCH_TOPICS]
+
+
+@register_source
+class ConfiguredFeedsSource(FeedSource):
+    """Plain RSS feeds listed in NEWS_FEED_URLS (also used for scrape_news --feed-url)."""
+    name = 'rss'
+
+    def urls(self):
+        return list(getattr(settings, 'NEWS_FEED_URLS', []))
+
+
+def get_source(name):
+    """A registered source name, or the dotted path of a FeedSource subclass."""
+    if name in NEWS_SOURCES:
+        return NEWS_SOURCES[name]
+    return import_string(name)()
+
+
+def feed_targets(source_names=None):
+    """(url, source) pairs for the given sources, by default those enabled in NEWS_SOURCES."""
+    if source_names is None:
+        source_names = getattr(settings, 'NEWS_SOURCES', ['google_news'])
+    targets = []
+    for name in source_names:
+        source = get_source(name)
+        targets.extend((url, source) for url in source.urls())
+    return targets
+
+
+def targets_for_urls(urls, source_name='rss'):
+    source = get_source(source_name)
+    return [(url, source) for url in urls]
+
+
+def retention_cutoff():
+    return datetime.now(timezone.utc) - relativedelta(months=getattr(settings, 'NEWS_RETENTION_MONTHS', 2))
+
+
+def make_session(pool_size):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = 'GATE-Master-News/1.0'
+    return session
+
+
+class FeedResult:
+    def __init__(self, url):
+        self.url = url
+        self.status = None
+        self.etag = ''
+        self.last_modified = ''
+        self.articles = []
+        self.skipped_old = 0
+        self.error = None
+
+    @property
+    def not_modified(self):
+        return self.status == 304
+
+
+# --- Parsing ---
+
+def parse_pub_date(text):
+    """RFC 822 pubDate -> aware datetime; items without a usable date count as new."""
+    try:
+        published = parsedate_to_datetime(text.strip())
+    except (AttributeError, TypeError, ValueError):
+        return datetime.now(timezone.utc)
+    return published if published.tzinfo else published.replace(tzinfo=timezone.utc)
+
+
+def iter_elements(chunks, tag='item'):
+    """
+    Incrementally parses an XML byte stream, yielding each completed `tag`
+    element. Elements are dropped once the consumer moves on, so memory stays
+    bounded by one item rather than the whole document.
+    """
+    parser = etree.XMLPullParser(events=('end',), tag=tag, recover=True, resolve_entities=False, no_network=True)
+
+    def drain():
+        for _, element in parser.read_events():
+            yield element
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from drain()
+    parser.close()
+    yield from drain()
+
+
+def parse_feed(chunks, cutoff, source):
+    """
+    Yields a NewsItem per RSS <item> streamed from `chunks`, or None for items
+    older than `cutoff`. Stops after `source.stop_after_old` old items in a row.
+    """
+    old_in_a_row = 0
+    for item in iter_elements(chunks):
+        published = parse_pub_date(item.findtext('pubDate'))
+        if published < cutoff:
+            yield None
+            old_in_a_row += 1
+            if source.stop_after_old and old_in_a_row >= source.stop_after_old:
+                return
+            continue
+        old_in_a_row = 0
+        yield source.build_item(item, published)
+
+
+# --- Fetching and storing ---
+
+def fetch_feed(session, url, source, state, cutoff, timeout=20):
+    """
+    One conditional GET of a feed; a 304 means nothing changed since the stored
+    validators. The body is parsed as it streams in and abandoned on an early stop.
+    """
+    result = FeedResult(url)
+    headers = {}
+    if state is not None:
+        if state.etag:
+            headers['If-None-Match'] = state.etag
+        if state.last_modified:
+            headers['If-Modified-Since'] = state.last_modified
+    try:
+        with session.get(url, headers=headers, timeout=timeout, stream=True) as response:
+            result.status = response.status_code
+            if response.status_code == 304:
+                return result
+            response.raise_for_status()
+            for article in parse_feed(response.iter_content(STREAM_CHUNK_SIZE), cutoff, source):
+                if article is None:
+                    result.skipped_old += 1
+                else:
+                    result.articles.append(article)
+    except (requests.exceptions.RequestException, etree.XMLSyntaxError) as e:
+        result.error = e
+        return result
+    except Exception as e:
+        # A bug in a source's build_item or a malformed item mustn't abort every other feed's refresh
+        logger.exception("Fetching news feed %s failed.", url)
+        result.error = e
+        return result
+
+    result.etag = response.headers.get('ETag', '')
+    result.last_modified = response.headers.get('Last-Modified', '')
+    return result
+
+
+def save_articles(articles):
+    """
+    Inserts the articles whose link isn't stored yet with one bulk INSERT.
+    Returns the number of new articles.
+    """
+    by_link = {}
+    max_link_length = NewsArticle._meta.get_field('link').max_length
+    for article in articles:
+        # Links are the unique key and must fit the column; a truncated link would be broken
+        if len(article.link) <= max_link_length:
+            by_link.setdefault(article.link, article)
+    if not by_link:
+        return 0
+    existing = set(NewsArticle.objects.filter(link__in=by_link).values_list('link', flat=True))
+    new_articles = [
+        NewsArticle(
+            title=article.title[:255],
+            link=link,
+            description=article.description,
+            publication_date=article.publication_date,
+            source=article.source[:100],
+        )
+        for link, article in by_link.items() if link not in existing
+    ]
+    # ignore_conflicts covers a concurrent run inserting the same link in between
+    NewsArticle.objects.bulk_create(new_articles, ignore_conflicts=True)
+    return len(new_articles)
+
+
+# --- Scheduling ---
+
+def refresh_interval():
+    return getattr(settings, 'NEWS_REFRESH_INTERVAL', 30 * 60)
+
+
+def next_fetch_delay(failure_count, interval=None):
+    """
+    Seconds until a feed is fetched again. Healthy feeds wait `interval` +-10%;
+    failing ones back off exponentially from NEWS_BACKOFF_BASE up to NEWS_BACKOFF_MAX,
+    with half of each delay randomized so feeds that fail together don't retry together.
+    """
+    interval = interval or refresh_interval()
+    if not failure_count:
+        return interval * random.uniform(0.9, 1.1)
+    base = getattr(settings, 'NEWS_BACKOFF_BASE', 60)
+    cap = getattr(settings, 'NEWS_BACKOFF_MAX', 6 * 60 * 60)
+    delay = min(cap, base * 2 ** (failure_count - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def due_targets(targets, now=None):
+    """The targets whose feed has never been fetched or whose next_fetch_at has passed."""
+    now = now or datetime.now(timezone.utc)
+    states = FeedState.objects.in_bulk([url for url, _ in targets], field_name='url')
+    return [
+        (url, source) for url, source in targets
+        if url not in states or states[url].next_fetch_at is None or states[url].next_fetch_at <= now
+    ]
+
+
+def next_due_at(targets):
+    """The earliest next_fetch_at among `targets`, or None if one of them is due now."""
+    states = FeedState.objects.in_bulk([url for url, _ in targets], field_name='url')
+    times = [states[url].next_fetch_at if url in states else None for url, _ in targets]
+    if not times or None in times:
+        return None
+    return min(times)
+
+
+def save_feed_states(results, states, interval=None):
+    """
+    Upserts each feed's fetch outcome. Successful fetches store new validators
+    and reset the failure count; failures keep the old validators and back off.
+    """
+    now = datetime.now(timezone.utc)
+    fetched, unchanged, failed = [], [], []
+    for r in results:
+        if r.error is not None:
+            state = states.get(r.url)
+            failures = (state.failure_count if state else 0) + 1
+            failed.append(FeedState(
+                url=r.url, last_status=r.status, failure_count=failures,
+                next_fetch_at=now + timedelta(seconds=next_fetch_delay(failures, interval)),
+            ))
+            continue
+        row = FeedState(
+            url=r.url, etag=r.etag, last_modified=r.last_modified, last_status=r.status, last_fetched_at=now,
+            failure_count=0, next_fetch_at=now + timedelta(seconds=next_fetch_delay(0, interval)),
+        )
+        (unchanged if r.not_modified else fetched).append(row)
+
+    scheduling = ['last_status', 'failure_count', 'next_fetch_at']
+    for rows, update_fields in (
+        (fetched, ['etag', 'last_modified', 'last_fetched_at', *scheduling]),
+        (unchanged, ['last_fetched_at', *scheduling]),
+        (failed, scheduling),
+    ):
+        if rows:
+            FeedState.objects.bulk_create(rows, update_conflicts=True, unique_fields=['url'], update_fields=update_fields)
+
+
+def prune_articles(cutoff=None, batch_size=None):
+    """Deletes articles published before `cutoff` in batches. Returns the number deleted."""
+    cutoff = cutoff or retention_cutoff()
+    batch_size = batch_size or getattr(settings, 'NEWS_PRUNE_BATCH_SIZE', 1000)
+    deleted = 0
+    while True:
+        ids = list(NewsArticle.objects.filter(publication_date__lt=cutoff).values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+        deleted += NewsArticle.objects.filter(id__in=ids).delete()[0]
+    if deleted:
+        bump_cache_version(NEWS_VERSION_KEY)
+    return deleted
+
+
+def refresh_feeds(targets=None, max_workers=None, cutoff=None, interval=None):
+    """
+    Fetches all (url, source) targets concurrently over one pooled session,
+    then stores new articles and the feeds' validators and schedules.
+    Returns (FeedResults, number of new articles).
+    """
+    targets = feed_targets() if targets is None else list(targets)
+    if not targets:
+        return [], 0
+    cutoff = cutoff or retention_cutoff()
+    max_workers = max_workers or min(len(targets), 8)
+    states = FeedState.objects.in_bulk([url for url, _ in targets], field_name='url')
+
+    with make_session(max_workers) as session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(
+            lambda target: fetch_feed(session, target[0], target[1], states.get(target[0]), cutoff), targets
+        ))
+
+    new_count = save_articles([article for r in results for article in r.articles])
+    save_feed_states(results, states, interval)
+    if new_count:
+        bump_cache_version(NEWS_VERSION_KEY)
+    return results, new_count
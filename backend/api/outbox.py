@@ -0,0 +1,150 @@
+# File: backend/api/outbox.py
+
+import random
+import smtplib
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+
+def queue_email(to_address, subject, body):
+    """
+    Adds a message to the outbox. Call it inside the transaction that makes the mail
+    necessary, so the message exists exactly when the change does.
+    """
+    return OutgoingEmail.objects.create(to_address=to_address, subject=subject, body=body)
+
+
+def retry_delay(attempts):
+    """
+    Seconds before a failed message is tried again: exponential from EMAIL_RETRY_BASE
+    up to EMAIL_RETRY_MAX, with half of each delay randomized.
+    """
+    base = getattr(settings, 'EMAIL_RETRY_BASE', 60)
+    cap = getattr(settings, 'EMAIL_RETRY_MAX', 60 * 60)
+    delay = min(cap, base * 2 ** (attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def is_permanent(error):
+    """5xx replies (unknown mailbox, rejected content) won't succeed on retry."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    return getattr(error, 'smtp_code', 0) >= 500
+
+
+# --- Claiming ---
+
+def claim_batch(batch_size, lease=None):
+    """
+    Claims up to batch_size due messages for this worker by pushing their next_attempt_at
+    past the lease, so concurrent workers never send the same message twice while
+    it's in flight, and a crashed worker's claim simply expires.
+    """
+    now = timezone.now()
+    lease = lease or getattr(settings, 'EMAIL_OUTBOX_LEASE', 5 * 60)
+    token = uuid.uuid4().hex
+    due = OutgoingEmail.objects.filter(status='PENDING', next_attempt_at__lte=now)
+    ids = list(due.order_by('next_attempt_at', 'id').values_list('id', flat=True)[:batch_size])
+    if not ids:
+        return []
+    # The update re-checks the due condition, so rows another worker claimed in between are skipped
+    due.filter(pk__in=ids).update(claimed_by=token, next_attempt_at=now + timedelta(seconds=lease))
+    return list(OutgoingEmail.objects.filter(claimed_by=token, status='PENDING').order_by('id'))
+
+
+def release(messages):
+    """Hands claimed but unsent messages back for an immediate retry."""
+    OutgoingEmail.objects.filter(pk__in=[m.pk for m in messages]).update(claimed_by='', next_attempt_at=timezone.now())
+
+
+def record_failure(message, error, permanent=False):
+    message.attempts += 1
+    message.last_error = f"{type(error).__name__}: {error}"[:255]
+    if permanent or message.attempts >= getattr(settings, 'EMAIL_MAX_ATTEMPTS', 10):
+        message.status = 'FAILED'
+    else:
+        message.next_attempt_at = timezone.now() + timedelta(seconds=retry_delay(message.attempts))
+    message.claimed_by = ''
+    message.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at', 'claimed_by'])
+
+
+# --- Sending ---
+
+def send_batch(connection, messages):
+    """
+    Sends claimed messages over an open connection, recording each outcome. Stops at
+    the first connection-level error and releases the rest. Returns (sent, failed, connection_lost).
+    """
+    sent, failed = [], 0
+    for index, message in enumerate(messages):
+        email = EmailMessage(message.subject, message.body, settings.DEFAULT_FROM_EMAIL, [message.to_address])
+        try:
+            connection.send_messages([email])
+        except smtplib.SMTPServerDisconnected as e:
+            error = e
+        except smtplib.SMTPException as e:
+            # Refused recipient, rejected data, etc.: only this message failed, the session is fine
+            record_failure(message, e, permanent=is_permanent(e))
+            failed += 1
+            continue
+        except OSError as e:
+            error = e
+        else:
+            sent.append(message.pk)
+            continue
+        record_failure(message, error)
+        release(messages[index + 1:])
+        failed += 1
+        break
+    else:
+        error = None
+
+    if sent:
+        OutgoingEmail.objects.filter(pk__in=sent).update(status='SENT', sent_at=timezone.now(), claimed_by='')
+    return len(sent), failed, error is not None
+
+
+def drain_outbox(batch_size=None, connection=None, should_stop=None):
+    """
+    Sends every due message in batches over a single SMTP connection, opened on the
+    first batch and closed when the outbox is empty or the connection breaks.
+    Returns (sent, failed).
+    """
+    batch_size = batch_size or getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 50)
+    connection = connection or get_connection(fail_silently=False)
+    total_sent = total_failed = 0
+    try:
+        while not (should_stop and should_stop()):
+            messages = claim_batch(batch_size)
+            if not messages:
+                break
+            try:
+                # Opened here, send_messages() reuses the session instead of reconnecting per message
+                connection.open()
+            except OSError as e:
+                # Server unreachable or login refused: every claimed message backs off together
+                for message in messages:
+                    record_failure(message, e)
+                total_failed += len(messages)
+                break
+            sent, failed, connection_lost = send_batch(connection, messages)
+            total_sent += sent
+            total_failed += failed
+            if connection_lost:
+                break
+    finally:
+        connection.close()
+    return total_sent, total_failed
+
+
+def prune_sent(retention_days=None):
+    """Deletes sent messages older than EMAIL_OUTBOX_RETENTION_DAYS; failed ones stay for inspection."""
+    days = retention_days if retention_days is not None else getattr(settings, 'EMAIL_OUTBOX_RETENTION_DAYS', 7)
+    deleted, _ = OutgoingEmail.objects.filter(status='SENT', sent_at__lt=timezone.now() - timedelta(days=days)).delete()
+    return deleted
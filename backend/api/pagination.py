@@ -0,0 +1,45 @@
+# File: backend/api/pagination.py
+
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+class RecentFirstPagination(CursorPagination):
+    """
+    Newest-first cursor pages: `next`/`previous` carry the last row's position in the
+    ordering, so every page is an index range scan of the same size however deep it is.
+    The ID breaks ties between rows with the same timestamp.
+    """
+    page_size = getattr(settings, 'API_PAGE_SIZE', 20)
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 100)
+
+
+class NewsPagination(RecentFirstPagination):
+    """News pages are cached by cursor and size alone (NewsArticleListView), so nothing else may change them."""
+    ordering = ('-publication_date', '-id')
+
+    def page_key(self, request):
+        """The decoded cursor position and clamped page size; raises NotFound for a bad cursor."""
+        return f"{tuple(self.decode_cursor(request) or ())}:{self.get_page_size(request)}"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page = super().paginate_queryset(queryset, request, view)
+        # Links carry only the cursor and page size, whatever else the request's query string held
+        self.base_url = request.build_absolute_uri(request.path)
+        if self.page_size_query_param in request.query_params:
+            self.base_url = replace_query_param(self.base_url, self.page_size_query_param, self.page_size)
+        return page
+
+
+class MaterialPagination(RecentFirstPagination):
+    ordering = ('-uploaded_at', '-id')
+
+
+class ChallengePagination(RecentFirstPagination):
+    ordering = ('-created_at', '-id')
+
+
+class QuizHistoryPagination(RecentFirstPagination):
+    ordering = ('-timestamp', '-id')
@@ -0,0 +1,114 @@
+# File: backend/api/papers.py
+
+import random
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Challenge, ChallengeAttempt, ChallengePaper, Question
+from .sampling import question_pool
+from .tasks import enqueue_once
+
+
+class PaperGenerationError(Exception):
+    pass
+
+
+def pool_size():
+    return getattr(settings, 'CHALLENGE_POOL_SIZE', 20)
+
+
+def pool_watermark():
+    return getattr(settings, 'CHALLENGE_POOL_WATERMARK', 5)
+
+
+def generate_paper(challenge):
+    """
+    Builds one question set for `challenge` from the in-memory sampler and
+    validates it against the challenge config. Raises PaperGenerationError
+    if the question bank can't satisfy the config.
+    """
+    question_ids = []
+    for subject_code, count in challenge.config.items():
+        count = int(count)
+        ids = question_pool.sample_existing_ids(subject_code, count)
+        if len(ids) < count:
+            raise PaperGenerationError(
+                f"Not enough questions for subject {subject_code}. Required: {count}, Found: {len(ids)}"
+            )
+        question_ids.extend(ids)
+    if len(set(question_ids)) != len(question_ids):
+        raise PaperGenerationError("Generated paper contains duplicate questions.")
+    return question_ids
+
+
+def pool_depths(challenge_ids=None):
+    """Returns {challenge_id: number of unclaimed papers}."""
+    papers = ChallengePaper.objects.all()
+    if challenge_ids is not None:
+        papers = papers.filter(challenge_id__in=challenge_ids)
+    return dict(papers.order_by().values_list('challenge_id').annotate(depth=Count('id')))
+
+
+def refill_pool(challenge, size=None):
+    """Tops the challenge's pool up to `size` papers. Returns the number created."""
+    size = pool_size() if size is None else size
+    missing = size - pool_depths([challenge.id]).get(challenge.id, 0)
+    if missing <= 0:
+        return 0
+    papers = [ChallengePaper(challenge=challenge, question_ids=generate_paper(challenge)) for _ in range(missing)]
+    ChallengePaper.objects.bulk_create(papers)
+    return len(papers)
+
+
+def claim_paper(challenge):
+    """
+    Takes one paper out of the pool and returns its question IDs, or None if
+    the pool is empty. Claiming is a single-row DELETE, so two concurrent
+    requests can never receive the same paper. A paper holding a question
+    that has since been deleted is thrown away and the next one tried.
+    """
+    candidates = list(
+        ChallengePaper.objects.filter(challenge=challenge).order_by('id').values_list('id', 'question_ids')[:20]
+    )
+    # Spread concurrent claimers across the head of the pool instead of all racing for the first row
+    random.shuffle(candidates)
+    for paper_id, question_ids in candidates:
+        deleted, _ = ChallengePaper.objects.filter(pk=paper_id).delete()
+        if deleted and Question.objects.filter(pk__in=question_ids).count() == len(question_ids):
+            return question_ids
+    return None
+
+
+def link_questions(attempt, question_ids):
+    # One multi-row INSERT into the M2M table; the attempt is new so there is nothing to diff against
+    Through = ChallengeAttempt.questions.through
+    Through.objects.bulk_create([
+        Through(challengeattempt_id=attempt.id, question_id=question_id) for question_id in question_ids
+    ])
+
+
+def challenges_sampling(subjects):
+    """IDs of the challenges whose papers draw on any of `subjects`."""
+    return [challenge_id for challenge_id, config in Challenge.objects.values_list('id', 'config')
+            if set(config or {}) & set(subjects)]
+
+
+def discard_pool(challenge_ids=None):
+    papers = ChallengePaper.objects.all()
+    if challenge_ids is not None:
+        papers = papers.filter(challenge_id__in=challenge_ids)
+    papers.delete()
+
+
+def schedule_refill(challenge):
+    """
+    Once the current transaction commits, queues a refill of the challenge's pool
+    for run_worker if it has dropped below the watermark and none is pending.
+    """
+    def check_and_refill():
+        if pool_depths([challenge.id]).get(challenge.id, 0) < pool_watermark():
+            enqueue_once('challenges.refill_pool', {'challenge_id': challenge.id}, priority=1)
+
+    transaction.on_commit(check_and_refill)
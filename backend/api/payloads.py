@@ -0,0 +1,107 @@
+# File: backend/api/payloads.py
+
+import json
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from rest_framework import serializers
+
+from .images import media_url, srcsets, variants_for
+from .models import Question
+from .utils import bump_cache_version, get_cache_version
+
+# v2: fragments carry the image's variants
+QUESTION_FRAGMENT_CACHE_PREFIX = 'question_fragment:v2:'
+QUESTION_FRAGMENT_CACHE_TIMEOUT = 60 * 60
+# Versions the cached fragments in every worker: bumped when questions or their image variants change
+QUESTION_FRAGMENTS_VERSION_KEY = 'question_fragments'
+
+QUESTION_PAYLOAD_FIELDS = ('id', 'question_text', 'question_image', 'question_type', 'options', 'marks')
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def build_question_fragment(row, variants=None):
+    """
+    Pre-renders one question (a values() row) as the JSON QuizQuestionSerializer
+    would produce. Image URLs depend on the request host, so the fragment is
+    stored as (text before the image, image name or None, its variants, text after it).
+    """
+    options = row['options']
+    if isinstance(options, str):
+        # Rows written before options were normalized to JSON objects
+        try:
+            options = json.loads(options)
+        except json.JSONDecodeError:
+            pass
+    head = '{"id":%d,"question_text":%s,"question_image":' % (row['id'], _dumps(row['question_text']))
+    tail = ',"question_type":%s,"options":%s,"marks":%d}' % (
+        _dumps(row['question_type']), _dumps(options or {}), row['marks']
+    )
+    return (head, row['question_image'] or None, variants, tail)
+
+
+def invalidate_question_fragments():
+    bump_cache_version(QUESTION_FRAGMENTS_VERSION_KEY)
+
+
+def fragment_cache_keys(question_ids):
+    """{cache key: question_id} under the current fragments version."""
+    prefix = f'{QUESTION_FRAGMENT_CACHE_PREFIX}{get_cache_version(QUESTION_FRAGMENTS_VERSION_KEY)}:'
+    return {f'{prefix}{qid}': int(qid) for qid in question_ids}
+
+
+def get_question_fragments(question_ids):
+    """Returns {question_id: fragment}, rendering cache misses from a single values() query."""
+    keys = fragment_cache_keys(question_ids)
+    cached = cache.get_many(keys)
+    fragments = {keys[key]: fragment for key, fragment in cached.items()}
+
+    missing = [qid for qid in question_ids if qid not in fragments]
+    if missing:
+        rows = list(Question.objects.filter(id__in=missing).values(*QUESTION_PAYLOAD_FIELDS))
+        variants = variants_for([row['question_image'] for row in rows])
+        rendered = {row['id']: build_question_fragment(row, variants.get(row['question_image'])) for row in rows}
+        cache_keys = {qid: key for key, qid in keys.items()}
+        cache.set_many(
+            {cache_keys[qid]: fragment for qid, fragment in rendered.items()},
+            QUESTION_FRAGMENT_CACHE_TIMEOUT,
+        )
+        fragments.update(rendered)
+    return fragments
+
+
+def render_questions_json(question_ids, request=None):
+    """
+    The JSON array of QuizQuestionSerializer output for `question_ids`, in that
+    order, assembled from cached fragments. IDs that no longer exist are skipped.
+    """
+    fragments = get_question_fragments(question_ids)
+    host = request.build_absolute_uri('/')[:-1] if request else ''
+    parts = []
+    for qid in question_ids:
+        fragment = fragments.get(qid)
+        if fragment is None:
+            continue
+        head, image, variants, tail = fragment
+        image_json = 'null' if image is None else _dumps(media_url(image, host))
+        parts.append(head + image_json + ',"question_image_srcset":' + _dumps(srcsets(variants, host)) + tail)
+    return '[' + ','.join(parts) + ']'
+
+
+def render_attempt_json(attempt, question_ids, request=None):
+    """The ChallengeAttemptSerializer payload for a freshly started attempt."""
+    head = _dumps({
+        'id': attempt.id,
+        'challenge': attempt.challenge_id,
+        'status': attempt.status,
+        'start_time': serializers.DateTimeField().to_representation(attempt.start_time),
+        'deadline': serializers.DateTimeField().to_representation(attempt.deadline) if attempt.deadline else None,
+    })
+    return head[:-1] + ',"questions":' + render_questions_json(question_ids, request) + '}'
+
+
+def json_response(content, status=200):
+    return HttpResponse(content, content_type='application/json', status=status)
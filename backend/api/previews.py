@@ -0,0 +1,81 @@
+# File: backend/api/previews.py
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db.models import F, Q
+
+from .documents import inspect_document
+from .models import StudyMaterial
+
+
+def thumbnail_width():
+    return getattr(settings, 'MATERIAL_THUMBNAIL_WIDTH', 320)
+
+
+def pending_materials(retry_failed_after=None):
+    """
+    Materials with no preview yet or one made from a different file, in ID order. Failed
+    ones are included too past ID `retry_failed_after`, so a run retries each of them once.
+    """
+    stale = ~Q(preview_source=F('file'))
+    if retry_failed_after is not None:
+        stale |= ~Q(preview_error='') & Q(pk__gt=retry_failed_after)
+    return StudyMaterial.objects.exclude(file='').filter(stale).order_by('id')
+
+
+def save_preview(material_id, source, result=None, error=None):
+    """
+    Stores one material's preview, or what could be made of it alongside the error,
+    unless its file was replaced while it was being processed (the next pass picks the
+    new file up). Returns whether it was stored.
+    """
+    material = StudyMaterial.objects.filter(pk=material_id, file=source).first()
+    if material is None:
+        return False
+    material.preview_source = source
+    # Failed previews are only made again by run_preview_worker --retry-failed
+    material.preview_error = '' if error is None else str(error)[:255]
+    fields = ['preview_source', 'preview_error']
+    if result is not None:
+        material.file_size = result['file_size']
+        material.page_count = result['page_count']
+        if result['thumbnail']:
+            material.thumbnail.save(f'{material.pk}.webp', ContentFile(result['thumbnail']), save=False)
+        else:
+            material.thumbnail = None
+        fields += ['file_size', 'page_count', 'thumbnail']
+    material.save(update_fields=fields)
+    return True
+
+
+def generate_previews(materials, processes=None):
+    """
+    Inspects the materials' files in a process pool, storing each preview as soon
+    as it's ready so an interrupted run loses at most the files in flight.
+    Yields (material, error or None).
+    """
+    width = thumbnail_width()
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        jobs = {}
+        for material in materials:
+            try:
+                path = material.file.path
+            except NotImplementedError as e:
+                save_preview(material.pk, material.file.name, error=e)
+                yield material, e
+                continue
+            jobs[executor.submit(inspect_document, path, width)] = material
+
+        for job in as_completed(jobs):
+            material = jobs[job]
+            try:
+                result = job.result()
+                # Inspected, but without a thumbnail the tooling here couldn't make (no pdftoppm)
+                error = result.pop('error')
+            except Exception as e:
+                # Whatever a damaged or unexpected file raises, record it and move on
+                result, error = None, e
+            save_preview(material.pk, material.file.name, result, error)
+            yield material, error
@@ -0,0 +1,178 @@
+# File: backend/api/rank_index.py
+
+import threading
+import time
+
+from django.conf import settings
+from sortedcontainers import SortedKeyList
+
+from .models import LeaderboardChange, LeaderboardEntry
+from .utils import bump_cache_version, get_cache_version
+
+LEADERBOARD_VERSION_KEY = 'leaderboard'
+
+
+def _sort_key(entry):
+    # Highest score first; on equal scores whoever got there first ranks higher, then the lower user ID
+    score, achieved_at, user_id, _username = entry
+    return (-score, achieved_at, user_id)
+
+
+class RankIndex:
+    """
+    Sorted (score, achieved_at, user_id, username) entries for one leaderboard
+    scope. Top-N, a user's rank and their neighbours are all O(log n).
+    """
+
+    def __init__(self, rows=()):
+        self._entries = SortedKeyList(key=_sort_key)
+        self._by_user = {}
+        for row in rows:
+            self.update(*row)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def update(self, user_id, username, score, achieved_at):
+        achieved_at = achieved_at.timestamp() if hasattr(achieved_at, 'timestamp') else achieved_at
+        current = self._by_user.get(user_id)
+        if current is not None:
+            if score <= current[0]:
+                return
+            self._entries.remove(current)
+        entry = (score, achieved_at, user_id, username)
+        self._entries.add(entry)
+        self._by_user[user_id] = entry
+
+    def top(self, n):
+        return list(self._entries.islice(0, n))
+
+    def entry_for(self, user_id):
+        return self._by_user.get(user_id)
+
+    def rank(self, user_id):
+        """1 + the number of users with a strictly better score, matching the database ranking."""
+        entry = self._by_user.get(user_id)
+        if entry is None:
+            return None
+        return self._entries.bisect_key_left((-entry[0], float('-inf'))) + 1
+
+    def around(self, user_id, k=5):
+        """The user's entry with up to k neighbours on each side, as (position, entry) pairs."""
+        entry = self._by_user.get(user_id)
+        if entry is None:
+            return []
+        position = self._entries.index(entry)
+        start = max(position - k, 0)
+        return list(enumerate(self._entries.islice(start, position + k + 1), start + 1))
+
+    def page_after(self, cursor=None, n=100):
+        """
+        Up to n entries following the cursor's (score, achieved_at, user_id) in board
+        order, as (position, entry) pairs; from the top without a cursor. O(log n + n).
+        """
+        start = 0
+        if cursor is not None:
+            score, achieved_at, user_id = cursor
+            start = self._entries.bisect_key_right((-score, achieved_at, user_id))
+        return list(enumerate(self._entries.islice(start, start + n), start + 1))
+
+
+def log_changes(entries):
+    """
+    Bumps the shared version and logs the changed LeaderboardEntry rows under it. Call
+    inside the transaction that saves them: the version row stays locked until commit,
+    so versions are committed in order and a worker replaying them never skips one.
+    """
+    version = bump_cache_version(LEADERBOARD_VERSION_KEY)
+    LeaderboardChange.objects.bulk_create([
+        LeaderboardChange(version=version, user_id=entry.user_id, challenge_id=entry.challenge_id,
+                          best_score=entry.best_score, achieved_at=entry.achieved_at)
+        for entry in entries
+    ])
+    max_replay = getattr(settings, 'LEADERBOARD_INDEX_MAX_REPLAY', 1000)
+    if version % max_replay == 0:
+        # Workers further behind than this reload anyway, so older changes are never replayed
+        LeaderboardChange.objects.filter(version__lte=version - max_replay).delete()
+    return version
+
+
+class RankIndexRegistry:
+    """
+    One RankIndex per leaderboard scope in this worker, kept current from the
+    LeaderboardChange log. At most every LEADERBOARD_INDEX_CHECK_INTERVAL seconds the
+    shared 'leaderboard' CacheVersion is read and the changes since this worker's
+    version are replayed; the indexes are only dropped and reloaded when that's more
+    than LEADERBOARD_INDEX_MAX_REPLAY versions or a version has no logged changes
+    (invalidate(), or changes already pruned).
+    """
+
+    def __init__(self):
+        self._indexes = {}
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _check_version(self):
+        interval = getattr(settings, 'LEADERBOARD_INDEX_CHECK_INTERVAL', 2)
+        now = time.monotonic()
+        if now - self._checked_at < interval:
+            return
+        version = get_cache_version(LEADERBOARD_VERSION_KEY)
+        self._checked_at = now
+        if version == self._version:
+            return
+        if self._version is None or not self._indexes or not self._replay(version):
+            self._indexes = {}
+        self._version = version
+
+    def _replay(self, version):
+        if not 0 < version - self._version <= getattr(settings, 'LEADERBOARD_INDEX_MAX_REPLAY', 1000):
+            return False
+        changes = list(
+            LeaderboardChange.objects.filter(version__gt=self._version, version__lte=version).order_by('version', 'id')
+            .values_list('version', 'user_id', 'user__username', 'challenge_id', 'best_score', 'achieved_at')
+        )
+        if len({change[0] for change in changes}) != version - self._version:
+            return False
+        for _version, user_id, username, challenge_id, score, achieved_at in changes:
+            index = self._indexes.get(challenge_id)
+            if index is not None:
+                index.update(user_id, username, score, achieved_at)
+        return True
+
+    def get(self, challenge_id=None):
+        with self._lock:
+            self._check_version()
+            index = self._indexes.get(challenge_id)
+            if index is None:
+                entries = LeaderboardEntry.objects.filter(challenge_id=challenge_id) if challenge_id else \
+                    LeaderboardEntry.objects.filter(challenge__isnull=True)
+                rows = entries.values_list('user_id', 'user__username', 'best_score', 'achieved_at').iterator(chunk_size=5000)
+                index = self._indexes[challenge_id] = RankIndex(rows)
+            return index
+
+    def record(self, user_id, username, challenge_id, score, achieved_at):
+        """
+        Applies a local submit to the loaded indexes straight away, after it has committed.
+        Its logged change is replayed again with the others later, which is a no-op.
+        """
+        with self._lock:
+            for scope in (None, challenge_id):
+                index = self._indexes.get(scope)
+                if index is not None:
+                    index.update(user_id, username, score, achieved_at)
+
+    def invalidate(self):
+        """Makes every worker reload its indexes: the new version has no logged changes to replay."""
+        bump_cache_version(LEADERBOARD_VERSION_KEY)
+        with self._lock:
+            self._indexes = {}
+            self._checked_at = 0.0
+
+
+rank_indexes = RankIndexRegistry()
+
+
+def rank_index_enabled():
+    return getattr(settings, 'LEADERBOARD_RANK_INDEX', True)
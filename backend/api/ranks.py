@@ -0,0 +1,215 @@
+# File: backend/api/ranks.py
+
+import csv
+import functools
+import threading
+import time
+from bisect import bisect_right
+from collections import Counter
+from itertools import accumulate
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .analytics import increment_row
+from .models import ScoreBucket
+
+try:
+    import numpy as np
+except ImportError:  # Pinned in requirements.txt; without it predict_ranks falls back to a bisect per attempt
+    np = None
+
+
+def buckets_per_mark():
+    # GATE negative marks are thirds of a mark, so 3 buckets per mark keep every score apart
+    return getattr(settings, 'SCORE_BUCKETS_PER_MARK', 3)
+
+
+def score_bucket(score):
+    return round(score * buckets_per_mark())
+
+
+# --- Score distribution ---
+
+class ScoreDistribution:
+    """
+    Completed-attempt counts per score bucket of one challenge, kept as sorted buckets
+    with cumulative counts so the number of better scores is a bisect, O(log n).
+    """
+
+    def __init__(self, counts=None):
+        self._counts = dict(counts or {})
+        self._build()
+        self.loaded_at = time.monotonic()
+
+    def _build(self):
+        buckets = sorted(self._counts)
+        cumulative = list(accumulate(self._counts[bucket] for bucket in buckets))
+        # Swapped in as one tuple so lookups from other threads never see a half-built state
+        self.state = (buckets, cumulative, cumulative[-1] if cumulative else 0)
+
+    @property
+    def total(self):
+        return self.state[2]
+
+    def add(self, scores):
+        for score in scores:
+            bucket = score_bucket(score)
+            self._counts[bucket] = self._counts.get(bucket, 0) + 1
+        self._build()
+
+    def better_than(self, score):
+        """Attempts that scored strictly higher than `score`."""
+        buckets, cumulative, total = self.state
+        position = bisect_right(buckets, score_bucket(score))
+        return total - (cumulative[position - 1] if position else 0)
+
+    def rank(self, score):
+        return self.better_than(score) + 1
+
+
+class DistributionRegistry:
+    """
+    One ScoreDistribution per challenge in this worker, reloaded from the ScoreBucket
+    rows once it is SCORE_DISTRIBUTION_REFRESH seconds old. Submits in this worker are
+    applied right away; other workers' show up on the next reload.
+    """
+
+    def __init__(self):
+        self._distributions = {}
+        self._lock = threading.Lock()
+
+    def get(self, challenge_id):
+        refresh = getattr(settings, 'SCORE_DISTRIBUTION_REFRESH', 30)
+        with self._lock:
+            distribution = self._distributions.get(challenge_id)
+            if distribution is None or time.monotonic() - distribution.loaded_at >= refresh:
+                counts = ScoreBucket.objects.filter(challenge_id=challenge_id).values_list('bucket', 'count')
+                distribution = self._distributions[challenge_id] = ScoreDistribution(counts)
+            return distribution
+
+    def record(self, challenge_id, scores):
+        with self._lock:
+            distribution = self._distributions.get(challenge_id)
+            if distribution is not None:
+                distribution.add(scores)
+
+    def invalidate(self):
+        with self._lock:
+            self._distributions = {}
+
+
+distributions = DistributionRegistry()
+
+
+# --- Historical GATE ranks ---
+
+class RankTable:
+    """
+    Historical GATE (marks out of 100, rank) points; ranks in between are linearly
+    interpolated after a bisect, and marks outside the table clamp to its ends.
+    """
+
+    def __init__(self, points):
+        by_marks = dict(points)
+        if len(by_marks) < 2:
+            raise ValueError("A rank table needs at least two distinct marks.")
+        self.marks = sorted(by_marks)
+        self.ranks = [by_marks[marks] for marks in self.marks]
+        self.population = max(self.ranks)
+
+    def rank(self, marks):
+        if marks <= self.marks[0]:
+            return self.ranks[0]
+        if marks >= self.marks[-1]:
+            return self.ranks[-1]
+        position = bisect_right(self.marks, marks)
+        low, high = self.marks[position - 1], self.marks[position]
+        low_rank, high_rank = self.ranks[position - 1], self.ranks[position]
+        return low_rank + (high_rank - low_rank) / (high - low) * (marks - low)
+
+
+@functools.lru_cache(maxsize=None)
+def gate_rank_table():
+    """
+    The GATE_RANK_TABLE CSV of `marks,rank` rows (a header row is skipped), read once
+    per process; None when no table is configured.
+    """
+    path = getattr(settings, 'GATE_RANK_TABLE', '')
+    if not path:
+        return None
+    points = []
+    try:
+        with open(path, newline='') as f:
+            for row in csv.reader(f):
+                try:
+                    points.append((float(row[0]), int(float(row[1]))))
+                except (IndexError, ValueError):
+                    if points:
+                        raise ImproperlyConfigured(f"GATE_RANK_TABLE {path}: bad row {row!r}.")
+        return RankTable(points)
+    except (OSError, ValueError) as e:
+        raise ImproperlyConfigured(f"GATE_RANK_TABLE {path}: {e}")
+
+
+def table_weight():
+    return getattr(settings, 'PREDICTED_RANK_TABLE_WEIGHT', 0.5)
+
+
+# --- Prediction ---
+
+def predict_rank(distribution, score, total_marks=None):
+    """
+    The attempt's rank among the challenge's attempts. With a GATE rank table, the
+    historical rank for the same marks out of 100 blended with the attempt's standing
+    here scaled to the table's population.
+    """
+    better = distribution.better_than(score)
+    table = gate_rank_table()
+    if table is None or not total_marks:
+        return better + 1
+    projected = 1 + better / max(distribution.total, 1) * table.population
+    weight = table_weight()
+    return max(1, round(weight * table.rank(score * 100 / total_marks) + (1 - weight) * projected))
+
+
+def predict_ranks(distribution, scores, total_marks=None):
+    """predict_rank for many attempts of one challenge, vectorized with NumPy when it's installed."""
+    if total_marks is None:
+        total_marks = [None] * len(scores)
+    if np is None:
+        return [predict_rank(distribution, score, total) for score, total in zip(scores, total_marks)]
+
+    buckets, cumulative, total = distribution.state
+    if not buckets:
+        return [1] * len(scores)
+    positions = np.searchsorted(np.asarray(buckets), np.rint(np.asarray(scores, dtype=float) * buckets_per_mark()), side='right')
+    better = total - np.where(positions > 0, np.asarray(cumulative)[np.maximum(positions - 1, 0)], 0)
+    table = gate_rank_table()
+    if table is None:
+        return (better + 1).tolist()
+
+    totals = np.asarray([marks_total or 0 for marks_total in total_marks], dtype=float)
+    marks = np.divide(np.asarray(scores, dtype=float) * 100, totals, out=np.zeros_like(totals), where=totals > 0)
+    projected = 1 + better / max(total, 1) * table.population
+    weight = table_weight()
+    blended = np.maximum(1, np.rint(weight * np.interp(marks, table.marks, table.ranks) + (1 - weight) * projected))
+    return np.where(totals > 0, blended, better + 1).astype(int).tolist()
+
+
+def rank_attempts(attempts, total_marks):
+    """
+    Counts newly completed attempts into their challenges' score histograms and sets
+    their predicted_rank (not saved). Call inside the submit transaction.
+    """
+    by_challenge = {}
+    for attempt in attempts:
+        by_challenge.setdefault(attempt.challenge_id, []).append(attempt.score)
+    for challenge_id, scores in by_challenge.items():
+        for bucket, count in Counter(score_bucket(score) for score in scores).items():
+            increment_row(ScoreBucket, {'challenge_id': challenge_id, 'bucket': bucket}, {'count': count})
+        # Applied straight away, so attempts closed together rank against each other; a
+        # rolled-back submit leaves the worker's copy off by one until its next reload
+        distributions.record(challenge_id, scores)
+    for attempt, total in zip(attempts, total_marks):
+        attempt.predicted_rank = predict_rank(distributions.get(attempt.challenge_id), attempt.score, total)
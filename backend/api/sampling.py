@@ -0,0 +1,130 @@
+# File: backend/api/sampling.py
+
+import random
+import threading
+import time
+from array import array
+
+from django.conf import settings
+
+from .models import Question
+from .utils import bump_cache_version, get_cache_version
+
+QUESTIONS_VERSION_KEY = 'questions'
+
+
+class QuestionPool:
+    """
+    Per-worker index of question IDs, bucketed by subject and optionally by
+    difficulty and question type. Sampling k IDs is O(k) and the questions are
+    then fetched with a single primary-key lookup, instead of the
+    ORDER BY RANDOM() scan over the whole subject.
+
+    The index is rebuilt lazily: `invalidate()` is called from the Question
+    save/delete signals and bumps the shared 'questions' CacheVersion, which
+    every worker checks at most every QUESTION_POOL_CHECK_INTERVAL seconds.
+    `ttl` bounds how long changes that send no signals (bulk_create, update())
+    can go unnoticed.
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self._buckets = None
+        self._version = None
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Drops the index here and, through the shared version, in every other worker."""
+        bump_cache_version(QUESTIONS_VERSION_KEY)
+        self._buckets = None
+
+    def _is_stale(self, buckets):
+        if buckets is None:
+            return True
+        ttl = self.ttl if self.ttl is not None else getattr(settings, 'QUESTION_POOL_TTL', 300)
+        now = time.monotonic()
+        if now - self._loaded_at >= ttl:
+            return True
+        if now - self._checked_at < getattr(settings, 'QUESTION_POOL_CHECK_INTERVAL', 2):
+            return False
+        self._checked_at = now
+        return get_cache_version(QUESTIONS_VERSION_KEY) != self._version
+
+    def _get_buckets(self):
+        buckets = self._buckets
+        if not self._is_stale(buckets):
+            return buckets
+        with self._lock:
+            if self._buckets is None or self._buckets is buckets:
+                # Read before loading, so a change committed mid-load triggers another rebuild
+                self._version = get_cache_version(QUESTIONS_VERSION_KEY)
+                self._buckets = self._load()
+                self._loaded_at = self._checked_at = time.monotonic()
+            return self._buckets
+
+    def _load(self):
+        buckets = {}
+        rows = Question.objects.order_by().values_list('id', 'subject', 'difficulty', 'question_type')
+        for question_id, subject, difficulty, question_type in rows.iterator(chunk_size=5000):
+            for key in (
+                (subject, None, None),
+                (subject, difficulty, None),
+                (subject, None, question_type),
+                (subject, difficulty, question_type),
+            ):
+                bucket = buckets.get(key)
+                if bucket is None:
+                    bucket = buckets[key] = array('q')
+                bucket.append(question_id)
+        return buckets
+
+    def available(self, subject, difficulty=None, question_type=None):
+        bucket = self._get_buckets().get((subject, difficulty, question_type))
+        return len(bucket) if bucket is not None else 0
+
+    def sample_ids(self, subject, k, difficulty=None, question_type=None):
+        """
+        Returns up to k distinct question IDs chosen uniformly at random.
+        Fewer than k are returned only when the bucket is smaller than k.
+        """
+        bucket = self._get_buckets().get((subject, difficulty, question_type))
+        if not bucket or k <= 0:
+            return []
+        if k >= len(bucket):
+            ids = list(bucket)
+            random.shuffle(ids)
+            return ids
+        return [bucket[i] for i in random.sample(range(len(bucket)), k)]
+
+    def sample_existing_ids(self, subject, k, difficulty=None, question_type=None):
+        """
+        sample_ids, checked against the database in one query before the IDs are stored
+        anywhere. Like sample(), a miss rebuilds the index and retries once; IDs still
+        missing after that are dropped.
+        """
+        for _ in range(2):
+            ids = self.sample_ids(subject, k, difficulty, question_type)
+            existing = set(Question.objects.filter(pk__in=ids).values_list('id', flat=True))
+            if len(existing) == len(ids):
+                return ids
+            self._buckets = None
+        return [i for i in ids if i in existing]
+
+    def sample(self, subject, k, difficulty=None, question_type=None):
+        """
+        Samples k questions and fetches them in one query, preserving the
+        sampled order. If some IDs have disappeared since the index was built
+        (deleted by another worker), the index is rebuilt and sampling retried once.
+        """
+        for _ in range(2):
+            ids = self.sample_ids(subject, k, difficulty, question_type)
+            questions = Question.objects.in_bulk(ids)
+            if len(questions) == len(ids):
+                return [questions[i] for i in ids]
+            self._buckets = None
+        return [questions[i] for i in ids if i in questions]
+
+
+question_pool = QuestionPool()
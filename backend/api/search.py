@@ -0,0 +1,248 @@
+# File: backend/api/search.py
+
+import os
+import re
+from typing import NamedTuple
+
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+from django.utils.text import Truncator
+
+SEARCH_TABLE = 'api_search_index'
+KINDS = ('question', 'material')
+MAX_QUERY_TERMS = 10
+EXCERPT_LENGTH = 200
+TITLE_LENGTH = 80
+
+
+class SearchDocument(NamedTuple):
+    kind: str
+    object_id: int
+    subject: str
+    item_type: str
+    title: str
+    body: str
+    tags: str
+
+
+class SearchHit(NamedTuple):
+    kind: str
+    object_id: int
+    subject: str
+    item_type: str
+    title: str
+    excerpt: str
+    score: float
+
+
+def question_document(question):
+    options = question.options if isinstance(question.options, dict) else {}
+    body = '\n'.join(filter(None, [question.question_text, *(str(text) for text in options.values())]))
+    return SearchDocument('question', question.pk, question.subject, question.question_type,
+                          question.topic, body, question.source_paper or '')
+
+
+def material_document(material):
+    return SearchDocument('material', material.pk, material.subject, '', material.title,
+                          material.description or '', os.path.basename(material.file.name) if material.file else '')
+
+
+def hit_title(kind, title, excerpt):
+    """
+    Questions are indexed under their topic, which many share; their hits are titled
+    with the start of the question text instead (the excerpt begins with it).
+    """
+    if kind != 'question':
+        return title
+    first_line = excerpt.strip().split('\n', 1)[0]
+    return Truncator(first_line).chars(TITLE_LENGTH) or title
+
+
+def query_terms(text):
+    """Words of a user query; everything else is dropped, so terms are safe to splice into a MATCH/tsquery."""
+    return re.findall(r'\w+', (text or '').lower())[:MAX_QUERY_TERMS]
+
+
+# --- Backends ---
+
+class SQLiteSearchBackend:
+    """
+    An FTS5 virtual table. Rows are keyed by rowid = object_id * len(KINDS) + kind
+    index, so replacing or deleting one document is a rowid lookup rather than a scan.
+    """
+
+    def create(self, cursor):
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+            "kind UNINDEXED, object_id UNINDEXED, subject UNINDEXED, item_type UNINDEXED, "
+            "title, body, tags, tokenize='porter unicode61')"
+        )
+
+    def drop(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+    def rowid(self, kind, object_id):
+        return object_id * len(KINDS) + KINDS.index(kind)
+
+    def upsert(self, cursor, documents):
+        cursor.executemany(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s",
+                           [(self.rowid(doc.kind, doc.object_id),) for doc in documents])
+        cursor.executemany(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, kind, object_id, subject, item_type, title, body, tags) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+            [(self.rowid(doc.kind, doc.object_id), *doc) for doc in documents],
+        )
+
+    def delete(self, cursor, kind, object_id):
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [self.rowid(kind, object_id)])
+
+    def clear(self, cursor):
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+
+    def match(self, terms):
+        # Every term must match, each as a prefix ("algo" finds "algorithms")
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def search(self, cursor, terms, filters, limit):
+        where, params = self.filter_sql(filters)
+        # bm25 weights per column: title counts most, then body, then tags; lower is better
+        cursor.execute(
+            f"SELECT kind, object_id, subject, item_type, title, substr(body, 1, {EXCERPT_LENGTH}), "
+            f"-bm25({SEARCH_TABLE}, 0, 0, 0, 0, 10.0, 4.0, 2.0) AS score "
+            f"FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s{where} ORDER BY score DESC LIMIT %s",
+            [self.match(terms), *params, limit],
+        )
+        return cursor.fetchall()
+
+    def matching_ids_sql(self, kind, terms):
+        return (f"SELECT object_id FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s AND kind = %s",
+                [self.match(terms), kind])
+
+    def filter_sql(self, filters):
+        where = ''.join(f" AND {column} = %s" for column in filters)
+        return where, list(filters.values())
+
+
+class PostgresSearchBackend(SQLiteSearchBackend):
+    """A table with a weighted tsvector column behind a GIN index."""
+
+    DOCUMENT_SQL = ("setweight(to_tsvector('english', %s), 'A') || setweight(to_tsvector('english', %s), 'B') || "
+                    "setweight(to_tsvector('english', %s), 'C')")
+
+    def create(self, cursor):
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+            "kind varchar(16) NOT NULL, object_id bigint NOT NULL, subject varchar(4) NOT NULL, "
+            "item_type varchar(4) NOT NULL, title text NOT NULL, body text NOT NULL, tags text NOT NULL, "
+            "document tsvector NOT NULL, PRIMARY KEY (kind, object_id))"
+        )
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document_idx ON {SEARCH_TABLE} USING gin (document)")
+
+    def upsert(self, cursor, documents):
+        cursor.executemany(
+            f"INSERT INTO {SEARCH_TABLE} (kind, object_id, subject, item_type, title, body, tags, document) "
+            f"VALUES (%s, %s, %s, %s, %s, %s, %s, {self.DOCUMENT_SQL}) "
+            "ON CONFLICT (kind, object_id) DO UPDATE SET subject = EXCLUDED.subject, item_type = EXCLUDED.item_type, "
+            "title = EXCLUDED.title, body = EXCLUDED.body, tags = EXCLUDED.tags, document = EXCLUDED.document",
+            [(*doc, doc.title, doc.body, doc.tags) for doc in documents],
+        )
+
+    def delete(self, cursor, kind, object_id):
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE kind = %s AND object_id = %s", [kind, object_id])
+
+    def match(self, terms):
+        return ' & '.join(f'{term}:*' for term in terms)
+
+    def search(self, cursor, terms, filters, limit):
+        where, params = self.filter_sql(filters)
+        cursor.execute(
+            f"SELECT kind, object_id, subject, item_type, title, left(body, {EXCERPT_LENGTH}), "
+            f"ts_rank(document, query) AS score "
+            f"FROM {SEARCH_TABLE}, to_tsquery('english', %s) query WHERE document @@ query{where} "
+            "ORDER BY score DESC LIMIT %s",
+            [self.match(terms), *params, limit],
+        )
+        return cursor.fetchall()
+
+    def matching_ids_sql(self, kind, terms):
+        return (f"SELECT object_id FROM {SEARCH_TABLE} WHERE document @@ to_tsquery('english', %s) AND kind = %s",
+                [self.match(terms), kind])
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend(),
+    'postgresql': PostgresSearchBackend(),
+}
+
+
+def get_backend(conn=None):
+    """The search backend for the database, or None if it has no full-text support here."""
+    return BACKENDS.get((conn or connection).vendor)
+
+
+# --- Indexing ---
+
+def index_documents(documents, conn=None):
+    backend = get_backend(conn)
+    if backend and documents:
+        with (conn or connection).cursor() as cursor:
+            backend.upsert(cursor, documents)
+
+
+def remove_document(kind, object_id):
+    backend = get_backend()
+    if backend:
+        with connection.cursor() as cursor:
+            backend.delete(cursor, kind, object_id)
+
+
+def rebuild_index(questions, materials, conn=None, batch_size=2000):
+    """Replaces the whole index with documents for the given querysets. Returns the number indexed."""
+    conn = conn or connection
+    backend = get_backend(conn)
+    if backend is None:
+        return 0
+    total = 0
+    with transaction.atomic(using=conn.alias):
+        with conn.cursor() as cursor:
+            backend.clear(cursor)
+        for queryset, to_document in ((questions, question_document), (materials, material_document)):
+            batch = []
+            for obj in queryset.iterator(chunk_size=batch_size):
+                batch.append(to_document(obj))
+                if len(batch) >= batch_size:
+                    index_documents(batch, conn)
+                    total += len(batch)
+                    batch = []
+            index_documents(batch, conn)
+            total += len(batch)
+    return total
+
+
+# --- Querying ---
+
+def search(text, kind=None, subject=None, item_type=None, limit=20):
+    """Ranked SearchHits for a free-text query, best first."""
+    terms = query_terms(text)
+    backend = get_backend()
+    if not terms or backend is None:
+        return []
+    filters = {column: value for column, value in (('kind', kind), ('subject', subject), ('item_type', item_type)) if value}
+    with connection.cursor() as cursor:
+        rows = backend.search(cursor, terms, filters, limit)
+    return [
+        SearchHit(kind, object_id, subject, item_type, hit_title(kind, title, excerpt), excerpt, score)
+        for kind, object_id, subject, item_type, title, excerpt, score in rows
+    ]
+
+
+def matching_ids(kind, text):
+    """
+    A subquery of the ids of `kind` documents matching `text`, for
+    queryset.filter(id__in=...). None if the query has no terms or there's no index.
+    """
+    terms = query_terms(text)
+    backend = get_backend()
+    if not terms or backend is None:
+        return None
+    return RawSQL(*backend.matching_ids_sql(kind, terms))
@@ -1,4 +1,3 @@
-import json
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from .models import (
@@ -6,6 +5,9 @@ from .models import (
     Challenge, ChallengeAttempt, StudyMaterial
 )
 import re
+from .attempts import grade_attempt
+from .images import media_url, srcsets, variants_for
+from .downloads import download_url
 
 class CustomUserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -63,18 +65,21 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
 
 class QuizQuestionSerializer(serializers.ModelSerializer):
     options = serializers.SerializerMethodField()
+    question_image_srcset = serializers.SerializerMethodField()
     class Meta:
         model = Question
-        fields = ['id', 'question_text', 'question_image', 'question_type', 'options', 'marks']
+        fields = ['id', 'question_text', 'question_image', 'question_image_srcset', 'question_type', 'options', 'marks']
     def get_options(self, obj):
-        if obj.options:
-            try:
-                # If options is a string, load it as JSON
-                return json.loads(obj.options)
-            except (json.JSONDecodeError, TypeError):
-                # If it's already a dict (from JSONField), return it directly
-                return obj.options
-        return {}
+        # Options are stored as JSON objects (see migration 0015); the hot quiz and
+        # challenge paths skip this serializer entirely and use api/payloads.py
+        return obj.options or {}
+    def get_question_image_srcset(self, obj):
+        # Resized WebP/JPEG variants (api/images.py), e.g. {"webp": "<url> 320w, <url> 640w", "jpeg": ...}
+        if not obj.question_image:
+            return None
+        request = self.context.get('request')
+        host = request.build_absolute_uri('/')[:-1] if request else ''
+        return srcsets(variants_for([obj.question_image.name]).get(obj.question_image.name), host)
 
 class QuizResultSerializer(serializers.ModelSerializer):
     subject = serializers.CharField(source='get_subject_display')
@@ -93,7 +98,7 @@ class NewsArticleSerializer(serializers.ModelSerializer):
 class ChallengeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Challenge
-        fields = ['id', 'title', 'description']
+        fields = ['id', 'title', 'description', 'duration_minutes']
 
 class ChallengeAttemptSerializer(serializers.ModelSerializer):
     """
@@ -105,7 +110,7 @@ class ChallengeAttemptSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ChallengeAttempt
-        fields = ['id', 'challenge', 'status', 'start_time', 'questions']
+        fields = ['id', 'challenge', 'status', 'start_time', 'deadline', 'questions']
 
 class ChallengeResultSerializer(serializers.ModelSerializer):
     challenge_title = serializers.CharField(source='challenge.title', read_only=True)
@@ -116,108 +121,107 @@ class ChallengeResultSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ChallengeAttempt
-        fields = ['id', 'score', 'challenge_title', 'end_time', 'correct_count', 
+        fields = ['id', 'score', 'predicted_rank', 'challenge_title', 'end_time', 'correct_count', 
                   'positive_marks', 'negative_marks', 'detailed_results']
 
-    def _get_scoring_details(self, obj):
-        # Helper method to avoid redundant calculations
-        if hasattr(self, '_scoring_details'):
-            return self._scoring_details
+    def _get_responses(self, obj):
+        # The graded rows stored at submit time, with their questions, in one query
+        responses = list(obj.responses.select_related('question').order_by('question_id'))
+        if not responses:
+            # Attempts submitted before per-question responses were stored: grade on the fly
+            _, responses = grade_attempt(obj, obj.answers)
+            questions = Question.objects.in_bulk([response.question_id for response in responses])
+            for response in responses:
+                response.question = questions[response.question_id]
+        return responses
+
+    def _get_result(self, obj):
+        # Scoring summary and per-question details in a single pass, shared between the fields below
+        if getattr(self, '_result_for', None) == obj.pk:
+            return self._result
 
+        request = self.context.get('request')
+        host = request.build_absolute_uri('/')[:-1] if request else ''
         correct_count = 0
         positive_marks = 0.0
         negative_marks = 0.0
+        detailed_results = []
 
-        for question in obj.questions.all():
-            user_answer = obj.answers.get(str(question.id))
-            if user_answer is None or user_answer == '' or user_answer == []:
-                continue
-
-            is_correct = False
-            correct_answer_str = str(question.correct_answer).strip()
-            
-            if question.question_type == 'MSQ':
-                user_answer_sorted = "".join(sorted(user_answer))
-                correct_answer_sorted = "".join(sorted(correct_answer_str))
-                if user_answer_sorted == correct_answer_sorted:
-                    is_correct = True
-            else: # MCQ and NAT
-                if str(user_answer).strip() == correct_answer_str:
-                    is_correct = True
-
-            if is_correct:
+        responses = self._get_responses(obj)
+        variants = variants_for([response.question.question_image.name for response in responses])
+        for response in responses:
+            question = response.question
+            if response.is_correct:
                 correct_count += 1
-                positive_marks += question.marks
-            elif question.question_type == 'MCQ': # Incorrect MCQ
-                if question.marks == 1:
-                    negative_marks += 1/3
-                elif question.marks == 2:
-                    negative_marks += 2/3
-
-        self._scoring_details = {
+            if response.marks_awarded > 0:
+                positive_marks += response.marks_awarded
+            else:
+                negative_marks -= response.marks_awarded
+
+            user_answer = response.answer
+            if question.question_type == 'MSQ' and isinstance(user_answer, list):
+                user_answer = "".join(sorted(user_answer))
+
+            image_url = None
+            image_srcset = None
+            if question.question_image:
+                image_url = media_url(question.question_image.name, host)
+                image_srcset = srcsets(variants.get(question.question_image.name), host)
+
+            detailed_results.append({
+                'id': question.id,
+                'question_text': question.question_text,
+                'question_image': image_url,
+                'question_image_srcset': image_srcset,
+                'options': question.options or {},
+                'user_answer': user_answer,
+                'correct_answer': question.correct_answer,
+                'explanation': question.explanation,
+                'is_correct': response.is_correct,
+            })
+
+        self._result = {
             'correct_count': correct_count,
             'positive_marks': round(positive_marks, 2),
             'negative_marks': round(negative_marks, 2),
+            'detailed_results': detailed_results,
         }
-        return self._scoring_details
+        self._result_for = obj.pk
+        return self._result
 
     def get_correct_count(self, obj):
-        return self._get_scoring_details(obj)['correct_count']
+        return self._get_result(obj)['correct_count']
 
     def get_positive_marks(self, obj):
-        return self._get_scoring_details(obj)['positive_marks']
+        return self._get_result(obj)['positive_marks']
 
     def get_negative_marks(self, obj):
-        return self._get_scoring_details(obj)['negative_marks']
+        return self._get_result(obj)['negative_marks']
 
     def get_detailed_results(self, obj):
-        results = []
-        request = self.context.get('request')
-        for question in obj.questions.all().order_by('id'):
-            user_answer = obj.answers.get(str(question.id))
-            is_correct = False
-            
-            correct_answer_str = str(question.correct_answer).strip()
-            if user_answer is not None:
-                if question.question_type == 'MSQ':
-                    if isinstance(user_answer, list):
-                        user_answer = "".join(sorted(user_answer))
-                    correct_answer_sorted = "".join(sorted(correct_answer_str))
-                    if user_answer == correct_answer_sorted:
-                        is_correct = True
-                else:
-                    if str(user_answer).strip() == correct_answer_str:
-                        is_correct = True
-            
-            image_url = None
-            if question.question_image and hasattr(question.question_image, 'url'):
-                image_url = request.build_absolute_uri(question.question_image.url) if request else question.question_image.url
-            
-            results.append({
-                'id': question.id,
-                'question_text': question.question_text,
-                'question_image': image_url,
-                'options': question.options or {},
-                'user_answer': user_answer,
-                'correct_answer': question.correct_answer,
-                'explanation': question.explanation,
-                'is_correct': is_correct,
-            })
-        return results
+        return self._get_result(obj)['detailed_results']
     
 class StudyMaterialSerializer(serializers.ModelSerializer):
     subject_name = serializers.CharField(source='get_subject_display', read_only=True)
-    # --- NEW: Use a method to build the full file URL ---
+    # The signed download endpoint (range requests, conditional GET), not the raw media URL
     file = serializers.SerializerMethodField()
+    # Filled in by run_preview_worker; null until it has seen the current file
+    thumbnail = serializers.SerializerMethodField()
 
     class Meta:
         model = StudyMaterial
-        fields = ['id', 'title', 'description', 'subject', 'subject_name', 'file', 'uploaded_at']
+        fields = [
+            'id', 'title', 'description', 'subject', 'subject_name', 'file',
+            'file_size', 'page_count', 'thumbnail', 'download_count', 'uploaded_at',
+        ]
 
     def get_file(self, obj):
-        # Get the request from the context
+        if obj.file:
+            return download_url(obj, self.context.get('request'))
+        return None
+
+    def get_thumbnail(self, obj):
+        if not obj.thumbnail:
+            return None
         request = self.context.get('request')
-        if obj.file and hasattr(obj.file, 'url'):
-            # build_absolute_uri creates the full URL, e.g., http://localhost:8000/media/...
-            return request.build_absolute_uri(obj.file.url)
-        return None
\ No newline at end of file
+        return request.build_absolute_uri(obj.thumbnail.url) if request else obj.thumbnail.url
@@ -0,0 +1,72 @@
+# File: backend/api/signals.py
+
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from .models import Question, Challenge, StudyMaterial
+from .sampling import question_pool
+from .attempts import invalidate_results
+from .grading import invalidate_answer_keys
+from .papers import challenges_sampling, discard_pool
+from .payloads import invalidate_question_fragments
+from .search import index_documents, material_document, question_document, remove_document
+from .images import question_image_names, schedule_variants
+from .media import remember_file_names, track_references
+
+# Question fields the paper pools were sampled by
+SAMPLING_FIELDS = ('subject', 'difficulty', 'question_type')
+
+
+@receiver([post_save, post_delete], sender=Question)
+def question_changed(sender, instance, **kwargs):
+    # Keep the in-memory sampling index and the compiled answer key in step with the question bank
+    question_pool.invalidate()
+    invalidate_answer_keys()
+    invalidate_question_fragments()
+    # Result pages show the questions' text, answers and explanations
+    invalidate_results()
+    if kwargs.get('signal') is post_delete:
+        # Pooled papers may reference the deleted question
+        discard_pool(challenges_sampling([instance.subject]))
+        remove_document('question', instance.pk)
+    else:
+        sampled_as = getattr(instance, '_sampled_as', None)
+        if sampled_as is not None and sampled_as != tuple(getattr(instance, field) for field in SAMPLING_FIELDS):
+            # Papers pooled under its old subject, difficulty or type no longer match the config
+            discard_pool(challenges_sampling([sampled_as[0], instance.subject]))
+        index_documents([question_document(instance)])
+        # Render resized variants of newly uploaded images after the save commits
+        schedule_variants(question_image_names([instance]))
+
+
+@receiver(pre_save, sender=Question)
+def question_saving(sender, instance, **kwargs):
+    # What the row was sampled by before this save, compared in question_changed
+    instance._sampled_as = Question.objects.filter(pk=instance.pk).values_list(*SAMPLING_FIELDS).first() if instance.pk else None
+
+
+@receiver(post_save, sender=Challenge)
+def challenge_changed(sender, instance, **kwargs):
+    # Papers generated for the old config are no longer valid
+    discard_pool([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=StudyMaterial)
+def material_changed(sender, instance, **kwargs):
+    if kwargs.get('signal') is post_delete:
+        remove_document('material', instance.pk)
+    else:
+        index_documents([material_document(instance)])
+
+
+@receiver(pre_save, sender=Question)
+@receiver(pre_save, sender=StudyMaterial)
+def media_owner_saving(sender, instance, **kwargs):
+    remember_file_names(instance)
+
+
+@receiver([post_save, post_delete], sender=Question)
+@receiver([post_save, post_delete], sender=StudyMaterial)
+def media_owner_changed(sender, instance, **kwargs):
+    # Keep StoredFile reference counts in step so gc_media knows which files are orphaned
+    track_references(instance, deleted=kwargs.get('signal') is post_delete)
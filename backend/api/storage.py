@@ -0,0 +1,104 @@
+# File: backend/api/storage.py
+
+import hashlib
+import os
+import uuid
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.http import Http404, HttpResponseNotModified
+from django.utils.deconstruct import deconstructible
+from django.views.static import serve
+
+CAS_PREFIX = 'cas'
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def content_name(digest, extension):
+    return f"{CAS_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}{extension}"
+
+
+def digest_from_name(name):
+    """The SHA-256 of a content-addressed file, from its name; None for other files."""
+    if not name.startswith(CAS_PREFIX + '/'):
+        return None
+    return os.path.splitext(os.path.basename(name))[0]
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores every upload once, at cas/<aa>/<bb>/<sha256>.<ext>, whatever name it was
+    uploaded under. Saving content that's already stored returns the existing name
+    instead of writing a copy, so the same diagram or PDF is kept (and cached) once.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is derived from the content in _save, so upload names never need de-duplicating
+        return name
+
+    def _save(self, name, content):
+        sha256 = hashlib.sha256()
+        for chunk in content.chunks():
+            sha256.update(chunk)
+        cas_name = content_name(sha256.hexdigest(), os.path.splitext(name)[1].lower())
+        if self.exists(cas_name):
+            return cas_name
+        # Write under a unique temporary name, then rename into place: readers never see a
+        # partial file, and a concurrent upload of the same bytes just swaps in an identical one
+        temp_name = super()._save(f"{cas_name}.{uuid.uuid4().hex}.tmp", content)
+        os.replace(self.path(temp_name), self.path(cas_name))
+        return cas_name
+
+
+content_addressed_storage = ContentAddressedStorage()
+
+# Study material files live outside MEDIA_ROOT, so no media URL reaches them: they're only
+# handed out by the signed download view (or the front server's internal location behind it)
+private_content_addressed_storage = ContentAddressedStorage(location=settings.PRIVATE_MEDIA_ROOT)
+private_storage = FileSystemStorage(location=settings.PRIVATE_MEDIA_ROOT)
+
+
+def select_media_storage():
+    """Storage for uploaded question images and material thumbnails (CONTENT_ADDRESSED_MEDIA toggles it)."""
+    if getattr(settings, 'CONTENT_ADDRESSED_MEDIA', True):
+        return content_addressed_storage
+    return default_storage
+
+
+def select_private_storage():
+    """Storage for study material files, under PRIVATE_MEDIA_ROOT (CONTENT_ADDRESSED_MEDIA toggles it)."""
+    if getattr(settings, 'CONTENT_ADDRESSED_MEDIA', True):
+        return private_content_addressed_storage
+    return private_storage
+
+
+def media_storages():
+    """Every storage uploads are saved to; the same content-addressed name can exist in several."""
+    return [select_media_storage(), select_private_storage()]
+
+
+# --- Serving ---
+
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """
+    django.views.static.serve, plus far-future immutable caching for content-addressed
+    files: their content can never change, and the hash in the name doubles as the ETag.
+    Nothing under PRIVATE_MEDIA_ROOT is served, even when it sits inside document_root.
+    """
+    private_root = os.path.realpath(settings.PRIVATE_MEDIA_ROOT)
+    if os.path.commonpath([os.path.realpath(os.path.join(document_root or '', path)), private_root]) == private_root:
+        raise Http404("Study materials are only served through their download links.")
+
+    digest = digest_from_name(path)
+    if digest is None:
+        return serve(request, path, document_root, show_indexes)
+
+    etag = f'"{digest}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        response = serve(request, path, document_root, show_indexes)
+    response['ETag'] = etag
+    response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
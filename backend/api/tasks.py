@@ -0,0 +1,354 @@
+# File: backend/api/tasks.py
+
+import os
+import random
+import socket
+import time
+import traceback
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.db import close_old_connections, connection, connections, transaction
+from django.db.models import Count, F, Max, Min
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+TASKS = {}
+
+
+# --- Registry ---
+
+def task(name=None, max_attempts=3):
+    """Decorator registering a function as a task run_worker can execute, by `name` (default: module.function)."""
+    def register(func):
+        func.task_name = name or f"{func.__module__}.{func.__name__}"
+        func.max_attempts = max_attempts
+        TASKS[func.task_name] = func
+        return func
+    return register
+
+
+def get_task(name):
+    """A registered task name, or the dotted path of a task function."""
+    if name in TASKS:
+        return TASKS[name]
+    return import_string(name)
+
+
+def enqueue(name, kwargs=None, priority=0, run_at=None, delay=0, max_attempts=None):
+    """
+    Queues a task by name (or task function) with JSON-serializable kwargs. Inside a
+    transaction the task only becomes visible to workers if the transaction commits.
+    """
+    func = get_task(getattr(name, 'task_name', name))
+    return Task.objects.create(
+        name=func.task_name,
+        kwargs=kwargs or {},
+        priority=priority,
+        run_at=(run_at or timezone.now()) + timedelta(seconds=delay),
+        max_attempts=max_attempts or func.max_attempts,
+    )
+
+
+def is_pending(name, kwargs=None):
+    """Whether a task of this name (with these kwargs, if given) is queued or running."""
+    pending = Task.objects.filter(name=name, status__in=('QUEUED', 'RUNNING'))
+    if kwargs is not None:
+        pending = pending.filter(kwargs=kwargs)
+    return pending.exists()
+
+
+def enqueue_once(name, kwargs=None, **options):
+    """enqueue(), unless the same task is already queued or running. Returns the new Task or None."""
+    func = get_task(getattr(name, 'task_name', name))
+    if is_pending(func.task_name, kwargs or {}):
+        return None
+    return enqueue(func, kwargs, **options)
+
+
+def retry_delay(attempts):
+    """Seconds before a failed task runs again: exponential from TASK_RETRY_BASE up to TASK_RETRY_MAX, half jittered."""
+    base = getattr(settings, 'TASK_RETRY_BASE', 10)
+    cap = getattr(settings, 'TASK_RETRY_MAX', 60 * 60)
+    delay = min(cap, base * 2 ** (attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def lease_seconds():
+    return getattr(settings, 'TASK_LEASE_SECONDS', 5 * 60)
+
+
+# --- Periodic tasks ---
+
+def task_schedule():
+    return getattr(settings, 'TASK_SCHEDULE', {})
+
+
+def enqueue_periodic():
+    """
+    Queues each TASK_SCHEDULE task that has no run queued or running, to run its
+    interval after the last run was due (or now, if it never ran). Called by the
+    scheduling worker; returns the tasks queued.
+    """
+    schedule = task_schedule()
+    now = timezone.now()
+    queued = []
+    with transaction.atomic():
+        pending = set(Task.objects.filter(name__in=schedule, status__in=('QUEUED', 'RUNNING')).values_list('name', flat=True))
+        last_due = dict(Task.objects.filter(name__in=schedule).values_list('name').annotate(Max('run_at')).order_by())
+        for name, interval in schedule.items():
+            if name in pending:
+                continue
+            run_at = max(now, last_due[name] + timedelta(seconds=interval)) if name in last_due else now
+            queued.append(enqueue(name, run_at=run_at))
+    return queued
+
+
+# --- Leasing ---
+
+def claim_tasks(worker_id, limit, lease=None):
+    """
+    Moves up to `limit` due tasks to RUNNING under this worker's lease, highest priority
+    first, and returns them. Two workers never claim the same task.
+    """
+    now = timezone.now()
+    ordered = Task.objects.filter(status='QUEUED', run_at__lte=now).order_by('-priority', 'run_at', 'id')
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            # Postgres: rows another worker is claiming are skipped instead of waited on
+            ids = list(ordered.select_for_update(skip_locked=True).values_list('id', flat=True)[:limit])
+            claimed = Task.objects.filter(pk__in=ids)
+        else:
+            # SQLite has no row locks, but IMMEDIATE transactions serialize writers, and the
+            # status check in the UPDATE keeps a row another worker just took from being retaken
+            ids = list(ordered.values_list('id', flat=True)[:limit])
+            claimed = Task.objects.filter(pk__in=ids, status='QUEUED')
+        claimed.update(
+            status='RUNNING', locked_by=worker_id, locked_until=now + timedelta(seconds=lease or lease_seconds()),
+            started_at=now, attempts=F('attempts') + 1,
+        )
+    return list(Task.objects.filter(pk__in=ids, status='RUNNING', locked_by=worker_id).order_by('-priority', 'run_at', 'id'))
+
+
+def renew_leases(worker_id, task_ids, lease=None):
+    """Extends the lease on tasks this worker is still running."""
+    if task_ids:
+        Task.objects.filter(pk__in=task_ids, status='RUNNING', locked_by=worker_id).update(
+            locked_until=timezone.now() + timedelta(seconds=lease or lease_seconds()),
+        )
+
+
+def requeue_expired():
+    """
+    Tasks whose worker died (its lease ran out) go back to the queue, or fail if they
+    were on their last attempt. Returns (requeued, failed).
+    """
+    now = timezone.now()
+    expired = Task.objects.filter(status='RUNNING', locked_until__lt=now)
+    failed = expired.filter(attempts__gte=F('max_attempts')).update(
+        status='FAILED', finished_at=now, locked_by='', locked_until=None, last_error='Lease expired on the last attempt.',
+    )
+    requeued = expired.update(status='QUEUED', run_at=now, locked_by='', locked_until=None)
+    return requeued, failed
+
+
+def complete_task(task, worker_id):
+    # Conditional on the lease, so a worker that overran it can't overwrite the task's new run
+    Task.objects.filter(pk=task.pk, status='RUNNING', locked_by=worker_id).update(
+        status='DONE', finished_at=timezone.now(), locked_by='', locked_until=None, last_error='',
+    )
+
+
+def fail_task(task, worker_id, error):
+    now = timezone.now()
+    changes = {'locked_by': '', 'locked_until': None, 'last_error': error}
+    if task.attempts < task.max_attempts:
+        changes.update(status='QUEUED', run_at=now + timedelta(seconds=retry_delay(task.attempts)))
+    else:
+        changes.update(status='FAILED', finished_at=now)
+    Task.objects.filter(pk=task.pk, status='RUNNING', locked_by=worker_id).update(**changes)
+
+
+def prune_finished(retention_days=None):
+    """Deletes DONE tasks older than TASK_RETENTION_DAYS; FAILED ones stay for inspection."""
+    days = retention_days if retention_days is not None else getattr(settings, 'TASK_RETENTION_DAYS', 7)
+    deleted, _ = Task.objects.filter(status='DONE', finished_at__lt=timezone.now() - timedelta(days=days)).delete()
+    return deleted
+
+
+# --- Execution ---
+
+def execute(name, kwargs):
+    """Runs one task in a pool thread or process."""
+    try:
+        return get_task(name)(**kwargs)
+    finally:
+        close_old_connections()
+
+
+def _init_process():
+    django.setup()
+    # A forked child inherits the parent's database connections; drop them unclosed and reconnect
+    for conn in connections.all(initialized_only=True):
+        conn.connection = None
+
+
+class Worker:
+    """
+    Claims due tasks and runs them on a thread or process pool, keeping at most
+    `concurrency` in flight, renewing their leases while they run and recording
+    each outcome. With `schedule`, it also queues the TASK_SCHEDULE tasks as they
+    come due. Stopping finishes the in-flight tasks before returning.
+    """
+
+    def __init__(self, concurrency=4, pool='thread', poll_interval=1.0, lease=None, log=None, schedule=False):
+        self.concurrency = concurrency
+        self.schedule = schedule
+        self.pool = pool
+        self.poll_interval = poll_interval
+        self.lease = lease or lease_seconds()
+        self.log = log or (lambda message: None)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def executor(self):
+        if self.pool == 'process':
+            return ProcessPoolExecutor(max_workers=self.concurrency, initializer=_init_process)
+        return ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='task')
+
+    def run(self, stopping, once=False):
+        in_flight = {}
+        renewed_at = swept_at = scheduled_at = 0
+        with self.executor() as executor:
+            while True:
+                if self.schedule and not stopping.is_set() and time.monotonic() - scheduled_at >= self.poll_interval:
+                    for queued in enqueue_periodic():
+                        self.log(f"Scheduled {queued} for {queued.run_at:%H:%M:%S}.")
+                    scheduled_at = time.monotonic()
+                if not stopping.is_set() and len(in_flight) < self.concurrency:
+                    for claimed in claim_tasks(self.worker_id, self.concurrency - len(in_flight), self.lease):
+                        in_flight[executor.submit(execute, claimed.name, claimed.kwargs)] = claimed
+                if not in_flight:
+                    if stopping.is_set() or once:
+                        break
+                    stopping.wait(self.poll_interval)
+                else:
+                    done, _ = wait(in_flight, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self.finish(in_flight.pop(future), future)
+
+                now = time.monotonic()
+                if in_flight and now - renewed_at >= self.lease / 3:
+                    renew_leases(self.worker_id, [t.pk for t in in_flight.values()], self.lease)
+                    renewed_at = now
+                if now - swept_at >= self.lease / 2:
+                    requeued, failed = requeue_expired()
+                    if requeued or failed:
+                        self.log(f"Requeued {requeued} and failed {failed} tasks with expired leases.")
+                    prune_finished()
+                    swept_at = now
+
+    def finish(self, claimed, future):
+        error = future.exception()
+        if error is None:
+            complete_task(claimed, self.worker_id)
+            self.log(f"Finished {claimed}.")
+        else:
+            fail_task(claimed, self.worker_id, ''.join(traceback.format_exception(error))[-4000:])
+            self.log(f"Failed {claimed} (attempt {claimed.attempts}/{claimed.max_attempts}): {error!r}")
+
+
+# --- Metrics ---
+
+def _summary(seconds):
+    if not seconds:
+        return None
+    seconds = sorted(seconds)
+    pick = lambda q: round(seconds[min(len(seconds) - 1, int(q * len(seconds)))], 3)
+    return {'avg': round(sum(seconds) / len(seconds), 3), 'p50': pick(0.5), 'p95': pick(0.95), 'max': round(seconds[-1], 3)}
+
+
+def queue_metrics(window=timedelta(hours=1)):
+    """
+    Queue depth by status, how many tasks are due and how long the oldest has waited,
+    plus queue wait (run_at -> started_at) and run time of tasks finished in `window`.
+    """
+    now = timezone.now()
+    depth = dict(Task.objects.values_list('status').annotate(count=Count('id')).order_by())
+    due = Task.objects.filter(status='QUEUED', run_at__lte=now).aggregate(count=Count('id'), oldest=Min('run_at'))
+    finished = Task.objects.filter(status='DONE', finished_at__gte=now - window).values_list('run_at', 'started_at', 'finished_at')
+    waits, runs = [], []
+    for run_at, started_at, finished_at in finished.iterator(chunk_size=2000):
+        waits.append(max((started_at - run_at).total_seconds(), 0))
+        runs.append((finished_at - started_at).total_seconds())
+    return {
+        'depth': {status: depth.get(status, 0) for status, _ in Task.STATUS_CHOICES},
+        'due': due['count'],
+        'oldest_due_seconds': round((now - due['oldest']).total_seconds(), 3) if due['oldest'] else None,
+        'window_seconds': int(window.total_seconds()),
+        'completed': len(runs),
+        'failed': Task.objects.filter(status='FAILED', finished_at__gte=now - window).count(),
+        'wait_seconds': _summary(waits),
+        'run_seconds': _summary(runs),
+    }
+
+
+# --- Built-in tasks ---
+
+@task('news.refresh')
+def refresh_news():
+    from .news import due_targets, feed_targets, prune_articles, refresh_feeds
+
+    due = due_targets(feed_targets())
+    if due:
+        refresh_feeds(due)
+    prune_articles()
+
+
+@task('email.drain_outbox')
+def drain_email_outbox():
+    from .outbox import drain_outbox
+
+    drain_outbox()
+
+
+@task('challenges.expire_attempts')
+def expire_challenge_attempts():
+    from .attempts import expire_attempts
+
+    for _ in expire_attempts():
+        pass
+
+
+@task('challenges.refill_pool')
+def refill_challenge_pool(challenge_id):
+    from .models import Challenge
+    from .papers import pool_depths, pool_watermark, refill_pool
+
+    challenge = Challenge.objects.filter(pk=challenge_id).first()
+    if challenge is not None and pool_depths([challenge_id]).get(challenge_id, 0) < pool_watermark():
+        refill_pool(challenge)
+
+
+@task('images.render_variants')
+def render_image_variants(names, question_ids=()):
+    # question_ids is only accepted for tasks queued before payloads were versioned
+    from .images import generate_variants, missing_variant_sources
+    from .payloads import invalidate_question_fragments
+
+    rendered = [source for source, error in generate_variants(missing_variant_sources(names), processes=1) if error is None]
+    if rendered:
+        # Bumps the shared version: this runs in run_worker, whose cache the web workers don't read
+        invalidate_question_fragments()
+
+
+@task('media.gc', max_attempts=1)
+def collect_media_garbage(dry_run=False):
+    from .media import collect_garbage, recount_references
+
+    recount_references()
+    collect_garbage(timedelta(hours=getattr(settings, 'MEDIA_GC_GRACE_HOURS', 24)), dry_run=dry_run)
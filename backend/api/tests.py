@@ -1,3 +1,1528 @@
-from django.test import TestCase
+import io
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock, skipIf
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail import get_connection
+from django.core.management import call_command
+from django.http import Http404
+from django.urls import reverse
+from django.db import DatabaseError, connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone as django_timezone
+from PIL import Image
+from pypdf import PdfWriter
+from rest_framework.test import APIClient
+
+from .analytics import STATS_FIELDS, aggregate_daily_stats, aggregate_quiz_results
+from .attempts import deadline_for, expire_attempts
+from .documents import NO_PDF_RENDERER, pdf_page_count
+from .downloads import DownloadCounter, download_url
+from .grading import ANSWER_KEYS_VERSION_KEY, grade_sheet
+from .media import collect_garbage, recount_references, walk_files
+from .models import (
+    Challenge, ChallengeAttempt, ChallengePaper, CustomUser, DailySubjectStats, DraftAnswer, FeedState, LeaderboardChange,
+    LeaderboardEntry, NewsArticle, OutgoingEmail, Question, QuizResult, StoredFile, StudyMaterial, SubjectStats, Task,
+)
+from .news import NEWS_VERSION_KEY, FeedSource, refresh_feeds, targets_for_urls
+from .outbox import claim_batch, drain_outbox, queue_email
+from .papers import PaperGenerationError, claim_paper, generate_paper, pool_depths, refill_pool
+from .payloads import QUESTION_FRAGMENTS_VERSION_KEY, render_questions_json
+from .rank_index import RankIndex, RankIndexRegistry, rank_indexes
+from .sampling import QUESTIONS_VERSION_KEY, QuestionPool
+from .serializers import QuizQuestionSerializer
+from .storage import (
+    IMMUTABLE_CACHE_CONTROL, ContentAddressedStorage, content_addressed_storage, digest_from_name, serve_media,
+)
+from .tasks import (
+    Worker, claim_tasks, complete_task, enqueue, enqueue_once, enqueue_periodic, fail_task, render_image_variants,
+    requeue_expired, task,
+)
+from .utils import bump_cache_version, get_cache_version
+from . import autosave, leaderboard, previews, ranks
+
+TESTDATA = Path(__file__).resolve().parent / 'testdata'
+
+# Items in the fixture feeds are from March 2024, apart from one from 2023
+NEWS_CUTOFF = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+# --- Local stand-ins ---
+
+class FeedHandler(BaseHTTPRequestHandler):
+    """Serves the fixture feeds mapped in server.feeds, honouring If-None-Match like a real feed host."""
+
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers)))
+        time.sleep(self.server.delay)
+        feed = self.server.feeds.get(self.path)
+        if feed is None:
+            self.send_error(404)
+            return
+        if isinstance(feed, int):
+            self.send_error(feed)
+            return
+        file_name, etag = feed
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        body = (TESTDATA / 'feeds' / file_name).read_bytes()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', 'Wed, 20 Mar 2024 08:00:00 GMT')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FeedServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FeedHandler)
+        self.feeds = {}
+        self.requests = []
+        self.delay = 0
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """
+    Just enough SMTP for smtplib: replies to RCPT TO with server.replies[address] (250 by
+    default), stores each message's recipients, and hangs up after server.drop_after messages.
+    """
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.server.connections += 1
+        recipients = []
+        self.reply('220 localhost test SMTP')
+        while line := self.rfile.readline():
+            command = line.decode().strip()
+            verb = command.split(' ', 1)[0].upper()
+            if verb in ('EHLO', 'HELO'):
+                self.reply('250 localhost')
+            elif verb == 'MAIL':
+                recipients = []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                address = command.split(':', 1)[1].strip().strip('<>')
+                code = self.server.replies.get(address, 250)
+                if code == 250:
+                    recipients.append(address)
+                self.reply(f'{code} {"OK" if code == 250 else "Refused"}')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                while self.rfile.readline() not in (b'.\r\n', b''):
+                    pass
+                self.server.received.append(recipients)
+                if len(self.server.received) == self.server.drop_after:
+                    return
+                self.reply('250 Queued')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+class SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), SMTPHandler)
+        self.reset()
+
+    def reset(self):
+        self.replies = {}
+        self.received = []
+        self.connections = 0
+        self.drop_after = None
+
+    def connection(self):
+        return get_connection('django.core.mail.backends.smtp.EmailBackend', host='127.0.0.1', port=self.server_address[1],
+                              username='', password='', use_tls=False, fail_silently=False)
+
+
+# --- News feeds ---
+
+class RefreshFeedsTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FeedServer()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.feeds = {
+            '/gate.xml': ('gate_news.xml', '"v1"'),
+            '/calendar.xml': ('exam_calendar.xml', '"c1"'),
+        }
+        self.server.requests = []
+        self.server.delay = 0
+
+    def refresh(self, *paths):
+        return refresh_feeds(targets_for_urls([self.server.url(path) for path in paths]), cutoff=NEWS_CUTOFF)
+
+    def test_new_articles_are_inserted_with_one_bulk_insert(self):
+        with CaptureQueriesContext(connection) as queries:
+            results, new_count = self.refresh('/gate.xml')
+
+        self.assertEqual(new_count, 3)
+        self.assertEqual(results[0].skipped_old, 1)
+        self.assertEqual(
+            set(NewsArticle.objects.values_list('link', flat=True)),
+            {'http://example.com/news/answer-key', 'http://example.com/news/results', 'http://example.com/news/coap'},
+        )
+        self.assertEqual(NewsArticle.objects.get(link='http://example.com/news/answer-key').source, 'Example Times')
+        inserts = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('INSERT') and 'api_newsarticle' in q['sql']]
+        self.assertEqual(len(inserts), 1)
+
+    def test_unchanged_feed_is_a_conditional_get_answered_with_304(self):
+        self.refresh('/gate.xml')
+        results, new_count = self.refresh('/gate.xml')
+
+        self.assertEqual(self.server.requests[-1][1].get('If-None-Match'), '"v1"')
+        self.assertEqual(self.server.requests[-1][1].get('If-Modified-Since'), 'Wed, 20 Mar 2024 08:00:00 GMT')
+        self.assertTrue(results[0].not_modified)
+        self.assertEqual(new_count, 0)
+        state = FeedState.objects.get(url=self.server.url('/gate.xml'))
+        self.assertEqual((state.etag, state.last_status, state.failure_count), ('"v1"', 304, 0))
+
+    def test_changed_feed_only_adds_links_not_stored_yet(self):
+        self.refresh('/gate.xml')
+        self.server.feeds['/gate.xml'] = ('gate_news_updated.xml', '"v2"')
+        _, new_count = self.refresh('/gate.xml', '/calendar.xml')
+
+        # The updated feed adds one item and the calendar one more; their shared link is stored once
+        self.assertEqual(new_count, 2)
+        self.assertEqual(NewsArticle.objects.count(), 5)
+        self.assertEqual(FeedState.objects.get(url=self.server.url('/gate.xml')).etag, '"v2"')
+
+    def test_feeds_are_fetched_concurrently(self):
+        self.server.feeds.update({f'/slow{i}.xml': ('exam_calendar.xml', f'"s{i}"') for i in range(4)})
+        self.server.delay = 0.5
+
+        started = time.monotonic()
+        results, _ = self.refresh('/slow0.xml', '/slow1.xml', '/slow2.xml', '/slow3.xml')
+
+        self.assertTrue(all(r.error is None for r in results))
+        self.assertLess(time.monotonic() - started, 1.5)
+
+    def test_failing_feed_backs_off_without_blocking_the_others(self):
+        self.server.feeds['/down.xml'] = 503
+        results, new_count = self.refresh('/gate.xml', '/down.xml')
+
+        self.assertEqual(new_count, 3)
+        self.assertIsNotNone(results[1].error)
+        state = FeedState.objects.get(url=self.server.url('/down.xml'))
+        self.assertEqual((state.last_status, state.failure_count), (503, 1))
+        self.assertGreater(state.next_fetch_at, datetime.now(timezone.utc))
+
+    def test_unexpected_error_in_one_feed_is_recorded_on_its_state(self):
+        class BrokenSource(FeedSource):
+            def build_item(self, item, published):
+                raise KeyError('title')
+
+        broken_url = self.server.url('/calendar.xml')
+        targets = targets_for_urls([self.server.url('/gate.xml')]) + [(broken_url, BrokenSource())]
+        with self.assertLogs('api.news', 'ERROR'):
+            results, new_count = refresh_feeds(targets, cutoff=NEWS_CUTOFF)
+
+        self.assertEqual(new_count, 3)
+        self.assertIsInstance(results[1].error, KeyError)
+        self.assertEqual(FeedState.objects.get(url=broken_url).failure_count, 1)
+
+
+# --- Email outbox ---
+
+@override_settings(DEFAULT_FROM_EMAIL='noreply@gate-master.test', EMAIL_RETRY_BASE=60, EMAIL_RETRY_MAX=3600,
+                   EMAIL_MAX_ATTEMPTS=3, EMAIL_OUTBOX_LEASE=300)
+class OutboxTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = SMTPServer()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.reset()
+
+    def queue(self, *addresses):
+        return [queue_email(address, 'Verify your email', 'Click the link.') for address in addresses]
+
+    def drain(self, **kwargs):
+        return drain_outbox(connection=self.server.connection(), **kwargs)
+
+    def make_due(self):
+        OutgoingEmail.objects.filter(status='PENDING').update(next_attempt_at=django_timezone.now())
+
+    def test_drains_in_batches_over_one_connection(self):
+        self.queue(*(f'user{i}@example.com' for i in range(5)))
+
+        self.assertEqual(self.drain(batch_size=2), (5, 0))
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(len(self.server.received), 5)
+        self.assertFalse(OutgoingEmail.objects.exclude(status='SENT').exists())
+
+    def test_temporary_failure_backs_off_exponentially(self):
+        self.server.replies['busy@example.com'] = 451
+        busy, _ = self.queue('busy@example.com', 'ok@example.com')
+
+        started = django_timezone.now()
+        self.assertEqual(self.drain(), (1, 1))
+        busy.refresh_from_db()
+        self.assertEqual((busy.status, busy.attempts, busy.claimed_by), ('PENDING', 1, ''))
+        # Half jittered: the first retry comes 30-60 s later
+        self.assertGreaterEqual(busy.next_attempt_at, started + timedelta(seconds=30))
+        self.assertLessEqual(busy.next_attempt_at, django_timezone.now() + timedelta(seconds=60))
+        # Not due yet, so another drain leaves it alone
+        self.assertEqual(self.drain(), (0, 0))
+
+        self.make_due()
+        self.drain()
+        busy.refresh_from_db()
+        self.assertEqual(busy.attempts, 2)
+        self.assertGreaterEqual(busy.next_attempt_at, django_timezone.now() + timedelta(seconds=60 - 1))
+
+        self.make_due()
+        self.drain()
+        busy.refresh_from_db()
+        self.assertEqual((busy.status, busy.attempts), ('FAILED', 3))
+
+    def test_permanent_failure_is_not_retried(self):
+        self.server.replies['nobody@example.com'] = 550
+        nobody, = self.queue('nobody@example.com')
+
+        self.assertEqual(self.drain(), (0, 1))
+        nobody.refresh_from_db()
+        self.assertEqual((nobody.status, nobody.attempts), ('FAILED', 1))
+        self.assertIn('550', nobody.last_error)
+
+    def test_lost_connection_releases_the_rest_of_the_batch(self):
+        self.server.drop_after = 2
+        messages = self.queue(*(f'user{i}@example.com' for i in range(4)))
+
+        self.assertEqual(self.drain(), (1, 1))
+        statuses = {m.pk: (m.status, m.attempts) for m in OutgoingEmail.objects.all()}
+        self.assertEqual(statuses[messages[0].pk], ('SENT', 0))
+        self.assertEqual(statuses[messages[1].pk], ('PENDING', 1))
+        # Released untried: due again straight away, on a new connection
+        self.server.drop_after = None
+        self.assertEqual(self.drain(), (2, 0))
+        self.assertEqual(self.server.connections, 2)
+
+    def test_unreachable_server_backs_off_the_whole_batch(self):
+        with socket.socket() as unused:
+            unused.bind(('127.0.0.1', 0))
+            port = unused.getsockname()[1]
+        self.queue('a@example.com', 'b@example.com')
+        connection = get_connection('django.core.mail.backends.smtp.EmailBackend', host='127.0.0.1', port=port,
+                                    username='', password='', use_tls=False, timeout=2)
+
+        self.assertEqual(drain_outbox(connection=connection), (0, 2))
+        self.assertEqual(set(OutgoingEmail.objects.values_list('status', 'attempts')), {('PENDING', 1)})
+
+    def test_crashed_workers_claim_expires_and_is_reclaimed(self):
+        self.queue('a@example.com', 'b@example.com')
+        # A worker claims the batch and dies before sending
+        claimed = claim_batch(10)
+        self.assertEqual(len(claimed), 2)
+        self.assertEqual(claim_batch(10), [])
+        self.assertEqual(self.drain(), (0, 0))
+
+        # Once the lease has run out the messages are due again and another worker sends them
+        OutgoingEmail.objects.update(next_attempt_at=django_timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.drain(), (2, 0))
+        self.assertEqual(set(OutgoingEmail.objects.values_list('status', 'claimed_by')), {('SENT', '')})
+
+
+# --- Predicted ranks ---
+
+@skipIf(ranks.np is None, "NumPy isn't installed.")
+class PredictRanksTests(TestCase):
+    """The vectorized NumPy path of predict_ranks must give the same ranks as predict_rank one by one."""
+
+    def setUp(self):
+        rng = random.Random(0)
+        # GATE-like scores in thirds of a mark, with plenty of ties and the .5 interpolation boundaries
+        self.scores = [round(rng.randint(-30, 300) / 3, 2) for _ in range(20000)]
+        self.total_marks = [rng.choice([100, 65, 33, 0, None]) for _ in self.scores]
+        self.distribution = ranks.ScoreDistribution()
+        self.distribution.add(self.scores[:15000])
+        self.table = ranks.RankTable([(0, 120000), (15, 60000), (25.5, 20000), (40, 6000), (62.5, 500), (85, 10), (100, 1)])
+
+    def assert_paths_agree(self):
+        vectorized = ranks.predict_ranks(self.distribution, self.scores, self.total_marks)
+        with mock.patch.object(ranks, 'np', None):
+            one_by_one = ranks.predict_ranks(self.distribution, self.scores, self.total_marks)
+        self.assertEqual(vectorized, one_by_one)
+
+    def test_paths_agree_without_a_rank_table(self):
+        with mock.patch.object(ranks, 'gate_rank_table', return_value=None):
+            self.assert_paths_agree()
+
+    def test_paths_agree_with_a_rank_table(self):
+        with mock.patch.object(ranks, 'gate_rank_table', return_value=self.table):
+            self.assert_paths_agree()
+
+    def test_empty_distribution_ranks_everyone_first(self):
+        self.distribution = ranks.ScoreDistribution()
+        with mock.patch.object(ranks, 'gate_rank_table', return_value=None):
+            self.assertEqual(ranks.predict_ranks(self.distribution, [10, 20], [100, 100]), [1, 1])
+            self.assert_paths_agree()
+
+
+# --- Study material previews ---
+
+class PdfPageCountTests(SimpleTestCase):
+    """Page counts come from the latest page tree, not from every page object left in the file."""
+
+    def write(self, writer):
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        return buffer.getvalue()
+
+    def test_incremental_updates_count_the_latest_pages(self):
+        writer = PdfWriter()
+        for _ in range(3):
+            writer.add_blank_page(100, 100)
+        original = self.write(writer)
+        # Appended revisions keep the earlier page objects in the file
+        writer = PdfWriter(io.BytesIO(original), incremental=True)
+        writer.add_blank_page(100, 100)
+        del writer.pages[0]
+        updated = self.write(writer)
+
+        self.assertTrue(updated.startswith(original))
+        self.assertEqual(pdf_page_count(original), 3)
+        self.assertEqual(pdf_page_count(updated), 3)
+
+    def test_unreadable_file_has_no_page_count(self):
+        self.assertIsNone(pdf_page_count(b'not a pdf'))
+        self.assertIsNone(pdf_page_count(b'%PDF-1.7\n1 0 obj << /Type /Page >> endobj\n'))
+
+
+class PreviewWorkerTests(TestCase):
+    # One of the sample PDFs kept under PRIVATE_MEDIA_ROOT
+    SAMPLE = 'study_materials/1c29fc66-868a-4f54-be30-df0a813790b9.pdf'
+
+    def setUp(self):
+        self.material = StudyMaterial.objects.create(title='Algorithms notes', subject='ALGO', file=self.SAMPLE)
+        # Threads instead of processes, so the patches below apply to the inspection too
+        patcher = mock.patch.object(previews, 'ProcessPoolExecutor', ThreadPoolExecutor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_pdf_without_a_renderer_is_marked_failed_and_retried_later(self):
+        with mock.patch('api.documents.shutil.which', return_value=None):
+            [(material, error)] = previews.generate_previews(previews.pending_materials(), processes=1)
+
+        self.assertEqual(error, NO_PDF_RENDERER)
+        self.material.refresh_from_db()
+        self.assertEqual((self.material.page_count, self.material.preview_error), (49, NO_PDF_RENDERER))
+        self.assertFalse(self.material.thumbnail)
+        self.assertFalse(previews.pending_materials().exists())
+        self.assertEqual(list(previews.pending_materials(retry_failed_after=0)), [self.material])
+
+    def test_failures_are_retried_once_per_run_past_the_cursor(self):
+        others = [StudyMaterial.objects.create(title=f'Notes {i}', subject='ALGO', file=self.SAMPLE) for i in range(2)]
+        StudyMaterial.objects.update(preview_source=self.SAMPLE, preview_error='Earlier failure')
+
+        self.assertEqual(list(previews.pending_materials(retry_failed_after=self.material.pk)), others)
+        self.assertEqual(list(previews.pending_materials(retry_failed_after=others[-1].pk)), [])
+
+
+# --- Question sampling ---
+
+@override_settings(QUESTION_POOL_CHECK_INTERVAL=60)
+class QuestionPoolTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.algo = [make_question(difficulty='EASY') for _ in range(6)]
+        self.hard_nat = [make_question('NAT', '4', difficulty='HARD') for _ in range(2)]
+        make_question(subject='OS')
+        self.pool = QuestionPool()
+
+    def test_samples_are_distinct_and_from_the_bucket(self):
+        ids = self.pool.sample_ids('ALGO', 5)
+        self.assertEqual(len(set(ids)), 5)
+        self.assertLessEqual(set(ids), {q.pk for q in self.algo + self.hard_nat})
+        self.assertEqual(sorted(self.pool.sample_ids('ALGO', 5, difficulty='HARD', question_type='NAT')),
+                         [q.pk for q in self.hard_nat])
+        self.assertEqual(self.pool.available('ALGO', question_type='MCQ'), 6)
+        self.assertEqual(self.pool.sample_ids('CN', 5), [])
+
+    def test_quiz_is_sampled_from_the_pool(self):
+        client = APIClient()
+        client.force_authenticate(CustomUser.objects.create(username='aspirant'))
+        response = client.get(reverse('generate-quiz', args=['ALGO']), {'difficulty': 'HARD'})
+        self.assertEqual(sorted(question['id'] for question in response.json()), [q.pk for q in self.hard_nat])
+
+    def test_change_in_another_worker_is_seen_through_the_shared_version(self):
+        self.pool.sample_ids('ALGO', 1)
+        # bulk_create sends no signals; another worker's invalidate() only bumps the shared version
+        Question.objects.bulk_create([Question(subject='ALGO', topic='Sorting', question_type='MCQ', correct_answer='A')])
+        bump_cache_version(QUESTIONS_VERSION_KEY)
+        self.assertEqual(self.pool.available('ALGO'), 8)
+
+        with override_settings(QUESTION_POOL_CHECK_INTERVAL=0):
+            self.assertEqual(self.pool.available('ALGO'), 9)
+
+    def test_question_deleted_elsewhere_is_dropped_on_the_retry(self):
+        self.pool.sample_ids('ALGO', 1)
+        # Deleted by another worker: this pool's index still has it
+        Question.objects.filter(pk=self.hard_nat[0].pk).delete()
+
+        sampled = self.pool.sample('ALGO', 10, difficulty='HARD')
+        self.assertEqual(sampled, [self.hard_nat[1]])
+        self.assertEqual(self.pool.sample_existing_ids('ALGO', 10, difficulty='HARD'), [self.hard_nat[1].pk])
+
+
+# --- Challenge paper pool ---
+
+@override_settings(CHALLENGE_POOL_SIZE=3, CHALLENGE_POOL_WATERMARK=2)
+class PaperPoolTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.algo = {make_question().pk for _ in range(4)}
+        self.os = {make_question(subject='OS').pk for _ in range(3)}
+        self.challenge = Challenge.objects.create(title='Mock test', description='Mixed', config={'ALGO': 3, 'OS': 2})
+        self.client = APIClient()
+        self.client.force_authenticate(CustomUser.objects.create(username='aspirant'))
+
+    def start(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse('challenge-start'), {'challenge_id': self.challenge.pk}, format='json')
+
+    def test_generated_paper_follows_the_config(self):
+        ids = generate_paper(self.challenge)
+        self.assertEqual(len(set(ids)), 5)
+        self.assertEqual((len(set(ids) & self.algo), len(set(ids) & self.os)), (3, 2))
+
+        self.challenge.config = {'OS': 4}
+        with self.assertRaisesMessage(PaperGenerationError, 'Required: 4, Found: 3'):
+            generate_paper(self.challenge)
+
+    def test_refill_tops_the_pool_up_to_its_size(self):
+        self.assertEqual(refill_pool(self.challenge), 3)
+        self.assertEqual(refill_pool(self.challenge), 0)
+        self.assertEqual(pool_depths(), {self.challenge.pk: 3})
+
+    def test_each_paper_is_claimed_once(self):
+        refill_pool(self.challenge, size=2)
+        papers = {tuple(ids) for ids in ChallengePaper.objects.values_list('question_ids', flat=True)}
+
+        claimed = {tuple(claim_paper(self.challenge)), tuple(claim_paper(self.challenge))}
+        self.assertEqual(claimed, papers)
+        self.assertIsNone(claim_paper(self.challenge))
+
+    def test_paper_with_a_missing_question_is_thrown_away(self):
+        ChallengePaper.objects.create(challenge=self.challenge, question_ids=[max(self.algo) + 100])
+        self.assertIsNone(claim_paper(self.challenge))
+        self.assertFalse(ChallengePaper.objects.exists())
+
+    def test_start_takes_a_pooled_paper_and_queues_a_refill_below_the_watermark(self):
+        refill_pool(self.challenge, size=2)
+        remaining = set(ChallengePaper.objects.values_list('id', flat=True))
+        response = self.start()
+
+        self.assertEqual(response.status_code, 201)
+        attempt = ChallengeAttempt.objects.get(pk=response.json()['id'])
+        self.assertEqual(sorted(q['id'] for q in response.json()['questions']), sorted(attempt.questions.values_list('id', flat=True)))
+        self.assertEqual(len(remaining - set(ChallengePaper.objects.values_list('id', flat=True))), 1)
+        self.assertEqual(list(Task.objects.values_list('name', 'kwargs')),
+                         [('challenges.refill_pool', {'challenge_id': self.challenge.pk})])
+
+    def test_start_with_an_empty_pool_builds_a_paper_on_the_spot(self):
+        response = self.start()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(ChallengeAttempt.objects.get(pk=response.json()['id']).questions.count(), 5)
+
+    def test_question_moved_to_another_subject_discards_the_pools_sampling_it(self):
+        refill_pool(self.challenge)
+        other = Challenge.objects.create(title='Networks', description='CN only', config={'CN': 1})
+        ChallengePaper.objects.create(challenge=other, question_ids=[])
+
+        question = Question.objects.get(pk=min(self.os))
+        question.subject = 'CN'
+        question.save()
+        self.assertEqual(pool_depths(), {})
+
+
+# --- Grading ---
+
+def make_question(question_type='MCQ', correct_answer='A', marks=1, subject='ALGO', **fields):
+    return Question.objects.create(question_type=question_type, correct_answer=correct_answer, marks=marks,
+                                   subject=subject, topic=fields.pop('topic', 'Sorting'), **fields)
+
+
+class GradingTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def grade(self, question, answer, negative_marking=True):
+        return grade_sheet([question.id], {str(question.id): answer}, negative_marking)
+
+    def test_mcq(self):
+        question = make_question('MCQ', 'B', marks=2)
+        self.assertEqual(self.grade(question, 'b').score, 2)
+        self.assertEqual(self.grade(question, ' B ').correct_count, 1)
+        self.assertEqual(self.grade(question, '').score, 0)
+
+    def test_wrong_mcq_loses_a_third_of_one_or_two_marks_only(self):
+        # As graded before the shared engine: -1/3 for 1-mark and -2/3 for 2-mark MCQs, nothing otherwise
+        penalties = {marks: self.grade(make_question('MCQ', 'A', marks=marks), 'C') for marks in (1, 2, 3)}
+        self.assertAlmostEqual(penalties[1].score, -1 / 3)
+        self.assertAlmostEqual(penalties[2].score, -2 / 3)
+        self.assertEqual(penalties[3].score, 0)
+        self.assertAlmostEqual(penalties[2].negative_marks, 2 / 3)
+        self.assertEqual(self.grade(make_question('MCQ', 'A', marks=2), 'C', negative_marking=False).score, 0)
+
+    def test_msq_needs_exactly_the_correct_letters_in_any_order(self):
+        question = make_question('MSQ', 'AC', marks=2)
+        self.assertEqual(self.grade(question, 'CA').score, 2)
+        self.assertEqual(self.grade(question, ['A', 'C']).score, 2)
+        self.assertEqual(self.grade(question, 'A').score, 0)
+        self.assertEqual(self.grade(question, 'ABC').score, 0)
+
+    def test_nat_exact_value(self):
+        question = make_question('NAT', '1.57', marks=2)
+        self.assertEqual(self.grade(question, '1.570').score, 2)
+        self.assertEqual(self.grade(question, 1.57).score, 2)
+        self.assertEqual(self.grade(question, '1.58').score, 0)
+
+    def test_nat_range(self):
+        for key in ('1.55 to 1.60', '1.60:1.55', '1.55~1.60'):
+            question = make_question('NAT', key)
+            self.assertEqual([self.grade(question, answer).score for answer in ('1.55', '1.58', '1.60', '1.61')],
+                             [1, 1, 1, 0], key)
+
+    def test_nat_key_with_a_thousands_separator_is_not_a_range(self):
+        question = make_question('NAT', '1,000')
+        self.assertEqual(self.grade(question, '1,000').score, 1)
+        self.assertEqual(self.grade(question, '500').score, 0)
+
+    def test_changed_answer_key_is_picked_up_through_the_shared_version(self):
+        question = make_question('MCQ', 'A')
+        self.assertEqual(self.grade(question, 'A').score, 1)
+        # As another worker's save would: change the row and bump the version, leaving this worker's cache alone
+        Question.objects.filter(pk=question.pk).update(correct_answer='B')
+        bump_cache_version(ANSWER_KEYS_VERSION_KEY)
+        self.assertEqual(self.grade(question, 'B').score, 1)
+
+
+# --- Question payloads ---
+
+class QuestionPayloadTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_payload_matches_the_serializer(self):
+        question = make_question(question_text='Which sort is stable?', options={'A': 'Merge sort', 'B': 'Heap sort'}, marks=2)
+        self.assertEqual(json.loads(render_questions_json([question.id])), [QuizQuestionSerializer(question).data])
+
+    def test_edited_question_is_rerendered_through_the_shared_version(self):
+        question = make_question(question_text='Old text', options={'A': 'Old option'})
+        render_questions_json([question.id])
+        # As another worker's save would: change the row and bump the version, leaving this worker's cache alone
+        Question.objects.filter(pk=question.pk).update(question_text='New text', options={'A': 'New option'})
+        bump_cache_version(QUESTION_FRAGMENTS_VERSION_KEY)
+
+        [payload] = json.loads(render_questions_json([question.id]))
+        self.assertEqual((payload['question_text'], payload['options']), ('New text', {'A': 'New option'}))
+
+    def test_saving_a_question_rerenders_it(self):
+        question = make_question(question_text='Old text')
+        render_questions_json([question.id])
+        question.question_text = 'New text'
+        question.save()
+        self.assertEqual(json.loads(render_questions_json([question.id]))[0]['question_text'], 'New text')
+
+
+# --- Image variants ---
+
+def png_upload(name='diagram.png', size=(800, 400), color=(200, 30, 30)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, format='PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class TemporaryMediaMixin:
+    """Points MEDIA_ROOT at a directory removed after each test."""
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        media = override_settings(MEDIA_ROOT=directory.name)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.media_root = directory.name
+
+
+@override_settings(IMAGE_VARIANT_WIDTHS=(320, 640))
+class ImageVariantTests(TemporaryMediaMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_rendered_variants_reach_every_workers_payloads(self):
+        question = make_question(question_text='Trace the circuit', question_image=png_upload())
+        self.assertIsNone(json.loads(render_questions_json([question.id]))[0]['question_image_srcset'])
+        version = get_cache_version(QUESTION_FRAGMENTS_VERSION_KEY)
+
+        # What run_worker does once the upload's task is picked up
+        render_image_variants([question.question_image.name])
+
+        # Bumped in the database, not just deleted from run_worker's own cache
+        self.assertGreater(get_cache_version(QUESTION_FRAGMENTS_VERSION_KEY), version)
+        srcset = json.loads(render_questions_json([question.id]))[0]['question_image_srcset']
+        self.assertEqual(set(srcset), {'webp', 'jpeg'})
+        self.assertRegex(srcset['webp'], r'^\S+-320w\.webp 320w, \S+-640w\.webp 640w$')
+
+    def test_nothing_is_bumped_when_no_variant_is_rendered(self):
+        version = get_cache_version(QUESTION_FRAGMENTS_VERSION_KEY)
+        render_image_variants(['question_images/missing.png'])
+        self.assertEqual(get_cache_version(QUESTION_FRAGMENTS_VERSION_KEY), version)
+
+
+class MediaStorageTests(TemporaryMediaMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        # The private storage's location is fixed at import; keep the collector out of the real one
+        private = ContentAddressedStorage(location=os.path.join(self.media_root, 'private'))
+        patcher = mock.patch('api.media.media_storages', return_value=[content_addressed_storage, private])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def exists(self, name):
+        return content_addressed_storage.exists(name)
+
+    def refs(self):
+        return dict(StoredFile.objects.values_list('name', 'ref_count'))
+
+    def test_identical_uploads_are_stored_once(self):
+        first = make_question(question_image=png_upload('circuit.png'))
+        second = make_question(question_image=png_upload('copy of circuit.PNG'))
+        other = make_question(question_image=png_upload(color=(0, 0, 255)))
+
+        name = first.question_image.name
+        self.assertRegex(name, r'^cas/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.png$')
+        self.assertEqual(second.question_image.name, name)
+        self.assertNotEqual(other.question_image.name, name)
+        self.assertEqual(len(list(walk_files(content_addressed_storage, 'cas'))), 2)
+        self.assertEqual(self.refs(), {name: 2, other.question_image.name: 1})
+
+    def test_gc_deletes_files_once_nothing_references_them(self):
+        kept = make_question(question_image=png_upload())
+        replaced = make_question(question_image=png_upload(color=(0, 0, 255)))
+        old_name = replaced.question_image.name
+        replaced.question_image = png_upload(color=(0, 255, 0))
+        replaced.save()
+        self.assertEqual(self.refs()[old_name], 0)
+
+        # Within the grace period nothing goes
+        self.assertEqual(collect_garbage(), [])
+        self.assertEqual(collect_garbage(grace=timedelta(0)), [old_name])
+        self.assertFalse(self.exists(old_name))
+        self.assertTrue(self.exists(kept.question_image.name) and self.exists(replaced.question_image.name))
+        self.assertNotIn(old_name, self.refs())
+
+    def test_gc_deletes_stored_files_no_row_ever_referenced(self):
+        # Written by a save whose transaction then rolled back
+        stray = content_addressed_storage.save('stray.png', png_upload())
+        self.assertEqual(collect_garbage(grace=timedelta(0), dry_run=True), [stray])
+        self.assertTrue(self.exists(stray))
+        collect_garbage(grace=timedelta(0))
+        self.assertFalse(self.exists(stray))
+
+    def test_recount_fixes_references_changed_without_signals(self):
+        question = make_question(question_image=png_upload())
+        name = question.question_image.name
+        Question.objects.filter(pk=question.pk).update(question_image='')
+        self.assertEqual(recount_references(), 1)
+        self.assertEqual(self.refs(), {name: 0})
+
+    def test_content_addressed_media_is_served_immutable(self):
+        name = make_question(question_image=png_upload()).question_image.name
+        request = RequestFactory().get(f'/media/{name}')
+        response = serve_media(request, name, document_root=self.media_root)
+        self.assertEqual((response['ETag'], response['Cache-Control']), (f'"{digest_from_name(name)}"', IMMUTABLE_CACHE_CONTROL))
+
+        request = RequestFactory().get(f'/media/{name}', headers={'If-None-Match': response['ETag']})
+        self.assertEqual(serve_media(request, name, document_root=self.media_root).status_code, 304)
+
+    def test_private_media_is_never_served(self):
+        with override_settings(PRIVATE_MEDIA_ROOT=os.path.join(self.media_root, 'private')):
+            with self.assertRaises(Http404):
+                serve_media(RequestFactory().get('/media/private/notes.pdf'), 'private/notes.pdf', document_root=self.media_root)
+
+
+# --- Challenge attempts ---
+
+def make_attempt(user, questions, challenge=None, deadline=None):
+    challenge = challenge or Challenge.objects.create(title='Mock test', description='Full-length mock')
+    attempt = ChallengeAttempt.objects.create(user=user, challenge=challenge, deadline=deadline or deadline_for(challenge))
+    attempt.questions.set(questions)
+    return attempt
+
+
+class AttemptClientMixin:
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.user = CustomUser.objects.create(username='aspirant')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.mcq = make_question('MCQ', 'B', marks=2)
+        self.msq = make_question('MSQ', 'AC', marks=2)
+        self.nat = make_question('NAT', '1.55 to 1.60', marks=1)
+        self.attempt = make_attempt(self.user, [self.mcq, self.msq, self.nat])
+
+    def autosave(self, answers, attempt=None):
+        return self.client.patch(reverse('attempt-autosave', args=[(attempt or self.attempt).pk]), {'answers': answers}, format='json')
+
+    def resume(self):
+        return self.client.get(reverse('attempt-resume', args=[self.attempt.pk]))
+
+    def submit(self, answers):
+        return self.client.post(reverse('challenge-submit'), {'attempt_id': self.attempt.pk, 'answers': answers}, format='json')
+
+
+class AutosaveTests(AttemptClientMixin, TestCase):
+
+    def test_autosaved_answers_are_resumed(self):
+        self.assertEqual(self.autosave({str(self.mcq.pk): 'B', str(self.msq.pk): ['C', 'A'], str(self.nat.pk): 1.57}).status_code, 200)
+        self.assertEqual(self.resume().json()['answers'], {str(self.mcq.pk): 'B', str(self.msq.pk): 'AC', str(self.nat.pk): '1.57'})
+
+    def test_cleared_answer_is_left_out_on_resume(self):
+        self.autosave({str(self.mcq.pk): 'B', str(self.msq.pk): ['A']})
+        self.autosave({str(self.mcq.pk): None, str(self.msq.pk): []})
+
+        self.assertEqual(self.resume().json()['answers'], {})
+        # Stored as SQL NULL, not as the JSON value null
+        self.assertEqual(DraftAnswer.objects.filter(attempt=self.attempt, answer__isnull=True).count(), 2)
+
+    def test_older_delta_written_late_does_not_replace_a_newer_one(self):
+        with mock.patch.object(autosave, 'next_seq', return_value=200):
+            autosave.save_answers(self.attempt.pk, {self.mcq.pk: 'B'})
+        # Received earlier, but reaching the database after the newer delta
+        with mock.patch.object(autosave, 'next_seq', return_value=100):
+            autosave.save_answers(self.attempt.pk, {self.mcq.pk: 'A', self.nat.pk: '1.6'})
+
+        self.assertEqual(autosave.saved_answers(self.attempt.pk), {str(self.mcq.pk): 'B', str(self.nat.pk): '1.6'})
+
+    def test_answers_to_questions_outside_the_paper_are_rejected(self):
+        other = make_question()
+        self.assertEqual(self.autosave({str(other.pk): 'A'}).status_code, 400)
+        self.assertFalse(DraftAnswer.objects.exists())
+
+    def test_someone_elses_attempt_is_not_found(self):
+        other = make_attempt(CustomUser.objects.create(username='rival'), [self.mcq])
+        self.assertEqual(self.autosave({str(self.mcq.pk): 'B'}, attempt=other).status_code, 404)
+
+    def test_submitted_attempt_takes_no_more_autosaves(self):
+        self.submit({})
+        self.assertFalse(autosave.save_answers(self.attempt.pk, {self.mcq.pk: 'B'}))
+        self.assertFalse(DraftAnswer.objects.exists())
+
+
+class SubmitChallengeTests(AttemptClientMixin, TestCase):
+
+    def test_submit_grades_autosaved_answers_under_the_submitted_ones(self):
+        self.autosave({str(self.mcq.pk): 'A', str(self.msq.pk): ['A', 'C'], str(self.nat.pk): '1.57'})
+        # The body overrides the MCQ and clears the NAT answer; the MSQ comes from the autosave
+        response = self.submit({str(self.mcq.pk): 'B', str(self.nat.pk): None})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['score'], 4)
+        self.attempt.refresh_from_db()
+        self.assertEqual((self.attempt.status, self.attempt.answers), ('COMPLETED', {str(self.mcq.pk): 'B', str(self.msq.pk): 'AC'}))
+        self.assertEqual(
+            dict(self.attempt.responses.values_list('question_id', 'marks_awarded')),
+            {self.mcq.pk: 2, self.msq.pk: 2, self.nat.pk: 0},
+        )
+        self.assertFalse(DraftAnswer.objects.filter(attempt=self.attempt).exists())
+
+    def test_second_submit_is_refused(self):
+        self.submit({str(self.mcq.pk): 'B'})
+        self.assertEqual(self.submit({str(self.mcq.pk): 'A'}).status_code, 404)
+        self.attempt.refresh_from_db()
+        self.assertEqual(self.attempt.score, 2)
+
+
+class ChallengeResultTests(AttemptClientMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.submit({str(self.mcq.pk): 'A', str(self.msq.pk): ['C', 'A'], str(self.nat.pk): '1.6'})
+
+    def result(self, attempt=None):
+        return self.client.get(reverse('challenge-result', args=[(attempt or self.attempt).pk]))
+
+    def test_result_is_rendered_from_the_stored_responses(self):
+        body = self.result().json()
+        self.assertEqual((body['score'], body['correct_count'], body['positive_marks'], body['negative_marks']), (2.33, 2, 3, 0.67))
+        self.assertEqual(
+            [(row['id'], row['user_answer'], row['is_correct']) for row in body['detailed_results']],
+            [(self.mcq.pk, 'A', False), (self.msq.pk, 'AC', True), (self.nat.pk, '1.6', True)],
+        )
+
+    def test_legacy_attempt_without_responses_is_graded_on_the_fly(self):
+        expected = self.result().json()
+        self.attempt.responses.all().delete()
+        cache.clear()
+        self.assertEqual(self.result().json(), expected)
+
+    def test_queries_do_not_grow_with_the_paper(self):
+        shorter = self.attempt
+        self.attempt = longer = make_attempt(self.user, [make_question() for _ in range(8)])
+        self.submit({})
+
+        query_counts = []
+        for attempt in (shorter, longer):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.result(attempt).status_code, 200)
+            query_counts.append(len(queries))
+        self.assertEqual(query_counts[0], query_counts[1])
+
+    def test_cached_page_is_rerendered_after_a_question_edit(self):
+        self.result()
+        with self.assertNumQueries(1):
+            # Only the shared version is read
+            self.result()
+
+        self.mcq.explanation = 'Option B is the stable sort.'
+        self.mcq.save()
+        self.assertEqual(self.result().json()['detailed_results'][0]['explanation'], 'Option B is the stable sort.')
+
+
+class ExpiryTests(AttemptClientMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.now = django_timezone.now()
+        self.autosave({str(self.mcq.pk): 'B', str(self.msq.pk): ['A']})
+        # Ran out of time a minute ago, past the 30 second grace, with the answers saved before that
+        ChallengeAttempt.objects.filter(pk=self.attempt.pk).update(deadline=self.now - timedelta(minutes=1))
+        DraftAnswer.objects.update(updated_at=self.now - timedelta(minutes=2))
+        cache.delete(autosave.attempt_access_key(self.attempt.pk))
+
+    def expire(self, **kwargs):
+        return [closed for closed, _ in expire_attempts(now=self.now, **kwargs)]
+
+    def test_sweep_grades_answers_saved_in_time_and_closes_at_the_deadline(self):
+        # Received after deadline + grace, so it doesn't count
+        DraftAnswer.objects.create(attempt=self.attempt, question=self.nat, answer='1.57', updated_at=self.now)
+        self.assertEqual(self.expire(), [1])
+
+        self.attempt.refresh_from_db()
+        self.assertEqual((self.attempt.status, self.attempt.score, self.attempt.end_time),
+                         ('COMPLETED', 2, self.now - timedelta(minutes=1)))
+        self.assertEqual(self.attempt.answers, {str(self.mcq.pk): 'B', str(self.msq.pk): 'A'})
+        self.assertEqual(
+            dict(self.attempt.responses.values_list('question_id', 'marks_awarded')),
+            {self.mcq.pk: 2, self.msq.pk: 0, self.nat.pk: 0},
+        )
+        self.assertFalse(DraftAnswer.objects.exists())
+        self.assertEqual(LeaderboardEntry.objects.get(user=self.user, challenge=self.attempt.challenge).best_score, 2)
+
+    def test_sweep_leaves_attempts_within_their_time_or_grace(self):
+        running = make_attempt(self.user, [self.mcq], deadline=self.now + timedelta(minutes=5))
+        in_grace = make_attempt(self.user, [self.mcq], deadline=self.now - timedelta(seconds=10))
+        self.expire()
+
+        self.assertEqual(
+            dict(ChallengeAttempt.objects.values_list('id', 'status')),
+            {self.attempt.pk: 'COMPLETED', running.pk: 'IN_PROGRESS', in_grace.pk: 'IN_PROGRESS'},
+        )
+
+    def test_sweep_works_through_the_backlog_in_batches(self):
+        for _ in range(4):
+            make_attempt(self.user, [self.mcq], deadline=self.now - timedelta(hours=1))
+        self.assertEqual(self.expire(batch_size=2), [2, 2, 1])
+        self.assertFalse(ChallengeAttempt.objects.filter(status='IN_PROGRESS').exists())
+
+    def test_late_submit_is_graded_on_the_autosaved_answers(self):
+        response = self.submit({str(self.mcq.pk): 'A', str(self.nat.pk): '1.57'})
+
+        self.assertEqual(response.json()['expired'], True)
+        self.assertEqual(response.json()['score'], 2)
+        self.attempt.refresh_from_db()
+        self.assertEqual((self.attempt.status, self.attempt.answers), ('COMPLETED', {str(self.mcq.pk): 'B', str(self.msq.pk): 'A'}))
+
+    def test_autosave_after_the_deadline_is_refused(self):
+        self.assertEqual(self.autosave({str(self.mcq.pk): 'A'}).status_code, 409)
+        self.assertEqual(autosave.saved_answers(self.attempt.pk)[str(self.mcq.pk)], 'B')
+
+
+# --- Leaderboard ---
+
+def completed_attempt(user, challenge, score, minutes_ago=0):
+    end_time = django_timezone.now() - timedelta(minutes=minutes_ago)
+    return ChallengeAttempt.objects.create(user=user, challenge=challenge, status='COMPLETED', score=score, end_time=end_time)
+
+
+def walk_board(client, page_size, **params):
+    """The first page's body and every row of the board, following `next`."""
+    response = client.get(reverse('leaderboard'), {'page_size': page_size, **params})
+    first, rows = response.json(), []
+    while True:
+        body = response.json()
+        rows.extend((row['rank'], row['username'], row['score']) for row in body['leaderboard'])
+        if not body['next']:
+            return first, rows
+        response = client.get(body['next'])
+
+
+@override_settings(LEADERBOARD_RANK_INDEX=False)
+class LeaderboardTests(TestCase):
+
+    def setUp(self):
+        self.challenge = Challenge.objects.create(title='Mock test', description='Full-length mock')
+        self.other = Challenge.objects.create(title='Mini test', description='Short mock')
+        self.users = [CustomUser.objects.create(username=f'user{i}') for i in range(5)]
+        self.client = APIClient()
+        self.client.force_authenticate(self.users[0])
+
+    def board(self, challenge_id=None):
+        return list(leaderboard.scope(challenge_id).order_by(*leaderboard.BOARD_ORDER).values_list('user__username', 'best_score'))
+
+    def test_best_score_is_kept_per_challenge_and_overall(self):
+        user = self.users[0]
+        for challenge, score in ((self.challenge, 40), (self.challenge, 30), (self.other, 55), (self.challenge, 50)):
+            leaderboard.record_attempt(completed_attempt(user, challenge, score))
+
+        self.assertEqual(self.board(), [('user0', 55)])
+        self.assertEqual(self.board(self.challenge.pk), [('user0', 50)])
+        self.assertEqual(self.board(self.other.pk), [('user0', 55)])
+
+    def test_batch_recording_matches_recording_one_by_one(self):
+        scores = [(0, 40), (1, 70), (0, 65), (2, 70), (1, 20)]
+        leaderboard.record_attempts([completed_attempt(self.users[i], self.challenge, score) for i, score in scores])
+        batched = self.board(self.challenge.pk), self.board()
+
+        LeaderboardEntry.objects.all().delete()
+        for attempt in ChallengeAttempt.objects.order_by('id'):
+            leaderboard.record_attempt(attempt)
+        self.assertEqual((self.board(self.challenge.pk), self.board()), batched)
+        self.assertEqual(self.board(), [('user1', 70), ('user2', 70), ('user0', 65)])
+
+    def test_rebuild_matches_the_incremental_board(self):
+        for i, score in enumerate([10, 90, 50, 50, 30]):
+            leaderboard.record_attempt(completed_attempt(self.users[i], self.challenge, score, minutes_ago=10 - i))
+        before = self.board(), self.board(self.challenge.pk)
+        call_command('rebuild_leaderboard', batch_size=2, stdout=io.StringIO())
+        self.assertEqual((self.board(), self.board(self.challenge.pk)), before)
+
+    def test_keyset_pages_walk_the_whole_board_with_ties(self):
+        for i, score in enumerate([10, 90, 50, 50, 30]):
+            leaderboard.record_attempt(completed_attempt(self.users[i], self.challenge, score, minutes_ago=10 - i))
+
+        first, rows = walk_board(self.client, 2, challenge=self.challenge.pk)
+        self.assertEqual(rows, [(1, 'user1', 90), (2, 'user2', 50), (3, 'user3', 50), (4, 'user4', 30), (5, 'user0', 10)])
+        self.assertEqual(first['user_rank'], {'rank': 5, 'username': 'user0', 'score': 10})
+        self.assertEqual([row['username'] for row in first['around_me']], ['user1', 'user2', 'user3', 'user4', 'user0'])
+
+    def test_bad_parameters_are_refused(self):
+        url = reverse('leaderboard')
+        self.assertEqual(self.client.get(url, {'cursor': 'not-a-cursor'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'challenge': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'challenge': self.other.pk + 100}).status_code, 404)
+
+
+@override_settings(LEADERBOARD_INDEX_CHECK_INTERVAL=0)
+class RankIndexTests(TestCase):
+
+    def setUp(self):
+        self.challenge = Challenge.objects.create(title='Mock test', description='Full-length mock')
+        self.users = [CustomUser.objects.create(username=f'user{i}') for i in range(4)]
+        for i, score in enumerate([10, 90, 50, 50]):
+            with self.captureOnCommitCallbacks(execute=True):
+                leaderboard.record_attempt(completed_attempt(self.users[i], self.challenge, score, minutes_ago=10 - i))
+        self.registry = RankIndexRegistry()
+
+    def scores(self, index):
+        return [(user_id, score) for score, _, user_id, _ in index.top(10)]
+
+    def test_index_ranks_like_the_database(self):
+        index = self.registry.get(self.challenge.pk)
+        for user in self.users:
+            entry = leaderboard.user_entry(user, self.challenge.pk)
+            self.assertEqual(index.rank(user.pk), leaderboard.rank_of(entry))
+            self.assertEqual([position for position, _ in index.around(user.pk, k=1)],
+                             [position for position, _ in leaderboard.around(entry, k=1)])
+        # Equal scores share a rank; the earlier one is listed first
+        self.assertEqual(self.scores(index), [(self.users[1].pk, 90), (self.users[2].pk, 50), (self.users[3].pk, 50), (self.users[0].pk, 10)])
+        self.assertEqual((index.rank(self.users[2].pk), index.rank(self.users[3].pk)), (2, 2))
+
+    def test_index_only_takes_a_better_score(self):
+        index = RankIndex([(1, 'a', 50, 100.0)])
+        index.update(1, 'a', 40, 200.0)
+        self.assertEqual(index.entry_for(1), (50, 100.0, 1, 'a'))
+        index.update(1, 'a', 60, 300.0)
+        self.assertEqual((len(index), index.entry_for(1)), (1, (60, 300.0, 1, 'a')))
+
+    def test_another_workers_scores_are_replayed_without_a_reload(self):
+        index = self.registry.get(self.challenge.pk)
+        # Submitted through another worker: logged, but not applied to this registry
+        leaderboard.record_attempt(completed_attempt(self.users[0], self.challenge, 95))
+        leaderboard.record_attempt(completed_attempt(self.users[3], self.challenge, 60))
+
+        self.assertIs(self.registry.get(self.challenge.pk), index)
+        self.assertEqual(self.scores(index)[:3], [(self.users[0].pk, 95), (self.users[1].pk, 90), (self.users[3].pk, 60)])
+
+    def test_invalidate_or_a_pruned_log_reloads_the_index(self):
+        index = self.registry.get(self.challenge.pk)
+        rank_indexes.invalidate()
+        self.assertIsNot(self.registry.get(self.challenge.pk), index)
+
+        index = self.registry.get(self.challenge.pk)
+        leaderboard.record_attempt(completed_attempt(self.users[0], self.challenge, 95))
+        LeaderboardChange.objects.all().delete()
+        reloaded = self.registry.get(self.challenge.pk)
+        self.assertIsNot(reloaded, index)
+        self.assertEqual(reloaded.entry_for(self.users[0].pk)[0], 95)
+
+    def test_board_pages_from_the_index_match_the_database(self):
+        for i in range(4):
+            leaderboard.record_attempt(completed_attempt(CustomUser.objects.create(username=f'late{i}'), self.challenge, 50))
+        client = APIClient()
+        client.force_authenticate(self.users[3])
+
+        walks = []
+        for enabled in (True, False):
+            with override_settings(LEADERBOARD_RANK_INDEX=enabled):
+                rank_indexes.invalidate()
+                walks.append(walk_board(client, 3, challenge=self.challenge.pk))
+        self.assertEqual(walks[0], walks[1])
+        self.assertEqual(len(walks[0][1]), 8)
+
+
+# --- Analytics ---
+
+class AnalyticsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create(username='aspirant')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.questions = [make_question('MCQ', 'A', marks=2), make_question('MCQ', 'B', marks=2)]
+
+    def submit_quiz(self, answers, subject='ALGO', when=None):
+        ids = [question.id for question in self.questions]
+        response = self.client.post(reverse('submit-quiz'), {
+            'subject': subject, 'question_ids': ids, 'answers': dict(zip(map(str, ids), answers)),
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        result = QuizResult.objects.latest('id')
+        if when:
+            QuizResult.objects.filter(pk=result.pk).update(timestamp=when)
+        return result
+
+    def daily_buckets(self):
+        return {
+            (row['subject'], row['day']): (row['attempts'], row['score_sum'], row['total_marks_sum'])
+            for row in DailySubjectStats.objects.filter(user=self.user).values('subject', 'day', 'attempts', 'score_sum', 'total_marks_sum')
+        }
+
+    def subject_rollups(self):
+        return {
+            (user_id, subject): dict(zip(STATS_FIELDS, values))
+            for user_id, subject, *values in SubjectStats.objects.values_list('user_id', 'subject', *STATS_FIELDS)
+        }
+
+    def test_submits_keep_the_subject_rollups_equal_to_the_aggregates(self):
+        self.submit_quiz(['A', 'B'])
+        self.submit_quiz(['C', 'B'])
+        self.submit_quiz(['C', 'C'], subject='OS')
+        self.assertEqual(self.subject_rollups(), aggregate_quiz_results())
+        self.assertEqual(self.subject_rollups()[(self.user.pk, 'ALGO')]['accuracy_sum'], 150)
+
+    def test_summary_is_built_from_the_rollups(self):
+        self.submit_quiz(['A', 'B'])
+        self.submit_quiz(['C', 'B'])
+        self.submit_quiz(['C', 'C'], subject='OS')
+
+        summary = self.client.get(reverse('analytics-summary')).json()
+        self.assertEqual((summary['overall_accuracy'], summary['quizzes_taken']), (50.0, 3))
+        self.assertEqual([(row['subject'], row['avg_accuracy']) for row in summary['subject_performance']],
+                         [('ALGO', 75.0), ('OS', 0.0)])
+        self.assertEqual([(row['subject'], row['count']) for row in summary['subject_distribution']], [('ALGO', 2), ('OS', 1)])
+        self.assertEqual(len(summary['recent_activity']), 3)
+
+    def test_subject_backfill_rebuilds_the_rollups(self):
+        self.submit_quiz(['A', 'B'])
+        # A quiz with nothing to grade counts as an attempt but not towards accuracy
+        QuizResult.objects.create(user=self.user, subject='ALGO', score=0, total_marks=0)
+        SubjectStats.objects.filter(user=self.user).update(attempts=40, score_sum=-3)
+        SubjectStats.objects.create(user=self.user, subject='DB', attempts=9)
+
+        call_command('backfill_subject_stats', batch_size=1, stdout=io.StringIO())
+
+        self.assertEqual(self.subject_rollups(), aggregate_quiz_results())
+        algo = self.subject_rollups()[(self.user.pk, 'ALGO')]
+        self.assertEqual((algo['attempts'], algo['score_sum'], algo['graded_attempts'], algo['accuracy_sum']), (2, 4, 1, 100))
+
+    def test_submitted_quiz_is_added_to_its_daily_bucket(self):
+        self.submit_quiz(['A', 'B'])
+        self.submit_quiz(['A', 'C'])
+        self.assertEqual(self.daily_buckets(), {('ALGO', django_timezone.localdate()): (2, 6, 8)})
+
+    def test_backfill_rebuilds_buckets_from_quiz_history(self):
+        self.submit_quiz(['A', 'B'], when=datetime(2025, 3, 3, 10, tzinfo=timezone.utc))
+        self.submit_quiz(['A', 'C'], when=datetime(2025, 3, 3, 18, tzinfo=timezone.utc))
+        self.submit_quiz(['C', 'C'], subject='OS', when=datetime(2025, 3, 12, 9, tzinfo=timezone.utc))
+        # Buckets the live updates put on today, and one with no quiz behind it
+        DailySubjectStats.objects.create(user=self.user, subject='DB', day=datetime(2025, 3, 5).date(), attempts=9)
+
+        call_command('backfill_daily_stats', batch_size=1, stdout=io.StringIO())
+
+        self.assertEqual(self.daily_buckets(), {
+            ('ALGO', datetime(2025, 3, 3).date()): (2, 6, 8),
+            ('OS', datetime(2025, 3, 12).date()): (1, 0, 4),
+        })
+        self.assertEqual(len(aggregate_daily_stats()), 2)
+
+    def test_trend_sums_daily_buckets_into_weeks(self):
+        for day, answers in ((3, ['A', 'B']), (5, ['A', 'C']), (12, ['C', 'C'])):
+            self.submit_quiz(answers, when=datetime(2025, 3, day, 12, tzinfo=timezone.utc))
+        call_command('backfill_daily_stats', stdout=io.StringIO())
+
+        response = self.client.get(reverse('analytics-trends'), {'granularity': 'week', 'start': '2025-03-01', 'end': '2025-03-31'})
+        self.assertEqual(
+            [(row['attempts'], row['score'], row['total_marks'], row['accuracy']) for row in response.json()['trend']],
+            [(2, 6, 8, 75.0), (1, 0, 4, 0.0)],
+        )
+
+
+# --- Downloads ---
+
+class DownloadTests(TestCase):
+    SAMPLE = PreviewWorkerTests.SAMPLE
+
+    def setUp(self):
+        self.material = StudyMaterial.objects.create(title='Algorithms notes', subject='ALGO', file=self.SAMPLE)
+        self.size = self.material.file.size
+        self.counter = DownloadCounter()
+        # No background thread: the tests flush by hand
+        self.counter._thread = mock.Mock()
+        patcher = mock.patch('api.downloads.download_counter', self.counter)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+
+    def get(self, url=None, **headers):
+        return self.client.get(url or download_url(self.material), headers=headers)
+
+    def download_count(self):
+        self.counter.flush()
+        self.material.refresh_from_db()
+        return self.material.download_count
+
+    def test_signed_link_downloads_the_whole_file(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(int(response['Content-Length']), self.size)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(b''.join(response.streaming_content), self.material.file.open('rb').read())
+        self.assertEqual(self.download_count(), 1)
+
+    def test_missing_or_tampered_signature_is_refused(self):
+        url = reverse('material-download', args=[self.material.pk])
+        self.assertEqual(self.get(url).json(), {'detail': 'Invalid or missing download signature.'})
+        self.assertEqual(self.get(download_url(self.material) + 'x').status_code, 403)
+
+    def test_range_requests_get_their_bytes_and_count_once(self):
+        with self.material.file.open('rb') as file:
+            content = file.read()
+        first = self.get(Range='bytes=0-99')
+        rest = self.get(Range='bytes=100-')
+        suffix = self.get(Range='bytes=-10')
+
+        self.assertEqual((first.status_code, first['Content-Range']), (206, f'bytes 0-99/{self.size}'))
+        self.assertEqual(b''.join(first.streaming_content), content[:100])
+        self.assertEqual(b''.join(rest.streaming_content), content[100:])
+        self.assertEqual((suffix['Content-Range'], b''.join(suffix.streaming_content)),
+                         (f'bytes {self.size - 10}-{self.size - 1}/{self.size}', content[-10:]))
+        self.assertEqual(self.download_count(), 1)
+
+    def test_range_past_the_end_is_unsatisfiable(self):
+        response = self.get(Range=f'bytes={self.size}-')
+        self.assertEqual((response.status_code, response['Content-Range']), (416, f'bytes */{self.size}'))
+
+    def test_backwards_range_gets_the_whole_file(self):
+        self.assertEqual(self.get(Range='bytes=100-10').status_code, 200)
+
+    def test_if_range_with_an_old_etag_gets_the_whole_file(self):
+        self.assertEqual(self.get(Range='bytes=0-99', **{'If-Range': '"stale"'}).status_code, 200)
+
+    def test_matching_etag_is_not_modified(self):
+        etag = self.get()['ETag']
+        response = self.get(**{'If-None-Match': etag})
+        self.assertEqual((response.status_code, response['ETag']), (304, etag))
+        self.assertEqual(self.download_count(), 1)
+
+    def test_failed_flush_keeps_its_counts_for_the_next_one(self):
+        for _ in range(3):
+            self.counter.record(self.material.pk)
+        with mock.patch('django.db.models.query.QuerySet.update', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.counter.flush()
+        self.counter.record(self.material.pk)
+        self.assertEqual(self.download_count(), 4)
+
+    @override_settings(MATERIAL_DOWNLOAD_FLUSH_SIZE=1)
+    def test_a_full_buffer_wakes_the_flush_thread_instead_of_writing_in_the_request(self):
+        with mock.patch.object(self.counter, 'flush') as flush:
+            self.get()
+        flush.assert_not_called()
+        self.assertTrue(self.counter._wakeup.is_set())
+
+
+# --- Search ---
+
+class SearchTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(CustomUser.objects.create(username='aspirant'))
+
+    def search(self, **params):
+        return self.client.get(reverse('search'), params)
+
+    def test_question_hits_are_titled_with_the_question_text(self):
+        text = 'Which traversal of a binary search tree visits the keys in sorted order? ' * 2
+        question = make_question(question_text=text, options={'A': 'Inorder', 'B': 'Preorder'}, topic='Trees')
+        [hit] = self.search(q='binary travers').json()['results']
+
+        self.assertEqual((hit['kind'], hit['id'], hit['type']), ('question', question.pk, 'MCQ'))
+        self.assertEqual(hit['title'], text[:79] + '…')
+        self.assertTrue(hit['excerpt'].startswith(text.strip()))
+
+    def test_material_hits_keep_their_title(self):
+        material = StudyMaterial.objects.create(title='Graph algorithms', description='Shortest paths', subject='ALGO',
+                                                file=PreviewWorkerTests.SAMPLE)
+        make_question(question_text='Dijkstra finds shortest paths from one source.', subject='ALGO')
+
+        results = self.search(q='shortest', kind='material').json()['results']
+        self.assertEqual([(hit['id'], hit['title']) for hit in results], [(material.pk, 'Graph algorithms')])
+
+    def test_filters_narrow_the_hits(self):
+        make_question(question_text='Deadlock needs circular wait.', subject='OS')
+        make_question(question_text='Deadlock avoidance uses the banker algorithm.', subject='OS', question_type='MSQ')
+        make_question(question_text='Deadlock in a distributed database.', subject='DB')
+
+        self.assertEqual(len(self.search(q='deadlock').json()['results']), 3)
+        self.assertEqual(len(self.search(q='deadlock', subject='OS').json()['results']), 2)
+        self.assertEqual(len(self.search(q='deadlock', subject='OS', type='MSQ').json()['results']), 1)
+
+    def test_invalid_parameters_are_reported_under_detail(self):
+        self.assertEqual(self.search(q='x', kind='video').json(), {'detail': 'kind must be one of: question, material.'})
+        self.assertEqual(self.search(q='x', limit='ten').json(), {'detail': 'limit must be an integer.'})
+
+
+# --- Task queue ---
+
+TASK_CALLS = []
+
+
+@task('tests.record')
+def record_call(value):
+    TASK_CALLS.append(value)
+
+
+@task('tests.fail', max_attempts=2)
+def failing_task():
+    raise RuntimeError('Broken task')
+
+
+class TaskQueueTests(TestCase):
+
+    def setUp(self):
+        TASK_CALLS.clear()
+
+    def expire_leases(self):
+        Task.objects.filter(status='RUNNING').update(locked_until=django_timezone.now() - timedelta(seconds=1))
+
+    def test_due_tasks_are_claimed_by_priority_then_age(self):
+        old = enqueue('tests.record', {'value': 'old'}, run_at=django_timezone.now() - timedelta(minutes=1))
+        new = enqueue('tests.record', {'value': 'new'})
+        urgent = enqueue('tests.record', {'value': 'urgent'}, priority=5)
+        enqueue('tests.record', {'value': 'later'}, delay=60)
+
+        claimed = claim_tasks('worker-a', 10)
+        self.assertEqual(claimed, [urgent, old, new])
+        self.assertEqual({(t.status, t.locked_by, t.attempts) for t in claimed}, {('RUNNING', 'worker-a', 1)})
+        self.assertEqual(claim_tasks('worker-b', 10), [])
+
+    def test_expired_lease_is_requeued_or_failed_on_its_last_attempt(self):
+        retried = enqueue('tests.record', {'value': 1})
+        last = enqueue('tests.record', {'value': 2}, max_attempts=1)
+        claim_tasks('worker-a', 10)
+        self.expire_leases()
+
+        self.assertEqual(requeue_expired(), (1, 1))
+        retried.refresh_from_db()
+        last.refresh_from_db()
+        self.assertEqual((retried.status, retried.locked_by), ('QUEUED', ''))
+        self.assertEqual((last.status, last.last_error), ('FAILED', 'Lease expired on the last attempt.'))
+
+        # The worker that lost the lease can't complete the task another worker now runs
+        [reclaimed] = claim_tasks('worker-b', 10)
+        complete_task(reclaimed, 'worker-a')
+        reclaimed.refresh_from_db()
+        self.assertEqual((reclaimed.status, reclaimed.locked_by, reclaimed.attempts), ('RUNNING', 'worker-b', 2))
+
+    def test_failed_task_backs_off_until_its_attempts_run_out(self):
+        queued = enqueue(failing_task)
+        [claimed] = claim_tasks('worker-a', 1)
+        fail_task(claimed, 'worker-a', 'Broken task')
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'QUEUED')
+        self.assertGreater(queued.run_at, django_timezone.now())
+
+        Task.objects.filter(pk=queued.pk).update(run_at=django_timezone.now())
+        [claimed] = claim_tasks('worker-a', 1)
+        fail_task(claimed, 'worker-a', 'Broken task')
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ('FAILED', 2))
+
+    def test_worker_runs_due_tasks_and_records_their_outcome(self):
+        done = [enqueue('tests.record', {'value': value}) for value in range(3)]
+        broken = enqueue(failing_task)
+        Worker(concurrency=2, poll_interval=0.01).run(threading.Event(), once=True)
+
+        self.assertEqual(sorted(TASK_CALLS), [0, 1, 2])
+        self.assertEqual(set(Task.objects.filter(pk__in=[t.pk for t in done]).values_list('status', flat=True)), {'DONE'})
+        broken.refresh_from_db()
+        self.assertEqual(broken.status, 'QUEUED')
+        self.assertIn('RuntimeError: Broken task', broken.last_error)
+
+    def test_enqueue_once_skips_a_task_already_pending(self):
+        self.assertIsNotNone(enqueue_once('tests.record', {'value': 1}))
+        self.assertIsNone(enqueue_once('tests.record', {'value': 1}))
+        self.assertIsNotNone(enqueue_once('tests.record', {'value': 2}))
+
+    @override_settings(TASK_SCHEDULE={'tests.record': 60})
+    def test_periodic_task_is_queued_an_interval_after_its_last_run(self):
+        [first] = enqueue_periodic()
+        self.assertEqual(enqueue_periodic(), [])
+        Task.objects.filter(pk=first.pk).update(status='DONE')
+        [second] = enqueue_periodic()
+        self.assertEqual(second.run_at, first.run_at + timedelta(seconds=60))
+
+
+# --- Cursor pagination ---
+
+class CursorPaginationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create(username='aspirant')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.now = django_timezone.now()
+
+    def walk(self, name, page_size=2, **params):
+        """The ids on every page, following `next`, and how many pages there were."""
+        response = self.client.get(reverse(name), {'page_size': page_size, **params})
+        ids, pages = [], 0
+        while True:
+            body = response.json()
+            ids.extend(row['id'] for row in body['results'])
+            pages += 1
+            if not body['next']:
+                return ids, pages
+            response = self.client.get(body['next'])
+
+    def test_history_pages_are_newest_first_through_equal_timestamps(self):
+        results = [QuizResult.objects.create(user=self.user, subject='ALGO', score=i, total_marks=10) for i in range(5)]
+        # Three share a timestamp, so only the id orders them
+        QuizResult.objects.filter(pk__in=[r.pk for r in results[1:4]]).update(timestamp=self.now - timedelta(hours=1))
+        QuizResult.objects.filter(pk=results[0].pk).update(timestamp=self.now - timedelta(hours=2))
+        QuizResult.objects.create(user=CustomUser.objects.create(username='rival'), subject='ALGO', score=1, total_marks=10)
+
+        ids, pages = self.walk('quiz-history')
+        self.assertEqual(ids, [results[4].pk, results[3].pk, results[2].pk, results[1].pk, results[0].pk])
+        self.assertEqual(pages, 3)
+
+    def test_material_filters_carry_across_pages(self):
+        materials = [StudyMaterial.objects.create(title=f'Notes {i}', subject='ALGO' if i % 2 else 'OS',
+                                                  file=PreviewWorkerTests.SAMPLE) for i in range(7)]
+        ids, _ = self.walk('material-list', subject='ALGO')
+        self.assertEqual(ids, [m.pk for m in reversed(materials) if m.subject == 'ALGO'])
+
+    def test_only_active_challenges_are_listed(self):
+        challenges = [Challenge.objects.create(title=f'Mock {i}', description='Mock', is_active=i != 1) for i in range(4)]
+        self.assertEqual(self.walk('challenge-list')[0], [challenges[3].pk, challenges[2].pk, challenges[0].pk])
+
+    def test_news_pages_are_cached_until_the_feeds_change(self):
+        articles = [
+            NewsArticle.objects.create(title=f'News {i}', link=f'https://example.com/{i}', source='Example',
+                                       publication_date=self.now - timedelta(days=i))
+            for i in range(4)
+        ]
+        NewsArticle.objects.create(title='Old', link='https://example.com/old', source='Example',
+                                   publication_date=self.now - timedelta(days=365))
+        first = self.client.get(reverse('news-list'), {'page_size': 3, 'utm_source': 'mail'}).json()
+        self.assertEqual([row['id'] for row in first['results']], [a.pk for a in articles[:3]])
+        # Only the cursor and page size are carried over
+        self.assertNotIn('utm_source', first['next'])
+
+        NewsArticle.objects.filter(pk=articles[0].pk).update(title='Edited')
+        self.assertEqual(self.client.get(reverse('news-list'), {'page_size': 3}).json(), first)
+        bump_cache_version(NEWS_VERSION_KEY)
+        self.assertEqual(self.client.get(reverse('news-list'), {'page_size': 3}).json()['results'][0]['title'], 'Edited')
+        self.assertEqual(self.walk('news-list', page_size=3)[0], [a.pk for a in articles])
+
+    def test_bad_cursor_is_not_found(self):
+        self.assertEqual(self.client.get(reverse('quiz-history'), {'cursor': 'bogus'}).status_code, 404)
+        self.assertEqual(self.client.get(reverse('news-list'), {'cursor': 'bogus'}).status_code, 404)
@@ -9,13 +9,20 @@ from .views import (
     QuizGenerationView,
     QuestionAnswerView,
     AnalyticsSummaryView,
+    AnalyticsTrendView,
+    QuizHistoryView,
     NewsArticleListView,
     ChallengeListView, 
     StartChallengeView,
     SubmitChallengeView, 
     ChallengeResultView,
+    AttemptAutosaveView,
+    AttemptResumeView,
     LeaderboardView,
     StudyMaterialListView,
+    SearchView,
+    StudyMaterialDownloadView,
+    TaskQueueMetricsView,
 )
 from rest_framework_simplejwt.views import TokenRefreshView
 from .views import QuizSubmissionView
@@ -27,6 +34,8 @@ urlpatterns = [
     path('token/', MyTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('analytics/summary/', AnalyticsSummaryView.as_view(), name='analytics-summary'),
+    path('analytics/trends/', AnalyticsTrendView.as_view(), name='analytics-trends'),
+    path('analytics/history/', QuizHistoryView.as_view(), name='quiz-history'),
     path('practice/quiz/<str:subject>/', QuizGenerationView.as_view(), name='generate-quiz'),
     path('practice/submit/', QuizSubmissionView.as_view(), name='submit-quiz'),
     path('practice/question/<int:pk>/answer/', QuestionAnswerView.as_view(), name='question-answer'),
@@ -34,7 +43,12 @@ urlpatterns = [
     path('challenges/start/', StartChallengeView.as_view(), name='challenge-start'),
     path('challenges/submit/', SubmitChallengeView.as_view(), name='challenge-submit'),
     path('challenges/result/<int:pk>/', ChallengeResultView.as_view(), name='challenge-result'),
+    path('challenges/attempts/<int:pk>/answers/', AttemptAutosaveView.as_view(), name='attempt-autosave'),
+    path('challenges/attempts/<int:pk>/resume/', AttemptResumeView.as_view(), name='attempt-resume'),
     path('leaderboard/', LeaderboardView.as_view(), name='leaderboard'),
     path('information/news/', NewsArticleListView.as_view(), name='news-list'),
     path('materials/', StudyMaterialListView.as_view(), name='material-list'),
+    path('materials/<int:pk>/download/', StudyMaterialDownloadView.as_view(), name='material-download'),
+    path('search/', SearchView.as_view(), name='search'),
+    path('tasks/metrics/', TaskQueueMetricsView.as_view(), name='task-metrics'),
 ]
\ No newline at end of file
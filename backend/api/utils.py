@@ -1,12 +1,16 @@
 # File: backend/api/utils.py
 
-from django.core.mail import send_mail
-from django.conf import settings
+from django.db import connection
+from django.db.models import F
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
 
+from .models import CacheVersion
+from .outbox import queue_email
+
 def send_verification_email(user):
+    # Queued in the outbox and sent by run_email_worker, so registration never waits on SMTP
     token = default_token_generator.make_token(user)
     uid = urlsafe_base64_encode(force_bytes(user.pk))
     
@@ -26,10 +30,27 @@ def send_verification_email(user):
     The GATE Master Team
     """
     
-    send_mail(
-        subject,
-        message,
-        settings.DEFAULT_FROM_EMAIL,
-        [user.email],
-        fail_silently=False,
-    )
\ No newline at end of file
+    queue_email(user.email, subject, message)
+
+def get_cache_version(key):
+    return CacheVersion.objects.filter(key=key).values_list('version', flat=True).first() or 0
+
+
+def bump_cache_version(key):
+    """Increments the shared version counter for `key` and returns the new value."""
+    if not CacheVersion.objects.filter(key=key).update(version=F('version') + 1):
+        CacheVersion.objects.get_or_create(key=key)
+        CacheVersion.objects.filter(key=key).update(version=F('version') + 1)
+    return get_cache_version(key)
+
+
+def lock_for_rebuild(*models):
+    """
+    Blocks other writers to the models' tables until the current transaction ends, so a
+    rebuild can aggregate and rewrite them without losing writes committed in between.
+    SQLite needs nothing: its IMMEDIATE transactions hold the database write lock throughout.
+    """
+    if connection.vendor == 'postgresql':
+        tables = ', '.join(connection.ops.quote_name(model._meta.db_table) for model in models)
+        with connection.cursor() as cursor:
+            cursor.execute(f'LOCK TABLE {tables} IN EXCLUSIVE MODE')
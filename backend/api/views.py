@@ -1,8 +1,12 @@
+import hashlib
 import json
 from django.utils import timezone
-from django.db import transaction
-from django.db.models import Sum, Avg, F, Max, Count
-from datetime import datetime
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from datetime import date, datetime, timezone as dt_timezone
 from dateutil.relativedelta import relativedelta
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_decode
@@ -10,20 +14,35 @@ from django.utils.encoding import force_str
 
 from rest_framework import generics, status, views
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.utils.urls import replace_query_param
 from rest_framework_simplejwt.views import TokenObtainPairView
 
 from .models import (
     CustomUser, Question, QuizResult, NewsArticle, 
-    Challenge, ChallengeAttempt, StudyMaterial
+    Challenge, ChallengeAttempt, StudyMaterial, SubjectStats
 )
 from .serializers import (
     RegisterSerializer, MyTokenObtainPairSerializer, QuizQuestionSerializer, 
     QuizResultSerializer, NewsArticleSerializer, ChallengeSerializer, 
-    ChallengeAttemptSerializer, ChallengeResultSerializer, StudyMaterialSerializer
+    ChallengeResultSerializer, StudyMaterialSerializer
 )
-from .utils import send_verification_email
+from .utils import get_cache_version, send_verification_email
+from .sampling import question_pool
+from .grading import grade_sheet
+from .attempts import close_expired, complete_attempt, deadline_for, is_expired, result_cache_key, submit_grace
+from . import leaderboard
+from .payloads import json_response, render_attempt_json, render_questions_json
+from .analytics import performance_trend, record_quiz_result
+from .rank_index import rank_index_enabled, rank_indexes
+from .papers import PaperGenerationError, claim_paper, generate_paper, link_questions, schedule_refill
+from .news import NEWS_VERSION_KEY, retention_cutoff
+from . import search
+from .downloads import download_response, valid_signature
+from .tasks import queue_metrics
+from .pagination import ChallengePagination, MaterialPagination, NewsPagination, QuizHistoryPagination
+from . import autosave
 
 
 # ====================================================================
@@ -37,9 +56,11 @@ def health_check(request):
 class RegisterView(generics.GenericAPIView):
     serializer_class = RegisterSerializer
     permission_classes = (AllowAny,)
+    @transaction.atomic
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
+        # The user and their verification email are committed together
         user = CustomUser.objects.create_user(
             username=serializer.validated_data['username'],
             email=serializer.validated_data['email'],
@@ -77,12 +98,17 @@ class MyTokenObtainPairView(TokenObtainPairView):
 class QuizGenerationView(generics.ListAPIView):
     serializer_class = QuizQuestionSerializer
     permission_classes = [IsAuthenticated]
-    def get_queryset(self):
+    def list(self, request, *args, **kwargs):
         subject = self.kwargs['subject']
         valid_subjects = [choice[0] for choice in Question.SUBJECT_CHOICES]
         if subject not in valid_subjects:
-            return Question.objects.none()
-        return Question.objects.filter(subject=subject).order_by('?')[:20]
+            return json_response('[]')
+        # Optional filters, e.g., /api/practice/quiz/ALGO/?difficulty=HARD&type=NAT
+        difficulty = request.query_params.get('difficulty') or None
+        question_type = request.query_params.get('type') or None
+        question_ids = question_pool.sample_ids(subject, 20, difficulty=difficulty, question_type=question_type)
+        # Lean path: pre-rendered per-question JSON instead of the serializer
+        return json_response(render_questions_json(question_ids, request))
 
 class QuizSubmissionView(views.APIView):
     permission_classes = [IsAuthenticated]
@@ -96,59 +122,43 @@ class QuizSubmissionView(views.APIView):
         if not all_question_ids:
             return Response({"detail": "Question IDs are missing."}, status=status.HTTP_400_BAD_REQUEST)
 
-        all_questions_in_quiz = Question.objects.filter(id__in=all_question_ids)
-        total_questions = all_questions_in_quiz.count()
-        
-        # --- UPDATED LOGIC ---
-        total_marks = sum(q.marks for q in all_questions_in_quiz if q.id not in revealed_ids_set)
-        
-        score = 0
-        correct_count = 0
-        positive_marks = 0.0 
+        all_questions_in_quiz = list(Question.objects.filter(id__in=all_question_ids))
+        total_questions = len(all_questions_in_quiz)
+
+        # Practice quizzes carry no negative marking; revealed answers don't count
+        sheet = grade_sheet(
+            [q.id for q in all_questions_in_quiz], answers_data,
+            negative_marking=False, excluded_ids=revealed_ids_set
+        )
+        graded = {response.question_id: response for response in sheet.responses}
+        score = sheet.score
+        total_marks = sheet.total_marks
+        correct_count = sheet.correct_count
+        positive_marks = float(sheet.positive_marks)
         detailed_results = []
 
         for question in all_questions_in_quiz:
-            question_id_str = str(question.id)
-            user_answer = answers_data.get(question_id_str)
-            is_correct = False
-            was_revealed = question.id in revealed_ids_set
-
-            if user_answer is not None and not was_revealed:
-                correct_answer_str = str(question.correct_answer).strip()
-                
-                if question.question_type == 'MSQ':
-                    user_answer_sorted = "".join(sorted(user_answer))
-                    correct_answer_sorted = "".join(sorted(correct_answer_str))
-                    if user_answer_sorted == correct_answer_sorted:
-                        is_correct = True
-                else:
-                    if str(user_answer).strip() == correct_answer_str:
-                        is_correct = True
-                
-                if is_correct:
-                    score += question.marks
-                    positive_marks += question.marks 
-                    correct_count += 1
-            
             detailed_results.append({
                 'id': question.id,
                 'question_text': question.question_text,
                 'options': question.options or {},
                 'question_type': question.question_type,
-                'user_answer': user_answer,
+                'user_answer': answers_data.get(str(question.id)),
                 'correct_answer': question.correct_answer,
                 'explanation': question.explanation,
-                'is_correct': is_correct,
-                'was_revealed': was_revealed,
+                'is_correct': graded[question.id].is_correct,
+                'was_revealed': question.id in revealed_ids_set,
             })
         
         if subject:
-            QuizResult.objects.create(
-                user=request.user,
-                subject=subject,
-                score=score,
-                total_marks=total_marks
-            )
+            with transaction.atomic():
+                result = QuizResult.objects.create(
+                    user=request.user,
+                    subject=subject,
+                    score=score,
+                    total_marks=total_marks
+                )
+                record_quiz_result(result)
 
         return Response({
             'score': score,
@@ -176,6 +186,7 @@ class ChallengeListView(generics.ListAPIView):
     queryset = Challenge.objects.filter(is_active=True)
     serializer_class = ChallengeSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ChallengePagination
 
 class StartChallengeView(views.APIView):
     permission_classes = [IsAuthenticated]
@@ -188,65 +199,93 @@ class StartChallengeView(views.APIView):
             challenge = Challenge.objects.get(id=challenge_id, is_active=True)
         except Challenge.DoesNotExist:
             return Response({"detail": "Challenge not found or is not active."}, status=status.HTTP_404_NOT_FOUND)
-        questions_to_add = []
-        try:
-            for subject_code, count in challenge.config.items():
-                questions = Question.objects.filter(subject=subject_code).order_by('?')[:count]
-                if questions.count() < count:
-                    return Response({"detail": f"Not enough questions for subject {subject_code}. Required: {count}, Found: {questions.count()}"}, status=status.HTTP_400_BAD_REQUEST)
-                questions_to_add.extend(questions)
-        except Exception as e:
-            return Response({"detail": f"Invalid challenge configuration: {e}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        attempt = ChallengeAttempt.objects.create(user=request.user, challenge=challenge)
-        attempt.questions.set(questions_to_add)
-        serializer = ChallengeAttemptSerializer(attempt)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        # Take a pre-generated paper from the pool; only build one here if the pool has run dry
+        question_ids_to_add = claim_paper(challenge)
+        if question_ids_to_add is None:
+            try:
+                question_ids_to_add = generate_paper(challenge)
+            except PaperGenerationError as e:
+                return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            except Exception as e:
+                return Response({"detail": f"Invalid challenge configuration: {e}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        attempt = ChallengeAttempt.objects.create(user=request.user, challenge=challenge, deadline=deadline_for(challenge))
+        link_questions(attempt, question_ids_to_add)
+        schedule_refill(challenge)
+        return json_response(render_attempt_json(attempt, question_ids_to_add, request), status=status.HTTP_201_CREATED)
 
 class SubmitChallengeView(views.APIView):
     permission_classes = [IsAuthenticated]
+    @transaction.atomic
     def post(self, request, *args, **kwargs):
         attempt_id = request.data.get('attempt_id')
         answers_data = request.data.get('answers', {})
         try:
-            attempt = ChallengeAttempt.objects.get(id=attempt_id, user=request.user, status='IN_PROGRESS')
+            # Lock the row so a double-clicked submit can't grade the attempt twice
+            attempt = ChallengeAttempt.objects.select_for_update().get(id=attempt_id, user=request.user, status='IN_PROGRESS')
         except ChallengeAttempt.DoesNotExist:
             return Response({"detail": "Active challenge attempt not found."}, status=status.HTTP_404_NOT_FOUND)
-        questions = attempt.questions.all()
-        score = 0.0
-        for question in questions:
-            question_id_str = str(question.id)
-            user_answer = answers_data.get(question_id_str)
-            if user_answer is None or user_answer == '' or user_answer == []:
-                continue
-            is_correct = False
-            correct_answer_str = str(question.correct_answer).strip()
-            if question.question_type == 'MSQ':
-                user_answer_sorted = "".join(sorted(user_answer))
-                correct_answer_sorted = "".join(sorted(correct_answer_str))
-                if user_answer_sorted == correct_answer_sorted:
-                    is_correct = True
-            else: 
-                if str(user_answer).strip() == correct_answer_str:
-                    is_correct = True
-            if is_correct:
-                score += question.marks
-            elif question.question_type == 'MCQ':
-                if question.marks == 1:
-                    score -= 1/3
-                elif question.marks == 2:
-                    score -= 2/3
-        attempt.score = round(score, 2)
-        attempt.end_time = timezone.now()
-        attempt.status = 'COMPLETED'
-        attempt.answers = answers_data
-        attempt.save()
-        return Response({'attempt_id': attempt.id, 'score': attempt.score}, status=status.HTTP_200_OK)
+        if is_expired(attempt):
+            # The deadline is the server's: a late submit is graded on what was autosaved in time
+            close_expired([attempt])
+            return Response({'attempt_id': attempt.id, 'score': attempt.score, 'predicted_rank': attempt.predicted_rank, 'expired': True}, status=status.HTTP_200_OK)
+        # Autosaved answers count too; the body's answers override them
+        complete_attempt(attempt, autosave.final_answers(attempt.id, answers_data))
+        autosave.discard(attempt.id)
+        leaderboard.record_attempt(attempt)
+        return Response({'attempt_id': attempt.id, 'score': attempt.score, 'predicted_rank': attempt.predicted_rank}, status=status.HTTP_200_OK)
+
+class AttemptAutosaveView(views.APIView):
+    """
+    Saves answer deltas of an in-progress attempt, e.g.
+    PATCH {"answers": {"101": "B", "102": ["A", "C"], "103": null}}.
+    Replies once the deltas are in the database; a later delta for a question replaces an earlier one.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def patch(self, request, pk, *args, **kwargs):
+        state = autosave.attempt_state(pk, request.user)
+        if state is None:
+            return Response({"detail": "Active challenge attempt not found."}, status=status.HTTP_404_NOT_FOUND)
+        question_ids, deadline = state
+        if deadline is not None and timezone.now() > deadline + submit_grace():
+            return Response({"detail": "Time is up for this attempt."}, status=status.HTTP_409_CONFLICT)
+        try:
+            deltas = autosave.parse_deltas(request.data.get('answers'), question_ids)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            saved = autosave.save_answers(pk, deltas)
+        except DatabaseError:
+            return Response({"detail": "Could not save answers; try again."}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        if not saved:
+            return Response({"detail": "This attempt has already been submitted."}, status=status.HTTP_409_CONFLICT)
+        return Response({'attempt_id': pk, 'saved': len(deltas)}, status=status.HTTP_200_OK)
+
+class AttemptResumeView(views.APIView):
+    """An in-progress attempt's paper with its autosaved answers, to pick it up after a reload or crash."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk, *args, **kwargs):
+        attempt = get_object_or_404(ChallengeAttempt, id=pk, user=request.user, status='IN_PROGRESS')
+        question_ids = list(ChallengeAttempt.questions.through.objects.filter(
+            challengeattempt_id=attempt.id).order_by('id').values_list('question_id', flat=True))
+        body = render_attempt_json(attempt, question_ids, request)
+        return json_response(body[:-1] + f',"answers":{json.dumps(autosave.saved_answers(attempt.id))}}}')
 
 class ChallengeResultView(generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = ChallengeResultSerializer
     def get_queryset(self):
-        return ChallengeAttempt.objects.filter(user=self.request.user, status='COMPLETED')
+        return ChallengeAttempt.objects.filter(user=self.request.user, status='COMPLETED').select_related('challenge')
+
+    def retrieve(self, request, *args, **kwargs):
+        # Cached per user, attempt and host until a question edit or rank recompute bumps the version
+        cache_key = result_cache_key(request.user.id, kwargs['pk'], request.get_host())
+        data = cache.get(cache_key)
+        if data is None:
+            data = self.get_serializer(self.get_object()).data
+            cache.set(cache_key, data, settings.CHALLENGE_RESULT_CACHE_TIMEOUT)
+        return Response(data)
 
 # ====================================================================
 # INFORMATION & ANALYTICS VIEWS
@@ -257,41 +296,46 @@ class AnalyticsSummaryView(views.APIView):
 
     def get(self, request, *args, **kwargs):
         user = request.user
-        results = QuizResult.objects.filter(user=user)
+        # Per-subject rollups maintained by QuizSubmissionView (at most one row per subject)
+        stats = list(SubjectStats.objects.filter(user=user))
         
-        if not results.exists():
+        if not stats:
             return Response({
                 "overall_accuracy": 0, "quizzes_taken": 0,
                 "subject_performance": [], "recent_activity": [],
                 "subject_distribution": [] # Add new key for empty state
             })
 
-        # 1. Overall Performance (unchanged)
-        overall_stats = results.aggregate(total_score=Sum('score'), total_possible=Sum('total_marks'))
-        overall_accuracy = (overall_stats['total_score'] / overall_stats['total_possible']) * 100 if overall_stats['total_possible'] > 0 else 0
+        # 1. Overall Performance
+        total_score = sum(s.score_sum for s in stats)
+        total_possible = sum(s.total_marks_sum for s in stats)
+        overall_accuracy = (total_score / total_possible) * 100 if total_possible > 0 else 0
 
-        # 2. Subject-wise Performance (unchanged)
-        subject_performance = results.values('subject').annotate(
-            subject_name=F('subject'),
-            avg_accuracy=Avg(F('score') * 100.0 / F('total_marks'))
-        ).order_by('-avg_accuracy')
-        
+        # 2. Subject-wise Performance (average of per-quiz accuracy)
         subject_map = dict(Question.SUBJECT_CHOICES)
-        subject_performance_data = [{**item, 'subject_name': subject_map.get(item['subject_name'])} for item in subject_performance]
+        subject_performance_data = [
+            {
+                'subject': s.subject,
+                'subject_name': subject_map.get(s.subject),
+                'avg_accuracy': s.accuracy_sum / s.graded_attempts if s.graded_attempts else None,
+            }
+            for s in stats
+        ]
+        subject_performance_data.sort(key=lambda item: (item['avg_accuracy'] is None, -(item['avg_accuracy'] or 0)))
 
         # 3. Recent Activity (now fetches last 10 for the trend chart)
-        recent_activity = results.order_by('-timestamp')[:10]
+        recent_activity = QuizResult.objects.filter(user=user).order_by('-timestamp')[:10]
         recent_activity_data = QuizResultSerializer(recent_activity, many=True).data
 
-        # 4. NEW: Calculate Subject Distribution (for the doughnut chart)
-        subject_distribution = results.values('subject').annotate(
-            count=Count('id')
-        ).order_by('-count')
-        subject_distribution_data = [{**item, 'subject_name': subject_map.get(item['subject'])} for item in subject_distribution]
+        # 4. Subject Distribution (for the doughnut chart)
+        subject_distribution_data = [
+            {'subject': s.subject, 'count': s.attempts, 'subject_name': subject_map.get(s.subject)}
+            for s in sorted(stats, key=lambda s: -s.attempts)
+        ]
 
         response_data = {
             "overall_accuracy": round(overall_accuracy, 2),
-            "quizzes_taken": results.count(),
+            "quizzes_taken": sum(s.attempts for s in stats),
             "subject_performance": subject_performance_data,
             "recent_activity": recent_activity_data,
             "subject_distribution": subject_distribution_data, 
@@ -299,59 +343,157 @@ class AnalyticsSummaryView(views.APIView):
         
         return Response(response_data)
 
+class AnalyticsTrendView(views.APIView):
+    """
+    Accuracy trend built from the daily buckets, e.g.
+    /api/analytics/trends/?granularity=week&subject=ALGO&start=2025-01-01&end=2025-06-30
+    Defaults to the last 6 months at monthly granularity.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        granularity = request.query_params.get('granularity', 'month')
+        if granularity not in ('day', 'week', 'month'):
+            return Response({"detail": "granularity must be one of day, week or month."}, status=status.HTTP_400_BAD_REQUEST)
+        subject = request.query_params.get('subject')
+        if subject and subject not in dict(Question.SUBJECT_CHOICES):
+            return Response({"detail": f"Unknown subject {subject}."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            end = date.fromisoformat(request.query_params['end']) if 'end' in request.query_params else timezone.localdate()
+            start = date.fromisoformat(request.query_params['start']) if 'start' in request.query_params else end - relativedelta(months=6)
+        except ValueError:
+            return Response({"detail": "start and end must be dates in YYYY-MM-DD format."}, status=status.HTTP_400_BAD_REQUEST)
+
+        subject_map = dict(Question.SUBJECT_CHOICES)
+        trend = [
+            {**row, 'subject_name': subject_map.get(row['subject'])}
+            for row in performance_trend(request.user, start, end, granularity, subject)
+        ]
+        return Response({
+            'granularity': granularity,
+            'start': start,
+            'end': end,
+            'trend': trend,
+        })
+
+class QuizHistoryView(generics.ListAPIView):
+    """The user's quiz results, newest first, cursor-paginated, e.g. /api/analytics/history/?page_size=50"""
+    serializer_class = QuizResultSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = QuizHistoryPagination
+
+    def get_queryset(self):
+        return QuizResult.objects.filter(user=self.request.user)
+
 class NewsArticleListView(generics.ListAPIView):
     permission_classes = [AllowAny]
     serializer_class = NewsArticleSerializer
+    pagination_class = NewsPagination
     def get_queryset(self):
-        two_months_ago = timezone.now() - relativedelta(months=2)
-        return NewsArticle.objects.filter(publication_date__gte=two_months_ago)
+        return NewsArticle.objects.filter(publication_date__gte=retention_cutoff())
+
+    def list(self, request, *args, **kwargs):
+        # Articles only change when feeds are refreshed or pruned, which bumps the news version.
+        # Each page is cached under its cursor position and size, and the scheme and host its
+        # absolute `next` link was built with; other query parameters don't make new entries.
+        page = f"{request.scheme}://{request.get_host()}:{self.paginator.page_key(request)}"
+        cache_key = f"news_list:{get_cache_version(NEWS_VERSION_KEY)}:{hashlib.md5(page.encode()).hexdigest()}"
+        data = cache.get(cache_key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(cache_key, data, settings.NEWS_LIST_CACHE_TIMEOUT)
+        return Response(data)
     
 
 class LeaderboardView(views.APIView):
+    """
+    Best scores overall, or within one challenge with ?challenge=<id>, LEADERBOARD_PAGE_SIZE
+    per page (?page_size= up to LEADERBOARD_MAX_PAGE_SIZE). Pages are keyset-paginated:
+    `next` carries the last entry's (score, time, user), so a deep page costs the same as
+    the first. The caller's rank and neighbours come with the first page.
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
-        # --- 1. Get the Top 100 users based on their max score ---
-        top_users_data = ChallengeAttempt.objects.filter(status='COMPLETED').values(
-            'user__username' # Group by username
-        ).annotate(
-            max_score=Max('score') # Find the max score for each user
-        ).order_by('-max_score')[:100] # Order by score descending, take top 100
-
-        # Add rank to the top users data
-        top_100_leaderboard = []
-        for i, user_data in enumerate(top_users_data, 1):
-            top_100_leaderboard.append({
-                'rank': i,
-                'username': user_data['user__username'],
-                'score': user_data['max_score'],
-            })
-            
-        # --- 2. Get the current user's personal rank and best score ---
         current_user = request.user
-        user_best_attempt = ChallengeAttempt.objects.filter(
-            user=current_user, status='COMPLETED'
-        ).order_by('-score').first()
-
         current_user_rank_data = None
-        if user_best_attempt:
-            # Count how many unique users have a better max score
-            higher_ranked_users_count = ChallengeAttempt.objects.filter(
-                status='COMPLETED', 
-                score__gt=user_best_attempt.score
-            ).values('user').distinct().count()
-            
-            user_rank = higher_ranked_users_count + 1
-            current_user_rank_data = {
-                'rank': user_rank,
-                'username': current_user.username,
-                'score': user_best_attempt.score,
-            }
+        around_me = []
+
+        challenge_id = request.query_params.get('challenge')
+        if challenge_id is not None:
+            if not challenge_id.isdigit():
+                return Response({"detail": "challenge must be a challenge ID."}, status=status.HTTP_400_BAD_REQUEST)
+            challenge_id = int(challenge_id)
+            if not Challenge.objects.filter(pk=challenge_id).exists():
+                return Response({"detail": "Challenge not found."}, status=status.HTTP_404_NOT_FOUND)
+        max_page_size = getattr(settings, 'LEADERBOARD_MAX_PAGE_SIZE', 500)
+        try:
+            page_size = min(max(int(request.query_params.get('page_size', getattr(settings, 'LEADERBOARD_PAGE_SIZE', 100))), 1), max_page_size)
+        except ValueError:
+            return Response({"detail": "page_size must be a number."}, status=status.HTTP_400_BAD_REQUEST)
+        cursor = request.query_params.get('cursor')
+        try:
+            cursor = leaderboard.decode_cursor(cursor) if cursor else None
+        except ValueError:
+            return Response({"detail": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if rank_index_enabled():
+            # --- In-process sorted index: a page, rank and neighbours in O(log n) ---
+            index = rank_indexes.get(challenge_id)
+            # One extra entry tells whether there's a next page
+            page = [
+                (position, score, datetime.fromtimestamp(achieved_at, tz=dt_timezone.utc), user_id, username)
+                for position, (score, achieved_at, user_id, username) in index.page_after(
+                    cursor and (cursor[0], cursor[1].timestamp(), cursor[2]), page_size + 1)
+            ]
+            user_entry = index.entry_for(current_user.id) if cursor is None else None
+            if user_entry:
+                current_user_rank_data = {
+                    'rank': index.rank(current_user.id),
+                    'username': current_user.username,
+                    'score': user_entry[0],
+                }
+                around_me = [
+                    {'rank': position, 'username': username, 'score': score}
+                    for position, (score, _, _, username) in index.around(current_user.id)
+                ]
+        else:
+            # --- 1. A page of the best-score table: an index range scan from the cursor ---
+            page = [
+                (position, entry.best_score, entry.achieved_at, entry.user_id, entry.user.username)
+                for position, entry in leaderboard.page_after(challenge_id, cursor, page_size + 1)
+            ]
+
+            # --- 2. Get the current user's personal rank and best score ---
+            user_entry = leaderboard.user_entry(current_user, challenge_id) if cursor is None else None
+            if user_entry:
+                current_user_rank_data = {
+                    'rank': leaderboard.rank_of(user_entry),
+                    'username': current_user.username,
+                    'score': user_entry.best_score,
+                }
+                around_me = [
+                    {'rank': position, 'username': entry.user.username, 'score': entry.best_score}
+                    for position, entry in leaderboard.around(user_entry)
+                ]
 
         # --- 3. Compile the final response ---
+        next_url = None
+        if len(page) > page_size:
+            page = page[:page_size]
+            position, score, achieved_at, user_id, _ = page[-1]
+            next_url = replace_query_param(
+                request.build_absolute_uri(), 'cursor', leaderboard.encode_cursor(score, achieved_at, user_id, position)
+            )
         response_data = {
-            'leaderboard': top_100_leaderboard,
+            'challenge': challenge_id,
+            'leaderboard': [
+                {'rank': position, 'username': username, 'score': score}
+                for position, score, _, _, username in page
+            ],
+            'next': next_url,
             'user_rank': current_user_rank_data,
+            'around_me': around_me,
         }
 
         return Response(response_data)
@@ -363,14 +505,81 @@ class LeaderboardView(views.APIView):
 class StudyMaterialListView(generics.ListAPIView):
     serializer_class = StudyMaterialSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = MaterialPagination
 
     def get_queryset(self):
         """
-        Optionally filters the materials by a 'subject' query parameter.
-        e.g., /api/materials/?subject=ALGO
+        Optionally filters the materials by 'subject' and a full-text 'search' query.
+        e.g., /api/materials/?subject=ALGO&search=dynamic programming
         """
         queryset = StudyMaterial.objects.all()
         subject = self.request.query_params.get('subject')
         if subject:
             queryset = queryset.filter(subject=subject)
-        return queryset
\ No newline at end of file
+        search_term = self.request.query_params.get('search')
+        if search_term:
+            ids = search.matching_ids('material', search_term)
+            queryset = queryset.filter(id__in=ids) if ids is not None else queryset.none()
+        return queryset
+
+
+class StudyMaterialDownloadView(views.APIView):
+    """
+    Streams a material's file with Range and If-None-Match/If-Modified-Since support.
+    Authorized by the signed link from StudyMaterialSerializer or by a JWT.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, pk, *args, **kwargs):
+        material = get_object_or_404(StudyMaterial, pk=pk)
+        if not material.file:
+            raise Http404
+        if not (valid_signature(material, request.query_params.get('sig')) or request.user.is_authenticated):
+            return Response({"detail": "Invalid or missing download signature."}, status=status.HTTP_403_FORBIDDEN)
+        return download_response(request, material)
+
+# ====================================================================
+# SEARCH
+# ====================================================================
+
+class SearchView(views.APIView):
+    """
+    Ranked full-text search over questions and study materials.
+    e.g., /api/search/?q=shortest path&kind=question&subject=ALGO&type=MCQ
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        kind = params.get('kind')
+        if kind and kind not in search.KINDS:
+            return Response({"detail": f"kind must be one of: {', '.join(search.KINDS)}."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(params.get('limit', 20)), 1), 100)
+        except ValueError:
+            return Response({"detail": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        hits = search.search(params.get('q'), kind=kind, subject=params.get('subject'), item_type=params.get('type'), limit=limit)
+        return Response({
+            'query': params.get('q', ''),
+            'results': [
+                {
+                    'kind': hit.kind,
+                    'id': hit.object_id,
+                    'subject': hit.subject,
+                    'type': hit.item_type or None,
+                    'title': hit.title,
+                    'excerpt': hit.excerpt,
+                    'score': round(hit.score, 4),
+                }
+                for hit in hits
+            ],
+        })
+
+
+class TaskQueueMetricsView(views.APIView):
+    """Background task queue depth and latency over the last hour, for monitoring."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(queue_metrics())
@@ -84,6 +84,22 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Take the write lock at BEGIN so concurrent writers (e.g. background pool refills)
+        # wait for each other instead of failing with "database is locked"
+        "OPTIONS": {
+            "transaction_mode": "IMMEDIATE",
+            "timeout": 20,
+        },
+    }
+}
+
+
+# Cache used for compiled answer keys and pre-rendered question payloads.
+# Point this at Redis/Memcached in production so all workers share it.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {"MAX_ENTRIES": 100000},
     }
 }
 
@@ -145,9 +161,135 @@ REST_FRAMEWORK = {
 AUTH_USER_MODEL = 'api.CustomUser'
 
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
-EMAIL_HOST = 'smtp.gmail.com'
-EMAIL_PORT = 587
-EMAIL_USE_TLS = True
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', 587))
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True') == 'True'
 EMAIL_HOST_USER = os.getenv('EMAIL_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_PASS')
-DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
\ No newline at end of file
+DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
+
+# Seconds before the in-memory question sampling index (api/sampling.py) is rebuilt
+# to pick up changes that sent no signals, and how often each worker checks the shared
+# version counter that question saves and deletes bump
+QUESTION_POOL_TTL = int(os.getenv('QUESTION_POOL_TTL', 300))
+QUESTION_POOL_CHECK_INTERVAL = float(os.getenv('QUESTION_POOL_CHECK_INTERVAL', 2))
+
+# Pre-generated challenge papers kept per active challenge (api/papers.py); starting a
+# challenge triggers a background refill once the pool drops below the watermark
+CHALLENGE_POOL_SIZE = int(os.getenv('CHALLENGE_POOL_SIZE', 20))
+CHALLENGE_POOL_WATERMARK = int(os.getenv('CHALLENGE_POOL_WATERMARK', 5))
+
+# Serve the leaderboard from a per-worker sorted index (api/rank_index.py). Workers
+# re-check the shared version counter at most every LEADERBOARD_INDEX_CHECK_INTERVAL seconds
+# and replay the logged changes, reloading instead when more than LEADERBOARD_INDEX_MAX_REPLAY behind.
+LEADERBOARD_RANK_INDEX = os.getenv('LEADERBOARD_RANK_INDEX', 'True') == 'True'
+LEADERBOARD_INDEX_CHECK_INTERVAL = float(os.getenv('LEADERBOARD_INDEX_CHECK_INTERVAL', 2))
+LEADERBOARD_INDEX_MAX_REPLAY = int(os.getenv('LEADERBOARD_INDEX_MAX_REPLAY', 1000))
+# Leaderboard entries per page (keyset-paginated with ?cursor=), and the most ?page_size= may ask for
+LEADERBOARD_PAGE_SIZE = int(os.getenv('LEADERBOARD_PAGE_SIZE', 100))
+LEADERBOARD_MAX_PAGE_SIZE = int(os.getenv('LEADERBOARD_MAX_PAGE_SIZE', 500))
+
+# How long a rendered challenge result stays cached; question edits and recompute_predicted_ranks
+# invalidate it sooner
+CHALLENGE_RESULT_CACHE_TIMEOUT = int(os.getenv('CHALLENGE_RESULT_CACHE_TIMEOUT', 60 * 60 * 24))
+
+# News ingestion (api/news.py). NEWS_SOURCES names the registered feed sources to fetch (or
+# dotted paths to FeedSource subclasses); NEWS_FEED_URLS, comma-separated, are the plain RSS
+# feeds of the 'rss' source, e.g. a local server serving fixture RSS.
+NEWS_FEED_URLS = [url for url in os.getenv('NEWS_FEED_URLS', '').split(',') if url]
+NEWS_SOURCES = [name for name in os.getenv('NEWS_SOURCES', 'rss' if NEWS_FEED_URLS else 'google_news').split(',') if name]
+NEWS_RETENTION_MONTHS = int(os.getenv('NEWS_RETENTION_MONTHS', 2))
+
+# run_news_worker: seconds between fetches of a healthy feed, and the exponential backoff
+# (base and cap, in seconds) applied to a failing one
+NEWS_REFRESH_INTERVAL = int(os.getenv('NEWS_REFRESH_INTERVAL', 30 * 60))
+NEWS_BACKOFF_BASE = int(os.getenv('NEWS_BACKOFF_BASE', 60))
+NEWS_BACKOFF_MAX = int(os.getenv('NEWS_BACKOFF_MAX', 6 * 60 * 60))
+NEWS_PRUNE_BATCH_SIZE = int(os.getenv('NEWS_PRUNE_BATCH_SIZE', 1000))
+# Cached news lists are also invalidated by version bumps; the timeout only bounds how long
+# aged-out articles stay listed when no worker is pruning them
+NEWS_LIST_CACHE_TIMEOUT = int(os.getenv('NEWS_LIST_CACHE_TIMEOUT', 60 * 60))
+
+# Resized WebP/JPEG variants of question images (api/images.py): target widths in pixels,
+# encoder quality, and whether uploads get their variants rendered in the background
+IMAGE_VARIANT_WIDTHS = tuple(int(w) for w in os.getenv('IMAGE_VARIANT_WIDTHS', '320,640,1024').split(','))
+IMAGE_VARIANT_QUALITY = int(os.getenv('IMAGE_VARIANT_QUALITY', 80))
+IMAGE_VARIANTS_ON_UPLOAD = os.getenv('IMAGE_VARIANTS_ON_UPLOAD', 'True') == 'True'
+
+# Store uploaded question images and study materials once per content hash (api/storage.py);
+# gc_media deletes files that stayed unreferenced for MEDIA_GC_GRACE_HOURS
+CONTENT_ADDRESSED_MEDIA = os.getenv('CONTENT_ADDRESSED_MEDIA', 'True') == 'True'
+MEDIA_GC_GRACE_HOURS = int(os.getenv('MEDIA_GC_GRACE_HOURS', 24))
+# Study material files are kept here, apart from the other uploads: downloads go through the
+# signed, counted download view, so the front server must not serve this directory
+PRIVATE_MEDIA_ROOT = os.getenv('PRIVATE_MEDIA_ROOT', str(BASE_DIR / 'private_media'))
+
+# Study material downloads (api/downloads.py). MATERIAL_DOWNLOAD_ACCEL hands the transfer to the
+# front server: 'nginx' sends X-Accel-Redirect to MATERIAL_ACCEL_REDIRECT_PREFIX + file name
+# (an internal location aliased to PRIVATE_MEDIA_ROOT), 'sendfile' sends X-Sendfile with the file path.
+MATERIAL_DOWNLOAD_ACCEL = os.getenv('MATERIAL_DOWNLOAD_ACCEL', '')
+MATERIAL_ACCEL_REDIRECT_PREFIX = os.getenv('MATERIAL_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+# Signed download links expire after MATERIAL_DOWNLOAD_LINK_MAX_AGE seconds; links issued within
+# the same MATERIAL_DOWNLOAD_LINK_WINDOW are identical, so browsers keep reusing their cached copy
+MATERIAL_DOWNLOAD_LINK_MAX_AGE = int(os.getenv('MATERIAL_DOWNLOAD_LINK_MAX_AGE', 6 * 60 * 60))
+MATERIAL_DOWNLOAD_LINK_WINDOW = int(os.getenv('MATERIAL_DOWNLOAD_LINK_WINDOW', 60 * 60))
+# Download counts are buffered per worker and written by a background thread every
+# MATERIAL_DOWNLOAD_FLUSH_INTERVAL seconds, or sooner once this many downloads accumulate
+MATERIAL_DOWNLOAD_FLUSH_SIZE = int(os.getenv('MATERIAL_DOWNLOAD_FLUSH_SIZE', 50))
+MATERIAL_DOWNLOAD_FLUSH_INTERVAL = int(os.getenv('MATERIAL_DOWNLOAD_FLUSH_INTERVAL', 10))
+
+# run_preview_worker: width in pixels of the first-page thumbnails shown with study materials.
+# PDF thumbnails are rendered by poppler's pdftoppm (e.g. apt install poppler-utils), which must
+# be on the worker's PATH; without it PDFs get a page count but no thumbnail and are marked
+# failed, so run_preview_worker --retry-failed makes their thumbnails once poppler is installed
+MATERIAL_THUMBNAIL_WIDTH = int(os.getenv('MATERIAL_THUMBNAIL_WIDTH', 320))
+
+# Email outbox (api/outbox.py), drained by run_email_worker over one SMTP connection.
+# Failed sends retry with exponential backoff (base and cap in seconds) up to EMAIL_MAX_ATTEMPTS;
+# a worker's claim on a batch expires after EMAIL_OUTBOX_LEASE seconds if it dies mid-send.
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', 50))
+EMAIL_OUTBOX_LEASE = int(os.getenv('EMAIL_OUTBOX_LEASE', 5 * 60))
+EMAIL_RETRY_BASE = int(os.getenv('EMAIL_RETRY_BASE', 60))
+EMAIL_RETRY_MAX = int(os.getenv('EMAIL_RETRY_MAX', 60 * 60))
+EMAIL_MAX_ATTEMPTS = int(os.getenv('EMAIL_MAX_ATTEMPTS', 10))
+# Sent messages are deleted from the outbox after this many days
+EMAIL_OUTBOX_RETENTION_DAYS = int(os.getenv('EMAIL_OUTBOX_RETENTION_DAYS', 7))
+
+# Background task queue (api/tasks.py) run by run_worker. A running task's lease is renewed
+# while it runs; a worker that dies lets it lapse and the task is requeued. Failed tasks retry
+# with exponential backoff (base and cap in seconds); finished ones are kept TASK_RETENTION_DAYS.
+TASK_WORKER_CONCURRENCY = int(os.getenv('TASK_WORKER_CONCURRENCY', 4))
+TASK_LEASE_SECONDS = int(os.getenv('TASK_LEASE_SECONDS', 5 * 60))
+TASK_RETRY_BASE = int(os.getenv('TASK_RETRY_BASE', 10))
+TASK_RETRY_MAX = int(os.getenv('TASK_RETRY_MAX', 60 * 60))
+TASK_RETENTION_DAYS = int(os.getenv('TASK_RETENTION_DAYS', 7))
+# Periodic tasks queued by `run_worker --schedule`: task name -> seconds between runs.
+# Pool refills and image variants are queued on demand and also need a worker running.
+TASK_SCHEDULE = {
+    'news.refresh': int(os.getenv('TASK_SCHEDULE_NEWS', 60)),
+    'email.drain_outbox': int(os.getenv('TASK_SCHEDULE_EMAIL', 10)),
+    'challenges.expire_attempts': int(os.getenv('TASK_SCHEDULE_EXPIRE_ATTEMPTS', 60)),
+    'media.gc': int(os.getenv('TASK_SCHEDULE_MEDIA_GC', 24 * 60 * 60)),
+}
+
+# Challenge autosave (api/autosave.py): the client sends changed answers every few seconds and
+# each request writes them straight away. Who may autosave to an attempt is cached this long
+AUTOSAVE_ACCESS_CACHE_TIMEOUT = int(os.getenv('AUTOSAVE_ACCESS_CACHE_TIMEOUT', 60))
+
+# Challenge attempts close at start + Challenge.duration_minutes. Submits and autosaves are still
+# accepted this many seconds past the deadline; later, expire_attempts grades what was saved in time.
+CHALLENGE_SUBMIT_GRACE_SECONDS = int(os.getenv('CHALLENGE_SUBMIT_GRACE_SECONDS', 30))
+
+# Predicted ranks (api/ranks.py): a submitted score is ranked against a per-challenge score
+# histogram, reloaded by each worker every SCORE_DISTRIBUTION_REFRESH seconds. GATE_RANK_TABLE
+# may point at a CSV of historical `marks,rank` rows (marks out of 100); the rank it gives is
+# blended with the on-site standing using PREDICTED_RANK_TABLE_WEIGHT (1 = the table alone).
+SCORE_BUCKETS_PER_MARK = int(os.getenv('SCORE_BUCKETS_PER_MARK', 3))
+SCORE_DISTRIBUTION_REFRESH = int(os.getenv('SCORE_DISTRIBUTION_REFRESH', 30))
+GATE_RANK_TABLE = os.getenv('GATE_RANK_TABLE', '')
+PREDICTED_RANK_TABLE_WEIGHT = float(os.getenv('PREDICTED_RANK_TABLE_WEIGHT', 0.5))
+
+# Cursor-paginated lists (api/pagination.py): news, materials, challenges and quiz history.
+# Clients may ask for up to API_MAX_PAGE_SIZE rows with ?page_size=
+API_PAGE_SIZE = int(os.getenv('API_PAGE_SIZE', 20))
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', 100))
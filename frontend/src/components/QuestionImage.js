@@ -0,0 +1,16 @@
+// File: frontend/src/components/QuestionImage.js
+
+import React from 'react';
+
+// Lets the browser pick a resized WebP (or JPEG) variant for the screen instead of the original upload
+const SIZES = '(max-width: 768px) 100vw, 720px';
+
+const QuestionImage = ({ src, srcset, className }) => (
+    <picture>
+        {srcset && srcset.webp && <source type="image/webp" srcSet={srcset.webp} sizes={SIZES} />}
+        {srcset && srcset.jpeg && <source type="image/jpeg" srcSet={srcset.jpeg} sizes={SIZES} />}
+        <img src={src} alt="Question figure" className={className} loading="lazy" />
+    </picture>
+);
+
+export default QuestionImage;
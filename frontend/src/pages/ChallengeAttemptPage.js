@@ -1,8 +1,12 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import { useParams, useLocation, useNavigate } from 'react-router-dom';
 import { Container, Row, Col, Card, Button, Modal, Form, Badge, Spinner } from 'react-bootstrap';
 import axiosInstance from '../utils/axiosInstance';
 import Timer from '../components/Timer';
+import QuestionImage from '../components/QuestionImage';
+
+// Answers changed since the last autosave are sent this often
+const AUTOSAVE_INTERVAL_MS = 3000;
 
 const getStatusColor = (status) => {
     switch (status) {
@@ -19,7 +23,7 @@ const ChallengeAttemptPage = () => {
     const location = useLocation();
     const navigate = useNavigate();
 
-    const [questions] = useState(() => location.state?.attemptData?.questions || []);
+    const [questions, setQuestions] = useState(() => location.state?.attemptData?.questions || []);
     const [currentQuestionIndex, setCurrentQuestionIndex] = useState(0);
     const [answers, setAnswers] = useState({});
     const [statuses, setStatuses] = useState(() => {
@@ -33,12 +37,67 @@ const ChallengeAttemptPage = () => {
     });
     const [showSubmitModal, setShowSubmitModal] = useState(false);
     const [isSubmitting, setIsSubmitting] = useState(false);
+    // The server's deadline decides; the timer only counts down to it
+    const [deadline, setDeadline] = useState(() => location.state?.attemptData?.deadline || null);
+    const answersRef = useRef({});
+    const dirtyRef = useRef(new Set());
+    const inFlightRef = useRef(new Set());
 
+    // Restore autosaved answers, and the paper itself if the page was opened without it
     useEffect(() => {
-        if (!location.state?.attemptData) {
-            navigate('/challenges', { replace: true });
-        }
-    }, [location.state, navigate]);
+        axiosInstance.get(`/challenges/attempts/${attemptId}/resume/`)
+            .then(({ data }) => {
+                setDeadline(data.deadline);
+                setQuestions(prev => (prev.length > 0 ? prev : data.questions));
+                const types = Object.fromEntries(data.questions.map(q => [String(q.id), q.question_type]));
+                const restored = {};
+                Object.entries(data.answers).forEach(([id, value]) => {
+                    if (value === null) return;
+                    restored[id] = types[id] === 'MSQ' ? value.split('') : value;
+                });
+                setAnswers(prev => {
+                    answersRef.current = { ...restored, ...prev };
+                    return answersRef.current;
+                });
+                setStatuses(prev => {
+                    const next = { ...prev };
+                    data.questions.forEach(q => {
+                        if (restored[q.id] !== undefined && !['review', 'answeredReview'].includes(next[q.id])) {
+                            next[q.id] = 'answered';
+                        } else if (!next[q.id]) {
+                            next[q.id] = 'notVisited';
+                        }
+                    });
+                    return next;
+                });
+            })
+            .catch(() => navigate('/challenges', { replace: true }));
+    }, [attemptId, navigate]);
+
+    const pendingDeltas = useCallback((ids = dirtyRef.current) => {
+        const deltas = {};
+        ids.forEach(id => {
+            const value = answersRef.current[id];
+            deltas[id] = value === undefined || (Array.isArray(value) && value.length === 0) ? null : value;
+        });
+        return deltas;
+    }, []);
+
+    // Send what changed every few seconds, so a closed tab or crash loses at most that much.
+    // The server orders deltas by when it receives them, so only one autosave is in flight at a time.
+    useEffect(() => {
+        const timer = setInterval(() => {
+            if (dirtyRef.current.size === 0 || inFlightRef.current.size > 0) return;
+            const sent = dirtyRef.current;
+            const deltas = pendingDeltas();
+            dirtyRef.current = new Set();
+            inFlightRef.current = sent;
+            axiosInstance.patch(`/challenges/attempts/${attemptId}/answers/`, { answers: deltas })
+                .catch(() => sent.forEach(id => dirtyRef.current.add(id)))
+                .finally(() => { inFlightRef.current = new Set(); });
+        }, AUTOSAVE_INTERVAL_MS);
+        return () => clearInterval(timer);
+    }, [attemptId, pendingDeltas]);
 
     useEffect(() => {
         const currentQuestionId = questions[currentQuestionIndex]?.id;
@@ -50,7 +109,12 @@ const ChallengeAttemptPage = () => {
     const handleSubmit = useCallback(async () => {
         setShowSubmitModal(false);
         setIsSubmitting(true);
-        const formattedAnswers = { ...answers };
+        // The full answer map, not just unsaved deltas: an acknowledged autosave may still be
+        // on its way to the database through another server worker. The server merges these
+        // on top of what was autosaved; null clears an answer.
+        const formattedAnswers = pendingDeltas(new Set([
+            ...questions.map(q => String(q.id)), ...inFlightRef.current, ...dirtyRef.current,
+        ]));
         questions.forEach(q => {
             if (q.question_type === 'MSQ' && formattedAnswers[q.id]) {
                 if (Array.isArray(formattedAnswers[q.id])) {
@@ -66,7 +130,7 @@ const ChallengeAttemptPage = () => {
             alert('Failed to submit challenge. Please try again.');
             setIsSubmitting(false);
         }
-    }, [answers, questions, attemptId, navigate]);
+    }, [questions, attemptId, navigate, pendingDeltas]);
 
     const updateStatus = (questionId, newStatus) => {
         const currentStatus = statuses[questionId];
@@ -87,6 +151,8 @@ const ChallengeAttemptPage = () => {
                 } else { newAnswers[questionId] = [...currentAnswers, value]; }
             } else { newAnswers[questionId] = value; }
             updateStatus(questionId, 'answered');
+            answersRef.current = newAnswers;
+            dirtyRef.current.add(String(questionId));
             return newAnswers;
         });
     };
@@ -131,6 +197,8 @@ const ChallengeAttemptPage = () => {
         setAnswers(prev => {
             const newAnswers = { ...prev };
             delete newAnswers[questionId];
+            answersRef.current = newAnswers;
+            dirtyRef.current.add(String(questionId));
             return newAnswers;
         });
         setStatuses(prev => ({...prev, [questionId]: 'notAnswered'}));
@@ -154,7 +222,7 @@ const ChallengeAttemptPage = () => {
                         </Card.Header>
                         <Card.Body style={{ minHeight: '60vh', overflowY: 'auto' }}>
                             {currentQuestion.question_text && <p dangerouslySetInnerHTML={{ __html: currentQuestion.question_text }} />}
-                            {currentQuestion.question_image && <img src={currentQuestion.question_image} alt="Question figure" className="img-fluid" />}
+                            {currentQuestion.question_image && <QuestionImage src={currentQuestion.question_image} srcset={currentQuestion.question_image_srcset} className="img-fluid" />}
                             <hr />
                             <Form>{renderInputs(currentQuestion)}</Form>
                         </Card.Body>
@@ -180,7 +248,13 @@ const ChallengeAttemptPage = () => {
                 <Col md={3}>
                     <Card className="palette-card">
                         <Card.Header className="text-center d-flex justify-content-center align-items-center">
-                            Time Left: <Timer seconds={3 * 60 * 60} onTimeUp={handleSubmit} />
+                            Time Left: {deadline && (
+                                <Timer
+                                    key={deadline}
+                                    seconds={Math.max(0, Math.floor((new Date(deadline) - Date.now()) / 1000))}
+                                    onTimeUp={handleSubmit}
+                                />
+                            )}
                         </Card.Header>
                         <Card.Body style={{ maxHeight: '60vh', overflowY: 'auto' }}>
                             <h6>Question Palette</h6>
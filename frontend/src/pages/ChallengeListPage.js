@@ -7,6 +7,8 @@ import axiosInstance from '../utils/axiosInstance';
 
 const ChallengeListPage = () => {
     const [challenges, setChallenges] = useState([]);
+    const [nextPage, setNextPage] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState('');
     const [showConfirmModal, setShowConfirmModal] = useState(false);
@@ -17,7 +19,8 @@ const ChallengeListPage = () => {
         const fetchChallenges = async () => {
             try {
                 const response = await axiosInstance.get('/challenges/');
-                setChallenges(response.data);
+                setChallenges(response.data.results);
+                setNextPage(response.data.next);
             } catch (err) {
                 setError('Failed to load challenges.');
             } finally {
@@ -27,6 +30,20 @@ const ChallengeListPage = () => {
         fetchChallenges();
     }, []);
 
+    // The list is cursor-paginated: `next` already carries the cursor
+    const loadMore = async () => {
+        setLoadingMore(true);
+        try {
+            const response = await axiosInstance.get(nextPage);
+            setChallenges(prev => [...prev, ...response.data.results]);
+            setNextPage(response.data.next);
+        } catch (err) {
+            setError('Failed to load more challenges.');
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const handleStartClick = (challenge) => {
         setSelectedChallenge(challenge);
         setShowConfirmModal(true);
@@ -63,6 +80,13 @@ const ChallengeListPage = () => {
                         </Col>
                     ))}
                 </Row>
+                {nextPage && (
+                    <div className="text-center mb-4">
+                        <Button variant="outline-primary" onClick={loadMore} disabled={loadingMore}>
+                            {loadingMore ? <Spinner as="span" animation="border" size="sm" /> : 'Load more'}
+                        </Button>
+                    </div>
+                )}
             </Container>
 
             <Modal show={showConfirmModal} onHide={() => setShowConfirmModal(false)} centered>
@@ -7,6 +7,7 @@ import axiosInstance from '../utils/axiosInstance';
 import { Doughnut } from 'react-chartjs-2';
 import { Chart as ChartJS, ArcElement, Tooltip, Legend } from 'chart.js';
 import { CheckCircleFill, XCircleFill } from 'react-bootstrap-icons';
+import QuestionImage from '../components/QuestionImage';
 
 ChartJS.register(ArcElement, Tooltip, Legend);
 
@@ -83,6 +84,12 @@ const ChallengeResultPage = () => {
                                     <strong>Correct Answers:</strong> 
                                     <Badge bg="success" pill>{correctCount} / {totalQuestions}</Badge>
                                 </ListGroup.Item>
+                                {resultData.predicted_rank && (
+                                    <ListGroup.Item className="d-flex justify-content-between">
+                                        <strong>Predicted Rank:</strong>
+                                        <Badge bg="primary" pill>{resultData.predicted_rank}</Badge>
+                                    </ListGroup.Item>
+                                )}
                             </ListGroup>
                         </Col>
                     </Row>
@@ -103,7 +110,7 @@ const ChallengeResultPage = () => {
                         </Accordion.Header>
                         <Accordion.Body>
                             <p dangerouslySetInnerHTML={{ __html: `<strong>${res.question_text}</strong>` }}/>
-                            {res.question_image && <img src={res.question_image} alt="Question figure" className="img-fluid my-2" />}
+                            {res.question_image && <QuestionImage src={res.question_image} srcset={res.question_image_srcset} className="img-fluid my-2" />}
                             <p className={res.is_correct ? 'text-correct' : 'text-wrong'}>
                                 Your Answer: {res.user_answer || 'Not Answered'}
                             </p>
@@ -1,9 +1,11 @@
 import React, { useState, useEffect } from 'react';
-import { Container, ListGroup, Spinner, Alert, Card, Row, Col, Accordion, Table } from 'react-bootstrap';
+import { Container, ListGroup, Spinner, Alert, Card, Row, Col, Accordion, Table, Button } from 'react-bootstrap';
 import axios from 'axios';
 
 const InformationZonePage = () => {
     const [articles, setArticles] = useState([]);
+    const [nextPage, setNextPage] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState('');
 
@@ -11,7 +13,8 @@ const InformationZonePage = () => {
         const fetchNews = async () => {
             try {
                 const response = await axios.get('http://localhost:8000/api/information/news/');
-                setArticles(response.data);
+                setArticles(response.data.results);
+                setNextPage(response.data.next);
             } catch (err) {
                 setError('Failed to load news. Please try again later.');
             } finally {
@@ -22,6 +25,20 @@ const InformationZonePage = () => {
         fetchNews();
     }, []);
 
+    // The list is cursor-paginated: `next` already carries the cursor
+    const loadMore = async () => {
+        setLoadingMore(true);
+        try {
+            const response = await axios.get(nextPage);
+            setArticles(prev => [...prev, ...response.data.results]);
+            setNextPage(response.data.next);
+        } catch (err) {
+            setError('Failed to load more news.');
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     return (
         <Container className="mt-4">
             <Row>
@@ -51,6 +68,13 @@ const InformationZonePage = () => {
                                         <p className="text-center text-muted my-3">No recent news found.</p>
                                     </ListGroup.Item>
                                 )}
+                                {nextPage && (
+                                    <ListGroup.Item className="text-center">
+                                        <Button variant="link" onClick={loadMore} disabled={loadingMore}>
+                                            {loadingMore ? <Spinner as="span" animation="border" size="sm" /> : 'Load more'}
+                                        </Button>
+                                    </ListGroup.Item>
+                                )}
                             </ListGroup>
                         )}
                     </Card>
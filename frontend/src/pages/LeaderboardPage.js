@@ -1,21 +1,31 @@
 // File: frontend/src/pages/LeaderboardPage.js
 
 import React, { useState, useEffect, useContext } from 'react';
-import { Container, Card, Spinner, Alert, Table, Badge } from 'react-bootstrap';
+import { Container, Card, Spinner, Alert, Table, Badge, Form, Button } from 'react-bootstrap';
 import axiosInstance from '../utils/axiosInstance';
 import AuthContext from '../context/AuthContext';
 import { TrophyFill } from 'react-bootstrap-icons';
 
 const LeaderboardPage = () => {
     const [leaderboardData, setLeaderboardData] = useState(null);
+    const [challenges, setChallenges] = useState([]);
+    const [challengeId, setChallengeId] = useState(''); // '' = overall
     const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [error, setError] = useState('');
     const { user } = useContext(AuthContext); // Get the current logged-in user
 
+    useEffect(() => {
+        axiosInstance.get('/challenges/', { params: { page_size: 100 } })
+            .then(response => setChallenges(response.data.results))
+            .catch(() => {}); // The overall board still works without the picker
+    }, []);
+
     useEffect(() => {
         const fetchLeaderboard = async () => {
+            setLoading(true);
             try {
-                const response = await axiosInstance.get('/leaderboard/');
+                const response = await axiosInstance.get('/leaderboard/', { params: challengeId ? { challenge: challengeId } : {} });
                 setLeaderboardData(response.data);
             } catch (err) {
                 setError('Failed to load the leaderboard. Please try again later.');
@@ -24,12 +34,29 @@ const LeaderboardPage = () => {
             }
         };
         fetchLeaderboard();
-    }, []);
+    }, [challengeId]);
+
+    // Pages are keyset-paginated: `next` already carries the cursor
+    const loadMore = async () => {
+        setLoadingMore(true);
+        try {
+            const response = await axiosInstance.get(leaderboardData.next);
+            setLeaderboardData(prev => ({
+                ...prev,
+                leaderboard: [...prev.leaderboard, ...response.data.leaderboard],
+                next: response.data.next,
+            }));
+        } catch (err) {
+            setError('Failed to load more rankings.');
+        } finally {
+            setLoadingMore(false);
+        }
+    };
 
     if (loading) return <Container className="text-center mt-5"><Spinner animation="border" /></Container>;
     if (error) return <Container className="mt-5"><Alert variant="danger">{error}</Alert></Container>;
 
-    const { leaderboard, user_rank } = leaderboardData;
+    const { leaderboard, user_rank, next } = leaderboardData;
 
     return (
         <Container className="mt-4">
@@ -56,7 +83,15 @@ const LeaderboardPage = () => {
 
             {/* Main leaderboard table */}
             <Card className="leaderboard-main-card shadow-sm">
-                <Card.Header as="h5">Top 100 Rankings</Card.Header>
+                <Card.Header className="d-flex justify-content-between align-items-center">
+                    <h5 className="mb-0">Rankings</h5>
+                    <Form.Select size="sm" style={{ maxWidth: '250px' }} value={challengeId} onChange={e => setChallengeId(e.target.value)}>
+                        <option value="">Overall</option>
+                        {challenges.map(challenge => (
+                            <option key={challenge.id} value={challenge.id}>{challenge.title}</option>
+                        ))}
+                    </Form.Select>
+                </Card.Header>
                 <Table striped hover responsive className="leaderboard-table">
                     <thead>
                         <tr>
@@ -75,6 +110,13 @@ const LeaderboardPage = () => {
                         ))}
                     </tbody>
                 </Table>
+                {next && (
+                    <Card.Footer className="text-center">
+                        <Button variant="outline-primary" onClick={loadMore} disabled={loadingMore}>
+                            {loadingMore ? <Spinner as="span" animation="border" size="sm" /> : 'Load more'}
+                        </Button>
+                    </Card.Footer>
+                )}
             </Card>
         </Container>
     );
@@ -19,8 +19,16 @@ const subjects = [
     { code: 'GA', name: 'General Aptitude' },
 ];
 
+const formatSize = (bytes) => {
+    if (bytes == null) return null;
+    if (bytes < 1024 * 1024) return `${Math.max(1, Math.round(bytes / 1024))} KB`;
+    return `${(bytes / (1024 * 1024)).toFixed(1)} MB`;
+};
+
 const MaterialZonePage = () => {
     const [materials, setMaterials] = useState([]);
+    const [nextPage, setNextPage] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState('');
     const [selectedSubject, setSelectedSubject] = useState('ALL');
@@ -34,7 +42,8 @@ const MaterialZonePage = () => {
                     url += `?subject=${selectedSubject}`;
                 }
                 const response = await axiosInstance.get(url);
-                setMaterials(response.data);
+                setMaterials(response.data.results);
+                setNextPage(response.data.next);
             } catch (err) {
                 setError('Failed to load materials. Please try again later.');
             } finally {
@@ -44,6 +53,20 @@ const MaterialZonePage = () => {
         fetchMaterials();
     }, [selectedSubject]);
 
+    // The list is cursor-paginated: `next` already carries the cursor and filters
+    const loadMore = async () => {
+        setLoadingMore(true);
+        try {
+            const response = await axiosInstance.get(nextPage);
+            setMaterials(prev => [...prev, ...response.data.results]);
+            setNextPage(response.data.next);
+        } catch (err) {
+            setError('Failed to load more materials.');
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     return (
         <Container className="mt-4">
 
@@ -68,10 +91,19 @@ const MaterialZonePage = () => {
                     {materials.length > 0 ? materials.map(material => (
                         <Col md={6} lg={4} key={material.id} className="mb-4">
                             <Card className="h-100 shadow-sm card-hover">
+                                {material.thumbnail && (
+                                    <Card.Img variant="top" src={material.thumbnail} alt="" loading="lazy" />
+                                )}
                                 <Card.Body className="d-flex flex-column">
                                     <Card.Title as="h5">{material.title}</Card.Title>
                                     <Card.Subtitle className="mb-2 text-muted">{material.subject_name}</Card.Subtitle>
                                     <Card.Text className="flex-grow-1">{material.description}</Card.Text>
+                                    {(material.page_count || material.file_size != null) && (
+                                        <Card.Text className="small text-muted">
+                                            {[material.page_count && `${material.page_count} pages`, formatSize(material.file_size)]
+                                                .filter(Boolean).join(' · ')}
+                                        </Card.Text>
+                                    )}
                                     <Button href={material.file} target="_blank" download>
                                         <Download className="me-2" /> Download
                                     </Button>
@@ -85,6 +117,13 @@ const MaterialZonePage = () => {
                     )}
                 </Row>
             )}
+            {!loading && !error && nextPage && (
+                <div className="text-center mb-4">
+                    <Button variant="outline-primary" onClick={loadMore} disabled={loadingMore}>
+                        {loadingMore ? <Spinner as="span" animation="border" size="sm" /> : 'Load more'}
+                    </Button>
+                </div>
+            )}
         </Container>
     );
 };